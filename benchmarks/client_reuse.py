@@ -0,0 +1,90 @@
+"""
+Cold vs warm cost of boto3 clients
+
+Compares the per-invocation client setup the Lambdas used to do (new S3 and
+Bedrock clients with a custom Config on every call, one S3 client per
+collector function) with the shared registry in `module/clients.py`.
+Client construction does not touch the network, so this runs offline.
+
+In production the same split is visible in the `"event": "invocation"` log
+lines emitted by `track_invocation` (cold_start, init_ms, duration_ms).
+
+Usage:
+    python benchmarks/client_reuse.py --invocations 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "collection" / "league_api_call"))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="boto3 client reuse benchmark")
+    parser.add_argument("--invocations", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    import boto3
+    from botocore.config import Config
+
+    boto3_import_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    from module.clients import get_client
+
+    registry_import_ms = (time.perf_counter() - started) * 1000
+
+    def per_invocation():
+        # What analyze_single_match + the collector did on every call
+        boto3.client(
+            "s3",
+            config=Config(
+                max_pool_connections=10, retries={"max_attempts": 3, "mode": "adaptive"}
+            ),
+        )
+        boto3.client(
+            "bedrock-runtime",
+            region_name="eu-west-3",
+            config=Config(
+                max_pool_connections=5, retries={"max_attempts": 3, "mode": "adaptive"}
+            ),
+        )
+        for _ in range(7):
+            boto3.client("s3")
+
+    def shared():
+        get_client("s3")
+        get_client("bedrock-runtime", region_name="eu-west-3")
+        for _ in range(7):
+            get_client("s3")
+
+    cold = timed(shared, 1)[0]
+    before = timed(per_invocation, args.invocations)
+    after = timed(shared, args.invocations)
+
+    print(f"import boto3:            {boto3_import_ms:8.2f} ms")
+    print(f"import registry (+ S3):  {registry_import_ms:8.2f} ms")
+    print(f"first shared call:       {cold:8.2f} ms (cold, builds Bedrock client)")
+    print(f"per-invocation clients:  p50 {statistics.median(before):8.2f} ms  max {max(before):8.2f} ms")
+    print(f"shared clients (warm):   p50 {statistics.median(after):8.4f} ms  max {max(after):8.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Micro-benchmarks of the coaching parser and formatter
+
+Times `parse_timeline`, `determine_lane_opponent`, `extract_all_players_stats`
+and `format_for_llm` (module `parse_data` of callCoachAgentOneGame) on short,
+average and very long games, and measures the peak memory allocated per
+call (tracemalloc, in a separate pass so it does not skew the timings).
+
+Games come from `synthetic_games.py` (seeded, so every run parses the same
+documents) or from a corpus of stored summary/timeline pairs, bucketed by
+duration.
+
+Results can be saved as a baseline; a later run compared with it exits
+with status 1 when a function got slower, or allocates more, than the
+thresholds allow:
+
+    python benchmarks/coach_parser.py --save-baseline parser-baseline.json
+    ... change the parser ...
+    python benchmarks/coach_parser.py --baseline parser-baseline.json --threshold 0.2
+
+Timings depend on the machine: compare baselines taken on the same host.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "ui_integration" / "callCoachAgentOneGame"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic_games  # noqa: E402
+from module.serialization import loads  # noqa: E402
+from parse_data import (  # noqa: E402
+    determine_lane_opponent,
+    extract_all_players_stats,
+    format_for_llm,
+    get_match_result,
+    parse_timeline,
+)
+
+# Game length buckets: (name, synthetic length in minutes, max corpus duration in seconds)
+SIZES = [("short", (15, 18), 20 * 60), ("average", (28, 34), 40 * 60), ("long", (50, 60), None)]
+FUNCTIONS = ["parse_timeline", "determine_lane_opponent", "extract_all_players_stats", "format_for_llm"]
+
+
+def synthetic_corpus(games, seed):
+    corpus = {}
+    for size, minutes, _ in SIZES:
+        corpus[size] = [
+            synthetic_games.game(
+                synthetic_games.match_id(index, 0), seed=seed, minutes=minutes
+            )[:2]
+            for index in range(games)
+        ]
+    return corpus
+
+
+def stored_corpus(directory, games):
+    """Summary/timeline pairs of a corpus directory, bucketed by game duration"""
+    corpus = {size: [] for size, _, _ in SIZES}
+    for summary_path in sorted(Path(directory).glob("**/game_summary/*.json")):
+        timeline_path = summary_path.parent.parent / "game_history" / summary_path.name
+        if not timeline_path.exists():
+            continue
+        match_data = loads(summary_path.read_bytes())
+        duration = match_data["info"]["gameDuration"]
+        size = next(name for name, _, limit in SIZES if limit is None or duration < limit)
+        if len(corpus[size]) < games:
+            corpus[size].append((match_data, loads(timeline_path.read_bytes())))
+    return corpus
+
+
+def calls(match_data, timeline_data):
+    """The benchmarked calls of one game, with their inputs prepared"""
+    puuid = match_data["info"]["participants"][0]["puuid"]
+    participant_id = match_data["info"]["participants"][0]["participantId"]
+    analysis = parse_timeline(match_data, timeline_data, puuid)
+    match_result = get_match_result(match_data, puuid)
+    return {
+        "parse_timeline": lambda: parse_timeline(match_data, timeline_data, puuid),
+        "determine_lane_opponent": lambda: determine_lane_opponent(participant_id, match_data, timeline_data),
+        "extract_all_players_stats": lambda: extract_all_players_stats(match_data),
+        "format_for_llm": lambda: format_for_llm(analysis, match_result, match_data),
+    }
+
+
+def time_call(fn, repeat, min_seconds=0.005):
+    """Per-call time (ms) of `repeat` samples, each looping long enough to be measurable"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds or loops >= 1 << 16:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops * 1000)
+    return samples
+
+
+def peak_alloc_kib(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        return (tracemalloc.get_traced_memory()[1] - before) / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run(corpus, repeat):
+    results = {}
+    for size, games in corpus.items():
+        if not games:
+            continue
+        timings = {name: [] for name in FUNCTIONS}
+        fastest = {name: [] for name in FUNCTIONS}
+        allocations = {name: [] for name in FUNCTIONS}
+        for match_data, timeline_data in games:
+            prepared = calls(match_data, timeline_data)
+            gc.collect()
+            gc.disable()
+            try:
+                for name in FUNCTIONS:
+                    samples = time_call(prepared[name], repeat)
+                    timings[name].extend(samples)
+                    fastest[name].append(min(samples))
+            finally:
+                gc.enable()
+            for name in FUNCTIONS:
+                allocations[name].append(peak_alloc_kib(prepared[name]))
+        minutes = statistics.mean(m["info"]["gameDuration"] for m, _ in games) / 60
+        results[size] = {
+            "games": len(games),
+            "minutes": round(minutes, 1),
+            "functions": {
+                name: {
+                    "median_ms": round(statistics.median(timings[name]), 4),
+                    # Fastest sample of each game, averaged over the games
+                    "min_ms": round(statistics.mean(fastest[name]), 4),
+                    "peak_kib": round(statistics.median(allocations[name]), 1),
+                }
+                for name in FUNCTIONS
+            },
+        }
+    return results
+
+
+def regressions(results, baseline, threshold, alloc_threshold):
+    """(size, function, metric, baseline, current) of every regression"""
+    found = []
+    for size, result in results.items():
+        for name, current in result["functions"].items():
+            previous = baseline.get("results", {}).get(size, {}).get("functions", {}).get(name)
+            if not previous:
+                continue
+            # The fastest sample is the least noisy estimate of the cost; the
+            # absolute slack absorbs timer resolution on microsecond calls
+            if current["min_ms"] > previous["min_ms"] * (1 + threshold) + 0.001:
+                found.append((size, name, "min_ms", previous["min_ms"], current["min_ms"]))
+            if current["peak_kib"] > previous["peak_kib"] * (1 + alloc_threshold) + 1:
+                found.append((size, name, "peak_kib", previous["peak_kib"], current["peak_kib"]))
+    return found
+
+
+def print_report(results, baseline=None):
+    print(f"{'size':<9}{'function':<28}{'median ms':>11}{'min ms':>10}{'peak KiB':>10}{'vs base':>10}")
+    for size, result in results.items():
+        for name, stats in result["functions"].items():
+            previous = (baseline or {}).get("results", {}).get(size, {}).get("functions", {}).get(name)
+            change = f"{(stats['min_ms'] / previous['min_ms'] - 1) * 100:+.1f}%" if previous else ""
+            print(
+                f"{size:<9}{name:<28}{stats['median_ms']:>11.3f}{stats['min_ms']:>10.3f}"
+                f"{stats['peak_kib']:>10.1f}{change:>10}"
+            )
+        print(f"{'':<9}({result['games']} games, {result['minutes']} min on average)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coaching parser micro-benchmarks")
+    parser.add_argument("--games", type=int, default=5, help="Games per size")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed samples per function and game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Use stored summary/timeline pairs instead of synthetic games")
+    parser.add_argument("--baseline", help="Compare with this baseline, exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed time increase (fastest sample)")
+    parser.add_argument("--alloc-threshold", type=float, default=0.1, help="Allowed peak allocation increase")
+    args = parser.parse_args(argv)
+
+    corpus = stored_corpus(args.corpus, args.games) if args.corpus else synthetic_corpus(args.games, args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run(corpus, args.repeat)
+    config = {"games": args.games, "seed": args.seed, "corpus": args.corpus, "python": sys.version.split()[0]}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("config", {}) != config:
+            print(f"⚠️ Baseline config differs: {baseline.get('config')} vs {config}")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump({"config": config, "results": results}, file, indent=2)
+        print(f"\n💾 Baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        found = regressions(results, baseline, args.threshold, args.alloc_threshold)
+        if found:
+            print("\n❌ Regressions:")
+            for size, name, metric, previous, current in found:
+                print(f"  {size} {name} {metric}: {previous} -> {current}")
+            sys.exit(1)
+        print("\n✅ No regression")
+
+
+if __name__ == "__main__":
+    main()
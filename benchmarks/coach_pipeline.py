@@ -0,0 +1,208 @@
+"""
+End-to-end benchmark of the coaching pipeline
+
+Runs every stage of `analyze_single_match` (load, parse, format, prompt,
+LLM, decode, serialize) over a local corpus of stored summary/timeline
+pairs, with the LLM replaced by the replay backend so model latency is
+configurable and the run works offline.
+
+Corpus layout mirrors the S3 player folders:
+    {corpus}/**/game_summary/{match_id}.json
+    {corpus}/**/game_history/{match_id}.json
+
+Usage:
+    python benchmarks/coach_pipeline.py --corpus ./corpus \
+        --replay-dir ./recorded --latency-ms 1500 --iterations 3
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "ui_integration" / "callCoachAgentOneGame"))
+
+from all_game_data import build_prompt, parse_match  # noqa: E402
+from llm_backend import ReplayBackend, parse_llm_json  # noqa: E402
+from module.serialization import compress, dumps, loads  # noqa: E402
+from parse_data import format_for_llm  # noqa: E402
+
+STAGES = ["load", "parse", "format", "prompt", "llm", "decode", "serialize"]
+
+# Used when no recorded answers are given, so the harness runs out of the box
+CANNED_RESPONSE = json.dumps(
+    {
+        "player": {"champion": "Unknown", "role": "UNKNOWN", "score": 5.0},
+        "phase_analysis": {
+            phase: {"title": "", "rating": 5.0, "strengths": [], "issues": []}
+            for phase in ("early_game", "mid_game", "late_game")
+        },
+        "global_strengths": [],
+        "global_issues": [],
+        "coaching_points": [],
+        "game_outcome_analysis": {"summary": "", "key_factors": []},
+        "actionable_improvements": [],
+        "final_verdict": {"summary": "", "key_takeaways": []},
+    }
+)
+
+
+def find_pairs(corpus: Path):
+    """Return (match_id, summary_path, timeline_path) for every complete pair"""
+    pairs = []
+    for summary_path in sorted(corpus.glob("**/game_summary/*.json")):
+        timeline_path = summary_path.parent.parent / "game_history" / summary_path.name
+        if timeline_path.exists():
+            pairs.append((summary_path.stem, summary_path, timeline_path))
+    return pairs
+
+
+def pick_puuid(summary_data: dict, puuid: str = None) -> str:
+    participants = summary_data["info"]["participants"]
+    if puuid and any(p["puuid"] == puuid for p in participants):
+        return puuid
+    return participants[0]["puuid"]
+
+
+def run_pipeline(match_id, summary_path, timeline_path, backend, puuid=None, on_stage=None):
+    """
+    Run one coaching request through every stage
+
+    `on_stage(name)` is called at the end of each stage, in order.
+    """
+    summary_data = loads(summary_path.read_bytes())
+    timeline_data = loads(timeline_path.read_bytes())
+    on_stage("load")
+
+    analysis, match_result = parse_match(
+        summary_data, timeline_data, pick_puuid(summary_data, puuid)
+    )
+    on_stage("parse")
+    formatted_text = format_for_llm(analysis, match_result, summary_data)
+    on_stage("format")
+    prompt = build_prompt(formatted_text)
+    on_stage("prompt")
+    raw = backend.generate(prompt, key=match_id)
+    on_stage("llm")
+    result = parse_llm_json(raw)
+    on_stage("decode")
+    compress(dumps(result))
+    on_stage("serialize")
+
+
+def time_run(pair, backend, puuid):
+    timings = {}
+    start = time.perf_counter()
+
+    def on_stage(name):
+        nonlocal start
+        now = time.perf_counter()
+        timings[name] = (now - start) * 1000
+        start = now
+
+    run_pipeline(*pair, backend, puuid=puuid, on_stage=on_stage)
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def memory_run(pair, backend, puuid):
+    """Peak traced allocation (KiB) of each stage, measured in a separate pass"""
+    peaks = {}
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    def on_stage(name):
+        peaks[name] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.reset_peak()
+
+    try:
+        run_pipeline(*pair, backend, puuid=puuid, on_stage=on_stage)
+    finally:
+        tracemalloc.stop()
+    peaks["total"] = max(peaks.values())
+    return peaks
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    return {
+        stage: {
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "mean": round(statistics.mean(values), 3),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", required=True, help="Directory of stored summary/timeline pairs")
+    parser.add_argument("--replay-dir", help="Directory of recorded LLM answers")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Simulated LLM jitter")
+    parser.add_argument("--iterations", type=int, default=1, help="Timed passes over the corpus")
+    parser.add_argument("--puuid", help="Player to analyze (defaults to the first participant)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    pairs = find_pairs(Path(args.corpus))
+    if not pairs:
+        parser.error(f"No summary/timeline pairs found in {args.corpus}")
+
+    backend = ReplayBackend(
+        responses_dir=args.replay_dir,
+        responses=None if args.replay_dir else [CANNED_RESPONSE],
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=0,
+    )
+
+    latency = {stage: [] for stage in STAGES + ["total"]}
+    for _ in range(args.iterations):
+        for pair in pairs:
+            for stage, value in time_run(pair, backend, args.puuid).items():
+                latency[stage].append(value)
+
+    memory = {stage: [] for stage in STAGES + ["total"]}
+    if not args.no_memory:
+        for pair in pairs:
+            for stage, value in memory_run(pair, backend, args.puuid).items():
+                memory[stage].append(value)
+
+    report = {
+        "matches": len(pairs),
+        "runs": len(latency["total"]),
+        "llm_latency_ms": args.latency_ms,
+        "latency_ms": summarize(latency),
+        "peak_alloc_kib": summarize(memory) if not args.no_memory else {},
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    print(f"{report['matches']} matches, {report['runs']} runs\n")
+    print(f"{'stage':<10} {'p50 ms':>10} {'p95 ms':>10} {'p50 KiB':>10} {'p95 KiB':>10}")
+    for stage in STAGES + ["total"]:
+        lat = report["latency_ms"][stage]
+        mem = report["peak_alloc_kib"].get(stage, {"p50": 0, "p95": 0})
+        print(f"{stage:<10} {lat['p50']:>10.2f} {lat['p95']:>10.2f} {mem['p50']:>10.1f} {mem['p95']:>10.1f}")
+    print(f"\nmax RSS: {report['max_rss_kib']} KiB")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
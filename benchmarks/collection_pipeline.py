@@ -0,0 +1,242 @@
+"""
+Offline replay of the whole collection pipeline
+
+Runs the collector (`get_account_data.main`: account, profile, match IDs,
+match details, summary table, wrapped, period analysis, then the timeline
+prefetch) for N synthetic players against:
+
+    - a local fake Riot API (`fake_riot.py`) with latency and rate limits,
+    - an in-memory S3 (moto), with the buckets of the collector.
+
+Nothing leaves the machine, so runs are comparable from one commit to the
+next. Reports, per scenario: throughput, p50/p95 per stage (one sample per
+player), Riot API calls per endpoint and S3 bytes written.
+
+Requires moto (`pip install "moto[s3]"`).
+
+Usage:
+    python benchmarks/collection_pipeline.py --players 1 10 100 --games 10
+    python benchmarks/collection_pipeline.py --players 10 --output before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "collection" / "league_api_call"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+
+import synthetic_games
+from fake_riot import FakeRiotServer
+
+BUCKETS = ("s3-api-lol", "s3-process-lol", "ddragon-resources")
+REGION = "euw1"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] if values else 0.0
+
+
+def seed_static_data(directory):
+    """Data Dragon snapshot of the synthetic patch (no CDN access)"""
+    for file_name, data in synthetic_games.static_data().items():
+        path = Path(directory) / "15.19.1" / "data" / "en_US" / f"{file_name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+
+
+def run_scenario(players, first_player, server, verbose=False):
+    from get_account_data import main
+    from module.instrumentation import recorder
+    from module.riot_client import get_riot_client
+
+    riot = get_riot_client()
+    riot.reset_metrics()
+    server.reset_stats()
+    stages, durations, s3_bytes, s3_requests, failures = {}, [], 0, 0, 0
+
+    started = time.perf_counter()
+    for index in range(first_player, first_player + players):
+        gamename, gametag = synthetic_games.player_riot_id(index)
+        recorder.reset()
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        player_started = time.perf_counter()
+        with output:
+            result = main(REGION, gamename, gametag, {"connectionId": None}, "solo")
+        durations.append((time.perf_counter() - player_started) * 1000)
+        if result["statusCode"] != 200:
+            failures += 1
+
+        snapshot = recorder.snapshot()
+        for name, stats in snapshot["spans"].items():
+            if name.startswith("stage."):
+                stages.setdefault(name[len("stage."):], []).append(stats["wall_ms"])
+        s3_bytes += snapshot["counters"].get("s3.bytes_out", 0)
+        s3_requests += snapshot["counters"].get("s3.requests", 0)
+    elapsed = time.perf_counter() - started
+
+    endpoints = riot.summary()["endpoints"]
+    return {
+        "players": players,
+        "failures": failures,
+        "seconds": round(elapsed, 2),
+        "players_per_minute": round(players / elapsed * 60, 2),
+        "player_ms": {
+            "p50": round(percentile(durations, 0.5), 1),
+            "p95": round(percentile(durations, 0.95), 1),
+        },
+        "stages_ms": {
+            stage: {
+                "p50": round(percentile(samples, 0.5), 1),
+                "p95": round(percentile(samples, 0.95), 1),
+                "mean": round(statistics.mean(samples), 1),
+            }
+            for stage, samples in stages.items()
+        },
+        "riot_calls": {
+            endpoint: {
+                "requests": stats["requests"],
+                "rate_limited": stats["rate_limited"],
+                "latency_ms_p95": stats["latency_ms_p95"],
+            }
+            for endpoint, stats in endpoints.items()
+        },
+        "riot_requests": sum(stats["requests"] for stats in endpoints.values()),
+        "s3_requests": s3_requests,
+        "s3_bytes_written": s3_bytes,
+    }
+
+
+def print_report(result):
+    print(
+        f"\n== {result['players']} player(s): {result['seconds']} s, "
+        f"{result['players_per_minute']} players/min, "
+        f"player p50 {result['player_ms']['p50']} ms / p95 {result['player_ms']['p95']} ms"
+        + (f", {result['failures']} FAILED" if result["failures"] else "")
+    )
+    print(f"{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, stats in result["stages_ms"].items():
+        print(f"{stage:<22}{stats['p50']:>10.1f}{stats['p95']:>10.1f}")
+    print(f"{'riot endpoint':<58}{'calls':>7}{'429':>6}{'p95 ms':>9}")
+    for endpoint, stats in sorted(result["riot_calls"].items()):
+        print(f"{endpoint:<58}{stats['requests']:>7}{stats['rate_limited']:>6}{stats['latency_ms_p95']:>9.1f}")
+    print(
+        f"riot requests: {result['riot_requests']}  s3 requests: {result['s3_requests']}  "
+        f"s3 bytes written: {result['s3_bytes_written'] / 1e6:.2f} MB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline collection pipeline benchmark")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--games", type=int, default=10, help="Matches per player")
+    parser.add_argument(
+        "--minutes", type=float, nargs=2, default=synthetic_games.DEFAULT_MINUTES, metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--event-density", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument(
+        "--rate-limits",
+        default="500:10,30000:600",
+        help='Limits of the fake API key, "requests:seconds,..." (production key by default)',
+    )
+    parser.add_argument(
+        "--fanout",
+        choices=("none", "inline"),
+        default="none",
+        help="Fetch match details through fan-out shards run in this process",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline logs")
+    args = parser.parse_args(argv)
+
+    try:
+        from moto import mock_aws
+    except ImportError:
+        parser.error('moto is required: pip install "moto[s3]"')
+
+    workdir = tempfile.mkdtemp(prefix="collection_bench_")
+    seed_static_data(os.path.join(workdir, "ddragon"))
+    server = FakeRiotServer(
+        games_per_player=args.games,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limits=tuple(
+            (int(limit), int(window))
+            for limit, window in (pair.split(":") for pair in args.rate_limits.split(","))
+        ),
+        seed=args.seed,
+        minutes=args.minutes,
+        event_density=args.event_density,
+    ).start()
+    os.environ.update(
+        RIOT_API_KEY="bench",
+        RIOT_API_BASE_URL=server.url,
+        RIOT_RATE_LIMITS=args.rate_limits,
+        TIMELINE_PREFETCH_INTERVAL="0",
+        TIMELINE_PREFETCH_MAX_REQUESTS=str(args.games),
+        ACCOUNT_CACHE_DIR=os.path.join(workdir, "accounts"),
+        STATIC_DATA_DIR=os.path.join(workdir, "ddragon"),
+        STATIC_DATA_OFFLINE="1",
+        AWS_ACCESS_KEY_ID="bench",
+        AWS_SECRET_ACCESS_KEY="bench",
+    )
+    if args.fanout != "none":
+        # Worker processes would not see the moto S3 of this one: inline only
+        os.environ["COLLECTION_FANOUT"] = args.fanout
+
+    results = []
+    try:
+        with mock_aws():
+            # The collector builds its clients at import: import inside the mock
+            from module.clients import get_client
+            from module.instrumentation import instrument_client
+
+            s3 = instrument_client(get_client("s3"))
+            for bucket in BUCKETS:
+                s3.create_bucket(
+                    Bucket=bucket,
+                    CreateBucketConfiguration={"LocationConstraint": os.environ["AWS_DEFAULT_REGION"]},
+                )
+
+            first_player = 0
+            for players in args.players:
+                # New players every scenario: nothing is served from a previous run
+                result = run_scenario(players, first_player, server, verbose=args.verbose)
+                first_player += players
+                print_report(result)
+                results.append(result)
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "games_per_player": args.games,
+                    "latency_ms": args.latency_ms,
+                    "rate_limits": args.rate_limits,
+                    "fanout": args.fanout,
+                    "scenarios": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
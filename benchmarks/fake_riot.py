@@ -0,0 +1,213 @@
+"""
+Local fake Riot API
+
+HTTP server answering the Riot endpoints used by the collector with
+synthetic payloads (see `synthetic_games.py`), with a configurable latency
+and the rate limits of an API key: over the limit it answers 429 with a
+Retry-After header, like the real API.
+
+Paths are "/{routing host}/{Riot path}", which is what `RiotClient` sends
+when RIOT_API_BASE_URL points to this server:
+
+    https://europe.api.riotgames.com/lol/match/v5/matches/EUW1_1
+        -> http://127.0.0.1:{port}/europe/lol/match/v5/matches/EUW1_1
+
+Usage:
+    server = FakeRiotServer(games_per_player=10, latency_ms=40).start()
+    os.environ["RIOT_API_BASE_URL"] = server.url
+    ...
+    server.stop()
+"""
+
+import functools
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import synthetic_games
+
+ROUTES = [
+    ("account", re.compile(r"^/riot/account/v1/accounts/by-riot-id/([^/]+)/([^/]+)$")),
+    ("league", re.compile(r"^/lol/league/v4/entries/by-puuid/([^/]+)$")),
+    ("summoner", re.compile(r"^/lol/summoner/v4/summoners/by-puuid/([^/]+)$")),
+    ("masteries", re.compile(r"^/lol/champion-mastery/v4/champion-masteries/by-puuid/([^/]+)$")),
+    ("match_ids", re.compile(r"^/lol/match/v5/matches/by-puuid/([^/]+)/ids$")),
+    ("timeline", re.compile(r"^/lol/match/v5/matches/([A-Z0-9]+_\d+)/timeline$")),
+    ("match", re.compile(r"^/lol/match/v5/matches/([A-Z0-9]+_\d+)$")),
+]
+PLAYER_PUUID = re.compile(r"^bench-puuid-bench(\d+)-bnch$")
+
+
+class FakeRiotServer:
+    """
+    Args:
+        games_per_player (int): Matches returned by the match IDs endpoint.
+        latency_ms (float): Mean response latency.
+        jitter_ms (float): Standard deviation of the latency.
+        rate_limits (tuple): ((requests, window_seconds), ...) enforced
+            across all endpoints; None disables rate limiting.
+        seed (int): Seed of the synthetic payloads.
+        minutes (tuple): (min, max) length of the synthetic games.
+        event_density (float): Combat event multiplier of the games.
+    """
+
+    def __init__(
+        self,
+        games_per_player=10,
+        latency_ms=40.0,
+        jitter_ms=10.0,
+        rate_limits=((20, 1), (100, 120)),
+        seed=0,
+        minutes=synthetic_games.DEFAULT_MINUTES,
+        event_density=1.0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.games_per_player = games_per_player
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limits = tuple(rate_limits or ())
+        self.seed = seed
+        # Match and timeline of a game come from one simulation
+        self._game = functools.lru_cache(maxsize=256)(
+            functools.partial(
+                synthetic_games.game, seed=seed, minutes=tuple(minutes), event_density=event_density
+            )
+        )
+        self.stats = {}
+        self._sent = deque()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+
+    # ----------------------
+    # Behavior
+    # ----------------------
+
+    def _retry_after(self):
+        """Seconds until the request fits in every window (0: accepted)"""
+        with self._lock:
+            now = time.monotonic()
+            longest = max((window for _, window in self.rate_limits), default=0)
+            while self._sent and self._sent[0] <= now - longest:
+                self._sent.popleft()
+            wait = 0.0
+            for limit, window in self.rate_limits:
+                recent = [t for t in self._sent if t > now - window]
+                if len(recent) >= limit:
+                    wait = max(wait, recent[-limit] + window - now)
+            if wait <= 0:
+                self._sent.append(now)
+            return wait
+
+    def _latency(self):
+        with self._lock:
+            latency = self._rng.gauss(self.latency_ms, self.jitter_ms)
+        return max(0.0, latency) / 1000
+
+    def _count(self, route, status, size):
+        with self._lock:
+            stats = self.stats.setdefault(route, {"requests": 0, "bytes": 0, "status": {}})
+            stats["requests"] += 1
+            stats["bytes"] += size
+            stats["status"][str(status)] = stats["status"].get(str(status), 0) + 1
+
+    def _payload(self, route, groups, query):
+        seed = self.seed
+        if route == "account":
+            index = re.match(r"^Bench(\d+)$", groups[0])
+            if not index or groups[1] != "BNCH":
+                return None
+            return synthetic_games.account(groups[0], groups[1])
+        if route in ("league", "summoner", "masteries", "match_ids"):
+            if not PLAYER_PUUID.match(groups[0]):
+                return None
+        if route == "league":
+            return synthetic_games.league_entries(groups[0], seed=seed)
+        if route == "summoner":
+            return synthetic_games.summoner(groups[0], seed=seed)
+        if route == "masteries":
+            return synthetic_games.masteries(groups[0], seed=seed)
+        if route == "match_ids":
+            player_index = int(PLAYER_PUUID.match(groups[0]).group(1))
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["20"])[0])
+            return synthetic_games.match_ids(player_index, self.games_per_player, start, count)
+        if route == "match":
+            return self._game(groups[0])[0]
+        if route == "timeline":
+            return self._game(groups[0])[1]
+        return None
+
+    def respond(self, path, query):
+        """
+        Returns:
+            tuple: (route, status, headers, body bytes)
+        """
+        host_path = path.split("/", 2)
+        riot_path = "/" + (host_path[2] if len(host_path) > 2 else "")
+        for route, pattern in ROUTES:
+            match = pattern.match(riot_path)
+            if match:
+                break
+        else:
+            return "unknown", 404, {}, b'{"status": {"status_code": 404}}'
+
+        retry_after = self._retry_after()
+        if retry_after > 0:
+            body = b'{"status": {"message": "Rate limit exceeded", "status_code": 429}}'
+            return route, 429, {"Retry-After": str(max(1, round(retry_after)))}, body
+
+        payload = self._payload(route, [unquote(group) for group in match.groups()], query)
+        if payload is None:
+            return route, 404, {}, b'{"status": {"message": "Data not found", "status_code": 404}}'
+        return route, 200, {}, json.dumps(payload).encode("utf-8")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                route, status, headers, body = server.respond(url.path, parse_qs(url.query))
+                time.sleep(server._latency())
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(route, status, len(body))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
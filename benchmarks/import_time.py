@@ -0,0 +1,175 @@
+"""
+Cold start import time of the Lambdas
+
+Imports the handler module (`lambda_function`) of every Lambda in a fresh
+interpreter with `python -X importtime`, which is what a cold start pays
+before the first event is handled, and reports per Lambda:
+
+    - the cumulative import time of `lambda_function`: fastest and median
+      of the runs (the fastest is the least noisy, it is the one compared
+      with a baseline),
+    - the heaviest top-level imports it pulls in,
+    - which heavy third-party packages end up loaded (pandas, numpy,
+      requests, pydantic...), i.e. the ones worth loading lazily.
+
+The AWS clients built at import need no network (fake credentials are set)
+and the Data Dragon files preloaded during init come from a local snapshot
+of the synthetic patch, so only the import work itself is measured.
+Results can be saved as a baseline; a later run compared with it exits with
+status 1 when a Lambda imports slower than `--threshold` allows:
+
+    python benchmarks/import_time.py --save-baseline import-baseline.json
+    ... change the imports ...
+    python benchmarks/import_time.py --baseline import-baseline.json
+
+Timings depend on the machine: compare baselines taken on the same host.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LAMBDAS = ROOT / "lambdas"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from collection_pipeline import seed_static_data  # noqa: E402
+
+HEAVY = ("pandas", "numpy", "requests", "pydantic", "boto3", "botocore", "orjson")
+
+# Run in the Lambda directory, after `lambda_function` is imported
+PROBE = (
+    "import json, sys, lambda_function; "
+    "print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))"
+)
+
+
+def lambda_dirs(names=None):
+    dirs = sorted(path.parent for path in LAMBDAS.glob("*/*/lambda_function.py"))
+    return [d for d in dirs if not names or d.name in names]
+
+
+def parse_importtime(stderr):
+    """
+    Returns:
+        tuple: (cumulative µs of lambda_function, {top-level import: cumulative µs})
+    """
+    total, top_level = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if name == "lambda_function":
+            total = int(cumulative)
+        elif depth == 1:
+            # Direct imports of lambda_function (depth 0 is the handler itself)
+            top_level[name] = int(cumulative)
+    return total, top_level
+
+
+def measure(directory, runs, static_data_dir):
+    env = {
+        **os.environ,
+        "STATIC_DATA_DIR": static_data_dir,
+        "STATIC_DATA_OFFLINE": "1",
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "eu-west-3"),
+        "AWS_ACCESS_KEY_ID": os.environ.get("AWS_ACCESS_KEY_ID", "import-time"),
+        "AWS_SECRET_ACCESS_KEY": os.environ.get("AWS_SECRET_ACCESS_KEY", "import-time"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    totals, top_level, loaded = [], {}, []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(heavy=HEAVY)],
+            cwd=directory,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"{directory.name}: {completed.stderr.strip().splitlines()[-1]}")
+        total, imports = parse_importtime(completed.stderr)
+        totals.append(total / 1000)
+        for name, micros in imports.items():
+            top_level.setdefault(name, []).append(micros / 1000)
+        loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    heaviest = sorted(
+        ((name, statistics.median(values)) for name, values in top_level.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "import_ms": round(min(totals), 1),
+        "median_ms": round(statistics.median(totals), 1),
+        "heaviest": {name: round(ms, 1) for name, ms in heaviest[:5]},
+        "heavy_packages": loaded,
+    }
+
+
+def print_report(results, baseline=None):
+    print(f"{'lambda':<24}{'import ms':>11}{'median':>9}{'vs base':>10}  heavy packages loaded")
+    for name, result in results.items():
+        previous = (baseline or {}).get("results", {}).get(name)
+        change = f"{(result['import_ms'] / previous['import_ms'] - 1) * 100:+.0f}%" if previous else ""
+        print(
+            f"{name:<24}{result['import_ms']:>11.1f}{result['median_ms']:>9.1f}{change:>10}  "
+            f"{', '.join(result['heavy_packages']) or '-'}"
+        )
+        heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in result["heaviest"].items())
+        print(f"{'':<24}  {heaviest}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lambda import time benchmark")
+    parser.add_argument("--lambdas", nargs="+", help="Lambda directory names (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per Lambda")
+    parser.add_argument("--baseline", help="Compare with this baseline, exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed import time increase")
+    args = parser.parse_args(argv)
+
+    static_data_dir = tempfile.mkdtemp(prefix="import_time_ddragon_")
+    seed_static_data(static_data_dir)
+    results = {
+        directory.name: measure(directory, args.runs, static_data_dir)
+        for directory in lambda_dirs(args.lambdas)
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version.split()[0], "results": results}, file, indent=2)
+        print(f"\n💾 Baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        found = [
+            (name, baseline["results"][name]["import_ms"], result["import_ms"])
+            for name, result in results.items()
+            if name in baseline.get("results", {})
+            # The absolute slack absorbs noise on handlers importing in a few ms
+            and result["import_ms"] > baseline["results"][name]["import_ms"] * (1 + args.threshold) + 5
+        ]
+        if found:
+            print("\n❌ Regressions:")
+            for name, previous, current in found:
+                print(f"  {name}: {previous} ms -> {current} ms")
+            sys.exit(1)
+        print("\n✅ No regression")
+
+
+if __name__ == "__main__":
+    main()
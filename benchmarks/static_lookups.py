@@ -0,0 +1,206 @@
+"""
+Item and rune name lookups of the summary table
+
+Compares the previous per-participant extraction (walking the raw item.json
+with `str(item_id)` keys for every slot, re-walking `perks.styles` for every
+rune field) with the compiled int-keyed tables of `module/static_data.py`
+used by `get_data_player_infos`. Runs offline on synthetic participants
+and Data Dragon-shaped static data.
+
+Usage:
+    python benchmarks/static_lookups.py --participants 10000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "collection" / "league_api_call"))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-3")
+
+STYLES = {8000: "Precision", 8100: "Domination", 8200: "Sorcery", 8300: "Inspiration", 8400: "Resolve"}
+
+
+def synthetic_static_data():
+    items_data = {
+        "data": {str(item_id): {"name": f"Item {item_id}", "gold": {"total": 3000}} for item_id in range(1001, 1701)}
+    }
+    runes_data = [
+        {
+            "id": style_id,
+            "key": name,
+            "name": name,
+            "slots": [
+                {"runes": [{"id": style_id + 10 * slot + n, "name": f"{name} {slot}.{n}"} for n in range(3)]}
+                for slot in range(4)
+            ],
+        }
+        for style_id, name in STYLES.items()
+    ]
+    return items_data, runes_data
+
+
+def synthetic_participants(rng, count):
+    style_ids = list(STYLES)
+    participants = []
+    for _ in range(count):
+        primary, sub = rng.sample(style_ids, 2)
+        participant = {
+            "championName": "Ahri",
+            "championId": 103,
+            "totalMinionsKilled": rng.randint(50, 300),
+            "neutralMinionsKilled": rng.randint(0, 50),
+            "perks": {
+                "styles": [
+                    {"style": primary, "selections": [{"perk": primary + rng.randint(0, 2)}]},
+                    {"style": sub, "selections": [{"perk": sub + 10}]},
+                ]
+            },
+            "challenges": {"kda": rng.random() * 5},
+        }
+        for slot in range(7):
+            participant[f"item{slot}"] = rng.choice([0, rng.randint(1001, 1700)])
+        participants.append(participant)
+    return participants
+
+
+def legacy_row(match_data, player, items_data, runes):
+    # Previous get_data_player_infos, kept verbatim for comparison
+    def get_item_name(item_id, items_data):
+        if not item_id:
+            return None
+        return items_data.get("data", {}).get(str(item_id), {}).get("name", None)
+
+    data_player_json = {
+        "matchId": match_data.get("metadata", {}).get("matchId"),
+        "gameCreation": match_data.get("info", {}).get("gameCreation"),
+        "gameDuration": match_data.get("info", {}).get("gameDuration"),
+        "gameMode": match_data.get("info", {}).get("gameMode"),
+        "queueId": match_data.get("info", {}).get("queueId"),
+        "queueType": {420: "5v5 Ranked Solo games", 440: "5v5 Ranked Flex games"}.get(
+            match_data.get("info", {}).get("queueId"), "Other"
+        ),
+        "champion_name": player.get("championName"),
+        "champion_id": player.get("championId"),
+        "teamPosition": player.get("teamPosition"),
+        "individualPosition": player.get("individualPosition"),
+        "player": player.get("riotIdGameName"),
+        "death_time": player.get("totalTimeSpentDead"),
+        "kills_amount": player.get("kills"),
+        "deaths_amount": player.get("deaths"),
+        "assists_amount": player.get("assists"),
+        "total_minions_killed": player.get("totalMinionsKilled"),
+        "neutralMinionsKilled": player.get("neutralMinionsKilled"),
+        "cs_score": player.get("totalMinionsKilled")
+        + player.get("neutralMinionsKilled"),
+        "total_damage_dealt": player.get("totalDamageDealt"),
+        "total_damage_to_champions": player.get("totalDamageDealtToChampions"),
+        "goldEarned": player.get("goldEarned"),
+        "totalDamageTaken": player.get("totalDamageTaken"),
+        "win": player.get("win"),
+        "items_0": get_item_name(player.get("item0"), items_data),
+        "items_1": get_item_name(player.get("item1"), items_data),
+        "items_2": get_item_name(player.get("item2"), items_data),
+        "items_3": get_item_name(player.get("item3"), items_data),
+        "items_4": get_item_name(player.get("item4"), items_data),
+        "items_5": get_item_name(player.get("item5"), items_data),
+        "items_6": get_item_name(player.get("item6"), items_data),
+        "summoner1Id": player.get("summoner1Id"),
+        "summoner2Id": player.get("summoner2Id"),
+        "primaryStyle": player.get("perks", {}).get("styles", [{}])[0].get("style"),
+        "primaryStyle_name": runes.get("style").get(
+            player.get("perks", {}).get("styles", [{}])[0].get("style")
+        ),
+        "subStyle": player.get("perks", {}).get("styles", [{}])[1].get("style")
+        if len(player.get("perks", {}).get("styles", [])) > 1
+        else None,
+        "subStyle_name": runes.get("style").get(
+            player.get("perks", {}).get("styles", [{}])[1].get("style")
+            if len(player.get("perks", {}).get("styles", [])) > 1
+            else None
+        ),
+        "primaryPerk": player.get("perks", {})
+        .get("styles", [{}])[0]
+        .get("selections", [{}])[0]
+        .get("perk"),
+        "primaryPerk_name": runes.get("perk").get(
+            player.get("perks", {})
+            .get("styles", [{}])[0]
+            .get("selections", [{}])[0]
+            .get("perk")
+        ),
+        "pentakills": player.get("pentaKills"),
+        "quadra_kills": player.get("quadraKills"),
+        "triple_kills": player.get("tripleKills"),
+        "skillshots_hit": player.get("skillshotsHit"),
+        "first_blood_kill": player.get("firstBloodKill"),
+        "dragon_takedowns": player.get("challenges", {}).get("dragonTakedowns"),
+        "team_baron_kills": player.get("challenges", {}).get("teamBaronKills"),
+        "visionScore": player.get("visionScore"),
+        "wards_placed": player.get("wardsPlaced"),
+        "wards_killed": player.get("wardsKilled"),
+        "individual_position": player.get("individualPosition"),
+        "kda": player.get("challenges", {}).get("kda"),
+        "epic_monster_steals": player.get("challenges", {}).get("epicMonsterSteals"),
+    }
+    return data_player_json
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static data lookup benchmark")
+    parser.add_argument("--participants", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from module.parsing_template import get_data_player_infos
+    from module.static_data import compile_item_names, compile_rune_names
+
+    rng = random.Random(args.seed)
+    items_data, runes_data = synthetic_static_data()
+    participants = synthetic_participants(rng, args.participants)
+    match_data = {"metadata": {"matchId": "EUW1_1"}, "info": {"gameDuration": 1800, "queueId": 420}}
+
+    started = time.perf_counter()
+    item_names = compile_item_names(items_data)
+    runes = compile_rune_names(runes_data)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    # Same names either way
+    for player in participants[:100]:
+        legacy = legacy_row(match_data, player, items_data, runes)
+        current = get_data_player_infos(match_data, player, item_names, runes)
+        assert legacy == current, (legacy, current)
+
+    legacy = timed(
+        lambda: [legacy_row(match_data, p, items_data, runes) for p in participants],
+        args.repeat,
+    )
+    compiled = timed(
+        lambda: [get_data_player_infos(match_data, p, item_names, runes) for p in participants],
+        args.repeat,
+    )
+
+    print(f"participants:                  {args.participants}")
+    print(f"compile tables (once/patch):   {compile_ms:8.2f} ms")
+    print(f"nested walks (previous):       p50 {statistics.median(legacy):8.2f} ms")
+    print(f"compiled tables:               p50 {statistics.median(compiled):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Size and speed of the stored JSON formats
+
+Encodes synthetic match and timeline documents the way the collector used to
+store them (indented `json.dumps`) and with the serializer of the Lambdas
+(`module/serialization.py`: compact JSON, orjson when installed, gzip or
+zstd), and reports bytes per document and encode/decode time.
+
+Usage:
+    python benchmarks/storage_format.py --games 20
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "collection" / "league_api_call"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic_games  # noqa: E402
+from module import serialization  # noqa: E402
+
+
+def legacy_dumps(obj):
+    return json.dumps(obj, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def formats():
+    """{name: (encode, decode)}"""
+    found = {
+        "indent=4 (before)": (legacy_dumps, json.loads),
+        "compact json": (stdlib_dumps, json.loads),
+    }
+    if serialization.orjson is not None:
+        found["compact orjson"] = (serialization.dumps, serialization.loads)
+    for compression in ("gzip", "zstd"):
+        _, encoding = serialization.compress(b"{}", compression)
+        if encoding != compression:
+            continue
+        found[f"compact + {compression}"] = (
+            lambda obj, compression=compression: serialization.compress(
+                serialization.dumps(obj), compression
+            )[0],
+            serialization.loads,
+        )
+    return found
+
+
+def measure(documents, encode, decode):
+    sizes, encode_ms, decode_ms = [], [], []
+    for document in documents:
+        started = time.perf_counter()
+        body = encode(document)
+        encoded = time.perf_counter()
+        decode(body)
+        decode_ms.append((time.perf_counter() - encoded) * 1000)
+        encode_ms.append((encoded - started) * 1000)
+        sizes.append(len(body))
+    return {
+        "kib": round(statistics.mean(sizes) / 1024, 1),
+        "encode_ms": round(statistics.median(encode_ms), 2),
+        "decode_ms": round(statistics.median(decode_ms), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stored JSON format benchmark")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    games = [
+        synthetic_games.game(synthetic_games.match_id(index, 0), seed=args.seed)[:2]
+        for index in range(args.games)
+    ]
+    documents = {
+        "match": [match for match, _ in games],
+        "timeline": [timeline for _, timeline in games],
+    }
+
+    print(f"{'document':<10}{'format':<22}{'KiB':>9}{'encode ms':>11}{'decode ms':>11}")
+    for kind, docs in documents.items():
+        baseline = None
+        for name, (encode, decode) in formats().items():
+            result = measure(docs, encode, decode)
+            baseline = baseline or result["kib"]
+            print(
+                f"{kind:<10}{name:<22}{result['kib']:>9.1f}{result['encode_ms']:>11.2f}"
+                f"{result['decode_ms']:>11.2f}  ({result['kib'] / baseline:.0%})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1448 @@
+"""
+Synthetic Riot API payloads
+
+Seeded, schema-faithful match-v5 / timeline-v5 documents (and the account,
+league, summoner and mastery answers around them) for offline benchmarks
+and scale tests.
+
+A game is simulated minute by minute: farming, gold and experience, item
+purchases, kills (first blood, multi-kills, aces), wards, epic monsters,
+turret plates and structures, recorded as timeline frames every 60 s. The
+match document comes from the same simulation, so its totals (K/D/A, CS,
+gold, wards, objectives, final items) agree with the timeline events.
+
+A game only depends on its match ID, the seed and its shape (`minutes`,
+`event_density`), so the fake Riot server can serve any player or match
+without storing anything, and a corpus can be regenerated anywhere.
+
+Stream games to disk (one JSON document per line, gzip with .gz):
+    python benchmarks/synthetic_games.py --games 1000000 --out ./synthetic \
+        --format jsonl --compress --workers 8
+
+or in the S3 player folder layout read by `coach_pipeline.py`:
+    python benchmarks/synthetic_games.py --games 200 --out ./corpus --format corpus
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+PLATFORM = "EUW1"
+GAME_VERSION = "15.19.712.2345"
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+CHAMPIONS = [
+    (266, "Aatrox"), (103, "Ahri"), (84, "Akali"), (12, "Alistar"), (32, "Amumu"),
+    (22, "Ashe"), (53, "Blitzcrank"), (63, "Brand"), (51, "Caitlyn"), (122, "Darius"),
+    (119, "Draven"), (81, "Ezreal"), (114, "Fiora"), (86, "Garen"), (104, "Graves"),
+    (39, "Irelia"), (59, "JarvanIV"), (222, "Jinx"), (145, "Kaisa"), (64, "LeeSin"),
+    (99, "Lux"), (21, "MissFortune"), (25, "Morgana"), (111, "Nautilus"), (61, "Orianna"),
+    (78, "Poppy"), (92, "Riven"), (235, "Senna"), (412, "Thresh"), (67, "Vayne"),
+    (112, "Viktor"), (157, "Yasuo"), (238, "Zed"), (143, "Zyra"),
+]
+# Item ID -> (price, kind)
+ITEMS = {
+    1054: (450, "starter"), 1055: (450, "starter"), 1056: (400, "starter"),
+    1101: (450, "jungle_starter"), 1102: (450, "jungle_starter"), 1103: (450, "jungle_starter"),
+    3865: (400, "support_starter"),
+    1001: (300, "boots"),
+    3006: (1000, "boots2"), 3020: (800, "boots2"), 3047: (800, "boots2"),
+    3111: (800, "boots2"), 3158: (600, "boots2"),
+    1026: (850, "component"), 1028: (400, "component"), 1029: (300, "component"),
+    1031: (800, "component"), 1033: (400, "component"), 1036: (350, "component"),
+    1037: (875, "component"), 1038: (1300, "component"), 1042: (250, "component"),
+    1052: (435, "component"), 1058: (1250, "component"),
+    3031: (3450, "legendary"), 3036: (3000, "legendary"), 3068: (2900, "legendary"),
+    3072: (3400, "legendary"), 3074: (3300, "legendary"), 3075: (2450, "legendary"),
+    3089: (3600, "legendary"), 3094: (2650, "legendary"), 3143: (2700, "legendary"),
+    3153: (3200, "legendary"), 3157: (3250, "legendary"), 3165: (2200, "legendary"),
+    3742: (2900, "legendary"), 6653: (3000, "legendary"), 6655: (2900, "legendary"),
+    6672: (3000, "legendary"), 6673: (2600, "legendary"),
+    2003: (50, "consumable"), 2055: (75, "consumable"),
+    3340: (0, "trinket"), 3363: (0, "trinket"), 3364: (0, "trinket"),
+}
+ITEM_NAMES = {
+    1054: "Doran's Shield", 1055: "Doran's Blade", 1056: "Doran's Ring",
+    1101: "Scorchclaw Pup", 1102: "Gustwalker Hatchling", 1103: "Mosstomper Seedling",
+    3865: "World Atlas", 1001: "Boots", 3006: "Berserker's Greaves",
+    3020: "Sorcerer's Shoes", 3047: "Plated Steelcaps", 3111: "Mercury's Treads",
+    3158: "Ionian Boots of Lucidity", 1026: "Blasting Wand", 1028: "Ruby Crystal",
+    1029: "Cloth Armor", 1031: "Chain Vest", 1033: "Null-Magic Mantle",
+    1036: "Long Sword", 1037: "Pickaxe", 1038: "B. F. Sword", 1042: "Dagger",
+    1052: "Amplifying Tome", 1058: "Needlessly Large Rod", 3031: "Infinity Edge",
+    3036: "Lord Dominik's Regards", 3068: "Sunfire Aegis", 3072: "Bloodthirster",
+    3074: "Ravenous Hydra", 3075: "Thornmail", 3089: "Rabadon's Deathcap",
+    3094: "Rapid Firecannon", 3143: "Randuin's Omen", 3153: "Blade of The Ruined King",
+    3157: "Zhonya's Hourglass", 3165: "Morellonomicon", 3742: "Dead Man's Plate",
+    6653: "Liandry's Torment", 6655: "Luden's Companion", 6672: "Kraken Slayer",
+    6673: "Immortal Shieldbow", 2003: "Health Potion", 2055: "Control Ward",
+    3340: "Stealth Ward", 3363: "Farsight Alteration", 3364: "Oracle Lens",
+}
+ITEMS_BY_KIND = {}
+for _item_id, (_price, _kind) in ITEMS.items():
+    ITEMS_BY_KIND.setdefault(_kind, []).append(_item_id)
+STYLES = {
+    8000: [8005, 8008, 8021, 8010],
+    8100: [8112, 8128, 9923],
+    8200: [8214, 8229, 8230],
+    8300: [8351, 8360, 8369],
+    8400: [8437, 8439, 8465],
+}
+SUMMONER_SPELLS = [4, 14, 12, 11, 7, 3, 21]
+
+DEFAULT_MINUTES = (15, 45)
+FRAME_INTERVAL_MS = 60_000
+MAP_SIZE = 14_800
+# Cumulative experience needed for levels 2..18
+XP_LEVELS = [280, 660, 1140, 1720, 2400, 3180, 4060, 5040, 6120, 7300, 8580,
+             9960, 11440, 13020, 14700, 16480, 18360]
+# Lane anchors (blue side; red positions are mirrored through the map center)
+LANE_ANCHORS = {
+    "TOP": (1800, 11800), "MIDDLE": (6700, 6900), "BOTTOM": (11800, 1800),
+    "UTILITY": (11500, 2100), "JUNGLE": (4800, 6300),
+}
+FOUNTAIN = (550, 550)
+# Blue side structures per lane: outer, inner, base turrets then inhibitor
+STRUCTURES = {
+    "TOP_LANE": [(981, 10441), (1512, 6699), (1169, 4287), (1171, 3571)],
+    "MID_LANE": [(5846, 6396), (5048, 4812), (3651, 3696), (3203, 3208)],
+    "BOT_LANE": [(10504, 1029), (6919, 1483), (4281, 1253), (3452, 1236)],
+}
+NEXUS_TURRETS = [(1748, 2270), (2177, 1807)]
+MIRRORED_LANE = {"TOP_LANE": "BOT_LANE", "MID_LANE": "MID_LANE", "BOT_LANE": "TOP_LANE"}
+TOWER_TYPES = ["OUTER_TURRET", "INNER_TURRET", "BASE_TURRET"]
+PITS = {"DRAGON": (9866, 4414), "BARON_NASHOR": (5007, 10471)}
+DRAGON_TYPES = ["FIRE_DRAGON", "WATER_DRAGON", "EARTH_DRAGON", "AIR_DRAGON",
+                "HEXTECH_DRAGON", "CHEMTECH_DRAGON"]
+SEASON_SPAN_DAYS = 270
+
+
+def player_riot_id(index):
+    return f"Bench{index}", "BNCH"
+
+
+def player_puuid(gamename, gametag):
+    return f"bench-puuid-{gamename.lower()}-{gametag.lower()}"
+
+
+def match_id(player_index, game_index):
+    """Match IDs encode their player so any of them can be served on demand"""
+    return f"{PLATFORM}_{7_000_000_000 + player_index * 10_000 + game_index}"
+
+
+def player_of_match(match_id_):
+    number = int(match_id_.split("_", 1)[1]) - 7_000_000_000
+    return number // 10_000, number % 10_000
+
+
+def _rng(*key, seed=0):
+    return random.Random("/".join(str(part) for part in (seed,) + key))
+
+
+def account(gamename, gametag):
+    return {"puuid": player_puuid(gamename, gametag), "gameName": gamename, "tagLine": gametag}
+
+
+def league_entries(puuid, seed=0):
+    rng = _rng("league", puuid, seed=seed)
+    wins, losses = rng.randint(10, 200), rng.randint(10, 200)
+    return [
+        {
+            "leagueId": f"league-{rng.randint(1, 10**6)}",
+            "queueType": "RANKED_SOLO_5x5",
+            "tier": rng.choice(["IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND"]),
+            "rank": rng.choice(["I", "II", "III", "IV"]),
+            "puuid": puuid,
+            "leaguePoints": rng.randint(0, 99),
+            "wins": wins,
+            "losses": losses,
+            "veteran": False,
+            "inactive": False,
+            "freshBlood": rng.random() < 0.2,
+            "hotStreak": rng.random() < 0.1,
+        }
+    ]
+
+
+def summoner(puuid, seed=0):
+    rng = _rng("summoner", puuid, seed=seed)
+    return {
+        "puuid": puuid,
+        "profileIconId": rng.randint(1, 6000),
+        "revisionDate": int(time.time() * 1000),
+        "summonerLevel": rng.randint(30, 900),
+    }
+
+
+def masteries(puuid, seed=0):
+    rng = _rng("masteries", puuid, seed=seed)
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            "puuid": puuid,
+            "championId": champion_id,
+            "championLevel": rng.randint(1, 50),
+            "championPoints": rng.randint(1000, 800_000),
+            "lastPlayTime": now_ms - rng.randint(0, 200) * 86_400_000,
+            "championPointsSinceLastLevel": rng.randint(0, 10_000),
+            "championPointsUntilNextLevel": rng.randint(0, 10_000),
+            "tokensEarned": rng.randint(0, 3),
+            "markRequiredForNextLevel": rng.randint(0, 3),
+            "championSeasonMilestone": rng.randint(0, 4),
+        }
+        for champion_id, _ in rng.sample(CHAMPIONS, 15)
+    ]
+
+
+def match_ids(player_index, games, start=0, count=100):
+    return [match_id(player_index, n) for n in range(games)][start : start + count]
+
+
+# ----------------------
+# Game simulation
+# ----------------------
+
+
+def _poisson(rng, lam):
+    """Number of events of a Poisson process of mean `lam`"""
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    threshold, n, product = math.exp(-lam), 0, rng.random()
+    while product > threshold:
+        n += 1
+        product *= rng.random()
+    return n
+
+
+def _mirror(position, team_id):
+    x, y = position
+    return (x, y) if team_id == 100 else (MAP_SIZE - x, MAP_SIZE - y)
+
+
+def _level(xp):
+    return 1 + sum(1 for threshold in XP_LEVELS if xp >= threshold)
+
+
+class _Player:
+    """Running state of one participant"""
+
+    def __init__(self, rng, participant_id, puuid, name, tag, champion, position, team_id):
+        self.participant_id = participant_id
+        self.puuid = puuid
+        self.name = name
+        self.tag = tag
+        self.champion_id, self.champion = champion
+        self.position = position
+        self.team_id = team_id
+        self.magic = rng.random() < 0.45
+        self.skill = rng.uniform(0.85, 1.15)
+        self.xp = 0.0
+        self.level = 1
+        self.total_gold = 500.0
+        self.current_gold = 500.0
+        self.spent = 0
+        self.cs = 0.0
+        self.jungle_cs = 0.0
+        self.kills = self.deaths = self.assists = 0
+        self.streak = 0
+        self.largest_spree = 0
+        self.sprees = 0
+        self.multi = 0
+        self.last_kill_ms = -10**9
+        self.multikills = {2: 0, 3: 0, 4: 0, 5: 0}
+        self.dead_until_ms = 0
+        self.time_dead = 0.0
+        self.longest_alive = 0.0
+        self.alive_since_ms = 0
+        self.first_blood_kill = self.first_blood_assist = False
+        self.first_tower_kill = self.first_tower_assist = False
+        self.turret_kills = self.turret_takedowns = self.inhibitor_kills = 0
+        self.inhibitor_takedowns = self.plates = 0
+        self.dragon_kills = self.baron_kills = 0
+        self.dragon_takedowns = self.baron_takedowns = self.herald_takedowns = 0
+        self.wards_placed = self.wards_killed = self.control_wards_placed = 0
+        self.control_wards_bought = self.control_wards_held = 0
+        self.consumables = self.items_purchased = 0
+        self.inventory = []
+        self.components = []
+        self.target = None
+        self.trinket = 3340
+        self.skill_points = [0, 0, 0, 0]
+        self.cc_seconds = 0.0
+        self.enemy_cc_seconds = 0.0
+        self.damage = {
+            key: 0.0
+            for key in (
+                "magicDamageDone", "magicDamageDoneToChampions", "magicDamageTaken",
+                "physicalDamageDone", "physicalDamageDoneToChampions", "physicalDamageTaken",
+                "trueDamageDone", "trueDamageDoneToChampions", "trueDamageTaken",
+                "totalDamageDoneToBuildings", "totalDamageDoneToObjectives",
+                "damageSelfMitigated", "totalHeal", "totalHealsOnTeammates",
+                "totalDamageShieldedOnTeammates",
+            )
+        }
+
+    def alive(self, timestamp_ms):
+        return timestamp_ms >= self.dead_until_ms
+
+    def earn(self, gold):
+        self.total_gold += gold
+        self.current_gold += gold
+
+    def deal(self, to_champions, total, rng):
+        """Split dealt damage into physical/magic/true"""
+        true_share = rng.uniform(0.02, 0.08)
+        main, other = ("magic", "physical") if self.magic else ("physical", "magic")
+        for amount, suffix in ((to_champions, "ToChampions"), (total, "")):
+            self.damage[f"{main}DamageDone{suffix}"] += amount * (0.85 - true_share)
+            self.damage[f"{other}DamageDone{suffix}"] += amount * 0.15
+            self.damage[f"trueDamageDone{suffix}"] += amount * true_share
+        return to_champions
+
+    def take(self, amount, rng):
+        physical = rng.uniform(0.35, 0.65)
+        self.damage["physicalDamageTaken"] += amount * physical
+        self.damage["magicDamageTaken"] += amount * (0.95 - physical)
+        self.damage["trueDamageTaken"] += amount * 0.05
+        self.damage["damageSelfMitigated"] += amount * rng.uniform(0.4, 1.2)
+
+    def damage_total(self, kind):
+        return sum(self.damage[f"{t}Damage{kind}"] for t in ("magic", "physical", "true"))
+
+
+class _GameSimulation:
+    def __init__(self, match_id_, seed, minutes, event_density, season_start):
+        rng = self.rng = _rng("game", match_id_, seed=seed)
+        self.match_id = match_id_
+        self.density = event_density
+        low, high = minutes
+        self.duration = int(rng.uniform(low * 60, high * 60))
+        self.duration_ms = self.duration * 1000 + rng.randint(0, 999)
+        self.winner = 100 if rng.random() < 0.5 else 200
+        self.surrender = self.duration < 30 * 60 and rng.random() < 0.35
+        season_start = season_start or datetime(datetime.now().year, 1, 1)
+        self.creation_ms = int(
+            (season_start.timestamp() + rng.uniform(0, SEASON_SPAN_DAYS * 86_400)) * 1000
+        )
+
+        player_index, _ = player_of_match(match_id_)
+        gamename, gametag = player_riot_id(player_index)
+        player_slot = rng.randrange(10)
+        champions = rng.sample(CHAMPIONS, 20)
+        self.bans = champions[10:]
+        self.players = []
+        for slot in range(10):
+            if slot == player_slot:
+                name, tag = gamename, gametag
+            else:
+                name, tag = f"Filler{rng.randint(1, 10**6)}", "FILL"
+            self.players.append(
+                _Player(
+                    rng, slot + 1, player_puuid(name, tag), name, tag, champions[slot],
+                    POSITIONS[slot % 5], 100 if slot < 5 else 200,
+                )
+            )
+        self.by_id = {p.participant_id: p for p in self.players}
+        self.teams = {
+            team_id: [p for p in self.players if p.team_id == team_id] for team_id in (100, 200)
+        }
+        self.first = {}
+        self.objectives = {
+            team_id: {k: 0 for k in ("baron", "champion", "dragon", "horde", "inhibitor", "riftHerald", "tower")}
+            for team_id in (100, 200)
+        }
+        # Structures still standing, per owning team: [(lane, tier)], tier 3 = inhibitor
+        self.standing = {
+            team_id: {lane: 0 for lane in STRUCTURES} for team_id in (100, 200)
+        }
+        self.nexus_turrets = {100: 2, 200: 2}
+        self.plates = {team_id: {lane: 5 for lane in STRUCTURES} for team_id in (100, 200)}
+        self.spawns = {"DRAGON": 300_000, "HORDE": 480_000, "RIFTHERALD": 900_000, "BARON_NASHOR": 1_200_000}
+        self.horde_left = 3
+        self.first_blood = False
+        self.pending = []
+        self.frames = []
+
+    # ----------------------
+    # Helpers
+    # ----------------------
+
+    def progress(self, timestamp_ms):
+        return min(1.0, timestamp_ms / self.duration_ms)
+
+    def enemy(self, team_id):
+        return 300 - team_id
+
+    def alive(self, team_id, timestamp_ms, exclude=()):
+        return [
+            p for p in self.teams[team_id]
+            if p.alive(timestamp_ms) and p.participant_id not in exclude
+        ]
+
+    def position(self, player, timestamp_ms):
+        rng = self.rng
+        if not player.alive(timestamp_ms):
+            return _mirror(FOUNTAIN, player.team_id)
+        if timestamp_ms < 840_000:
+            anchor = LANE_ANCHORS[player.position]
+            spread = 900
+        else:
+            anchor = rng.choice([LANE_ANCHORS["MIDDLE"], PITS["DRAGON"], PITS["BARON_NASHOR"], LANE_ANCHORS[player.position]])
+            spread = 1800
+        x, y = _mirror(anchor, player.team_id) if anchor in LANE_ANCHORS.values() else anchor
+        return (
+            int(min(MAP_SIZE, max(0, rng.gauss(x, spread)))),
+            int(min(MAP_SIZE, max(0, rng.gauss(y, spread)))),
+        )
+
+    def event_position(self, player, timestamp_ms):
+        x, y = self.position(player, timestamp_ms)
+        return {"x": x, "y": y}
+
+    def takers(self, team_id, timestamp_ms, killer, most):
+        """Assisting participants of a takedown"""
+        candidates = self.alive(team_id, timestamp_ms, exclude=(killer.participant_id,))
+        count = min(len(candidates), self.rng.randint(0, most))
+        return sorted(p.participant_id for p in self.rng.sample(candidates, count))
+
+    # ----------------------
+    # Economy
+    # ----------------------
+
+    def farm(self, player, start_ms, end_ms, events):
+        rng = self.rng
+        minutes = (end_ms - start_ms) / 60_000
+        if end_ms > 65_000:
+            player.earn(2.04 * (end_ms - max(start_ms, 65_000)) / 1000)
+        if end_ms <= 90_000:
+            return
+        if player.position == "JUNGLE":
+            jungle = max(0.0, rng.gauss(5.0, 1.0)) * minutes * player.skill
+            lane = max(0.0, rng.gauss(0.4, 0.3)) * minutes
+            player.jungle_cs += jungle
+            player.earn(jungle * 32)
+        elif player.position == "UTILITY":
+            lane = max(0.0, rng.gauss(1.0, 0.6)) * minutes
+            player.earn(minutes * 45)
+        else:
+            lane = max(0.0, rng.gauss(7.0, 1.3)) * minutes * player.skill
+            if end_ms > 840_000 and rng.random() < 0.3:
+                player.jungle_cs += rng.uniform(0, 3)
+        player.cs += lane
+        player.earn(lane * 21)
+        xp_rate = {"UTILITY": 250, "JUNGLE": 360}.get(player.position, 380)
+        self.gain_xp(player, max(0.0, rng.gauss(xp_rate, 50)) * minutes, rng.randint(start_ms + 1, end_ms - 1), events)
+
+        player.deal(
+            max(0.0, rng.gauss(420 if player.position != "UTILITY" else 180, 120)) * minutes,
+            max(0.0, rng.gauss(3000 if player.position != "UTILITY" else 700, 600)) * minutes,
+            rng,
+        )
+        player.take(max(0.0, rng.gauss(800, 200)) * minutes, rng)
+        player.damage["totalHeal"] += rng.uniform(50, 400) * minutes
+        if player.position == "UTILITY":
+            player.damage["totalHealsOnTeammates"] += rng.uniform(0, 250) * minutes
+            player.damage["totalDamageShieldedOnTeammates"] += rng.uniform(0, 300) * minutes
+        player.cc_seconds += rng.uniform(0, 6) * minutes
+        player.enemy_cc_seconds += rng.uniform(0, 5) * minutes
+
+    def gain_xp(self, player, xp, timestamp_ms, events=None):
+        player.xp += xp
+        level = min(18, _level(player.xp))
+        while player.level < level:
+            player.level += 1
+            if events is not None:
+                self.level_up(player, timestamp_ms, events)
+
+    def level_up(self, player, timestamp_ms, events):
+        rng = self.rng
+        events.append(
+            {"level": player.level, "participantId": player.participant_id, "timestamp": timestamp_ms, "type": "LEVEL_UP"}
+        )
+        slots = [1, 2, 3] if player.level not in (6, 11, 16) else [4]
+        slot = rng.choice([s for s in slots if player.skill_points[s - 1] < (3 if s == 4 else 5)] or [1])
+        player.skill_points[slot - 1] += 1
+        events.append(
+            {
+                "levelUpType": "NORMAL",
+                "participantId": player.participant_id,
+                "skillSlot": slot,
+                "timestamp": timestamp_ms + rng.randint(100, 3000),
+                "type": "SKILL_LEVEL_UP",
+            }
+        )
+
+    def item_event(self, event_type, player, item_id, timestamp_ms, events):
+        event = {"participantId": player.participant_id, "timestamp": timestamp_ms, "type": event_type}
+        if event_type == "ITEM_UNDO":
+            event.update(afterId=0, beforeId=item_id, goldGain=ITEMS[item_id][0])
+        else:
+            event["itemId"] = item_id
+        events.append(event)
+
+    def buy(self, player, item_id, timestamp_ms, events):
+        price = ITEMS[item_id][0]
+        player.current_gold -= price
+        player.spent += price
+        player.items_purchased += 1
+        self.item_event("ITEM_PURCHASED", player, item_id, timestamp_ms, events)
+
+    def shop(self, player, timestamp_ms, events):
+        """A recall: spend the current gold on the next items of the build"""
+        rng = self.rng
+        t = timestamp_ms
+        if not player.inventory and not player.spent:
+            starter = {
+                "JUNGLE": "jungle_starter", "UTILITY": "support_starter"
+            }.get(player.position, "starter")
+            item_id = rng.choice(ITEMS_BY_KIND[starter])
+            self.buy(player, item_id, t, events)
+            player.inventory.append(item_id)
+            for _ in range(1 if player.position in ("JUNGLE", "UTILITY") else 2):
+                self.buy(player, 2003, t + 200, events)
+                player.consumables += 1
+                events.append(
+                    {"participantId": player.participant_id, "timestamp": t + rng.randint(60_000, 240_000),
+                     "type": "ITEM_DESTROYED", "itemId": 2003}
+                )
+            # An occasional misclick
+            if rng.random() < 0.05:
+                self.item_event("ITEM_UNDO", player, 2003, t + 400, events)
+                player.current_gold += ITEMS[2003][0]
+                player.spent -= ITEMS[2003][0]
+            return
+
+        for _ in range(12):
+            t += rng.randint(300, 1500)
+            if 1001 not in player.inventory and not any(i in ITEMS_BY_KIND["boots2"] for i in player.inventory):
+                if player.current_gold >= 300 and timestamp_ms > 240_000 and len(player.inventory) < 6:
+                    self.buy(player, 1001, t, events)
+                    player.inventory.append(1001)
+                    continue
+            if 1001 in player.inventory and player.current_gold >= 1000 and timestamp_ms > 600_000:
+                item_id = rng.choice(ITEMS_BY_KIND["boots2"])
+                self.buy(player, item_id, t, events)
+                self.item_event("ITEM_DESTROYED", player, 1001, t, events)
+                player.inventory[player.inventory.index(1001)] = item_id
+                continue
+            if player.target is None:
+                player.target = rng.choice(
+                    [i for i in ITEMS_BY_KIND["legendary"] if i not in player.inventory]
+                )
+            price = ITEMS[player.target][0]
+            paid = sum(ITEMS[i][0] for i in player.components)
+            if player.current_gold >= price - paid:
+                if len(player.inventory) - len(player.components) >= 6:
+                    starters = [i for i in player.inventory if ITEMS[i][1].endswith("starter")]
+                    if not starters:
+                        break
+                    player.inventory.remove(starters[0])
+                    player.current_gold += ITEMS[starters[0]][0] * 0.4
+                    self.item_event("ITEM_SOLD", player, starters[0], t, events)
+                player.current_gold -= price - paid
+                player.spent += price - paid
+                player.items_purchased += 1
+                self.item_event("ITEM_PURCHASED", player, player.target, t, events)
+                for component in player.components:
+                    self.item_event("ITEM_DESTROYED", player, component, t, events)
+                    player.inventory.remove(component)
+                player.inventory.append(player.target)
+                player.components = []
+                player.target = None
+                continue
+            affordable = [
+                i for i in ITEMS_BY_KIND["component"]
+                if ITEMS[i][0] <= player.current_gold and ITEMS[i][0] <= price - paid
+            ]
+            if not affordable or len(player.inventory) >= 6:
+                break
+            item_id = rng.choice(affordable)
+            self.buy(player, item_id, t, events)
+            player.inventory.append(item_id)
+            player.components.append(item_id)
+
+        wards = 2 if player.position == "UTILITY" else 1
+        if player.current_gold >= 75 and rng.random() < (0.85 if player.position == "UTILITY" else 0.4):
+            for _ in range(min(wards, int(player.current_gold // 75))):
+                self.buy(player, 2055, t + 200, events)
+                player.control_wards_bought += 1
+                player.control_wards_held += 1
+                player.consumables += 1
+
+        # Trinket swap
+        if player.trinket == 3340 and timestamp_ms > 540_000:
+            swap = 3364 if player.position in ("UTILITY", "JUNGLE") else (3363 if player.level >= 9 and rng.random() < 0.3 else None)
+            if swap:
+                self.item_event("ITEM_DESTROYED", player, player.trinket, t + 300, events)
+                self.buy(player, swap, t + 300, events)
+                player.trinket = swap
+
+    # ----------------------
+    # Combat
+    # ----------------------
+
+    def kill(self, killer, victim, timestamp_ms, events, assists):
+        rng = self.rng
+        position = self.event_position(victim, timestamp_ms)
+        bounty = 300 if victim.streak < 3 else min(1000, 300 + 100 * (victim.streak - 2))
+        shutdown = 0 if victim.streak < 3 else min(700, 150 * (victim.streak - 2))
+        received = [
+            self.damage_entry(self.by_id[pid], rng) for pid in [killer.participant_id] + assists
+        ]
+        dealt = [self.damage_entry(victim, rng, target=self.by_id[pid]) for pid in [killer.participant_id] + assists[:2]]
+        event = {
+            "bounty": bounty,
+            "killStreakLength": killer.streak,
+            "killerId": killer.participant_id,
+            "position": position,
+            "shutdownBounty": shutdown,
+            "timestamp": timestamp_ms,
+            "type": "CHAMPION_KILL",
+            "victimDamageDealt": dealt,
+            "victimDamageReceived": received,
+            "victimId": victim.participant_id,
+        }
+        if assists:
+            event["assistingParticipantIds"] = assists
+        events.append(event)
+
+        for entry in received:
+            amount = entry["magicDamage"] + entry["physicalDamage"] + entry["trueDamage"]
+            self.by_id[entry["participantId"]].deal(amount, amount, rng)
+            victim.take(amount, rng)
+
+        # Killer
+        killer.kills += 1
+        killer.streak += 1
+        killer.largest_spree = max(killer.largest_spree, killer.streak)
+        if killer.streak == 3:
+            killer.sprees += 1
+        killer.earn(bounty + shutdown)
+        self.gain_xp(killer, 150 + 25 * victim.level, timestamp_ms, events)
+        if timestamp_ms - killer.last_kill_ms <= 10_000 and killer.multi < 5:
+            killer.multi += 1
+        else:
+            killer.multi = 1
+        killer.last_kill_ms = timestamp_ms
+        if killer.multi >= 2:
+            killer.multikills[killer.multi] += 1
+            if killer.multi > 2:
+                killer.multikills[killer.multi - 1] -= 1
+            events.append(
+                {
+                    "killType": "KILL_MULTI",
+                    "killerId": killer.participant_id,
+                    "multiKillLength": killer.multi,
+                    "position": position,
+                    "timestamp": timestamp_ms,
+                    "type": "CHAMPION_SPECIAL_KILL",
+                }
+            )
+        for pid in assists:
+            helper = self.by_id[pid]
+            helper.assists += 1
+            helper.earn(150 / len(assists))
+            self.gain_xp(helper, 60 + 10 * victim.level, timestamp_ms, events)
+
+        if not self.first_blood:
+            self.first_blood = True
+            killer.first_blood_kill = True
+            killer.earn(100)
+            for pid in assists:
+                self.by_id[pid].first_blood_assist = True
+            self.first.setdefault("champion", killer.team_id)
+            events.append(
+                {
+                    "killType": "KILL_FIRST_BLOOD",
+                    "killerId": killer.participant_id,
+                    "position": position,
+                    "timestamp": timestamp_ms,
+                    "type": "CHAMPION_SPECIAL_KILL",
+                }
+            )
+        self.objectives[killer.team_id]["champion"] += 1
+
+        # Victim
+        victim.deaths += 1
+        victim.streak = 0
+        victim.longest_alive = max(victim.longest_alive, (timestamp_ms - victim.alive_since_ms) / 1000)
+        death_timer = 6 + 2.5 * victim.level + max(0, timestamp_ms / 60_000 - 15) * 0.8
+        victim.dead_until_ms = timestamp_ms + int(death_timer * 1000)
+        victim.alive_since_ms = victim.dead_until_ms
+        victim.time_dead += death_timer
+
+        if not self.alive(victim.team_id, timestamp_ms + 1):
+            events.append(
+                {
+                    "killType": "KILL_ACE",
+                    "killerId": killer.participant_id,
+                    "position": position,
+                    "timestamp": timestamp_ms,
+                    "type": "CHAMPION_SPECIAL_KILL",
+                }
+            )
+
+    def damage_entry(self, source, rng, target=None):
+        base = rng.uniform(150, 900) * (1 + source.level / 6)
+        magic = base * (0.8 if source.magic else 0.15)
+        physical = base * (0.15 if source.magic else 0.8)
+        slot = rng.randint(0, 4)
+        return {
+            "basic": slot == 0,
+            "magicDamage": int(magic),
+            "name": source.champion,
+            "participantId": source.participant_id,
+            "physicalDamage": int(physical),
+            "spellName": f"{source.champion.lower()}basicattack" if slot == 0 else f"{source.champion.lower()}{'qwer'[slot - 1]}",
+            "spellSlot": 65 if slot == 0 else slot - 1,
+            "trueDamage": int(base * 0.05),
+            "type": "OTHER",
+        }
+
+    def fights(self, start_ms, end_ms, events):
+        rng = self.rng
+        minute = start_ms / 60_000
+        rate = 0.15 if minute < 3 else 1.0 if minute < 14 else 1.8 if minute < 25 else 2.2
+        for _ in range(_poisson(rng, rate * self.density * (end_ms - start_ms) / 60_000)):
+            timestamp = rng.randint(start_ms + 1, end_ms - 1)
+            advantage = 0.55 + 0.1 * self.progress(timestamp)
+            team = self.winner if rng.random() < advantage else self.enemy(self.winner)
+            attackers = self.alive(team, timestamp)
+            defenders = self.alive(self.enemy(team), timestamp)
+            if not attackers or not defenders:
+                continue
+            killer = rng.choice(attackers)
+            # Lane kills early, skirmishes later
+            opponents = [p for p in defenders if p.position == killer.position]
+            victim = opponents[0] if opponents and minute < 14 and rng.random() < 0.6 else rng.choice(defenders)
+            most = 1 if minute < 8 else 4
+            self.kill(killer, victim, timestamp, events, self.takers(team, timestamp, killer, most))
+            # Extended fights: the killer keeps going
+            while rng.random() < 0.18 * min(2.0, self.density) and timestamp < end_ms - 10_000:
+                timestamp += rng.randint(1000, 8000)
+                defenders = self.alive(self.enemy(team), timestamp)
+                if not defenders or not killer.alive(timestamp):
+                    break
+                victim = rng.choice(defenders)
+                self.kill(killer, victim, timestamp, events, self.takers(team, timestamp, killer, 4))
+
+    def vision(self, player, start_ms, end_ms, events):
+        rng = self.rng
+        if end_ms <= 90_000:
+            return
+        minutes = (end_ms - start_ms) / 60_000
+        rate = {"UTILITY": 1.1, "JUNGLE": 0.6}.get(player.position, 0.35)
+        for _ in range(_poisson(rng, rate * self.density * minutes)):
+            if player.control_wards_held and rng.random() < 0.5:
+                ward_type = "CONTROL_WARD"
+                player.control_wards_held -= 1
+                player.control_wards_placed += 1
+            elif player.trinket == 3363:
+                ward_type = "BLUE_TRINKET"
+            elif player.position == "UTILITY" and end_ms > 360_000:
+                ward_type = "SIGHT_WARD"
+            else:
+                ward_type = "YELLOW_TRINKET"
+            player.wards_placed += 1
+            events.append(
+                {
+                    "creatorId": player.participant_id,
+                    "timestamp": rng.randint(start_ms + 1, end_ms - 1),
+                    "type": "WARD_PLACED",
+                    "wardType": ward_type,
+                }
+            )
+        clear_rate = 0.35 if player.position in ("UTILITY", "JUNGLE") or player.trinket == 3364 else 0.12
+        for _ in range(_poisson(rng, clear_rate * self.density * minutes)):
+            player.wards_killed += 1
+            events.append(
+                {
+                    "killerId": player.participant_id,
+                    "timestamp": rng.randint(start_ms + 1, end_ms - 1),
+                    "type": "WARD_KILL",
+                    "wardType": rng.choice(["YELLOW_TRINKET", "SIGHT_WARD", "CONTROL_WARD", "UNDEFINED"]),
+                }
+            )
+
+    # ----------------------
+    # Objectives
+    # ----------------------
+
+    def monsters(self, start_ms, end_ms, events):
+        rng = self.rng
+        chances = {"DRAGON": 0.35, "HORDE": 0.45, "RIFTHERALD": 0.35, "BARON_NASHOR": 0.2}
+        for monster, spawn_ms in list(self.spawns.items()):
+            if spawn_ms is None or spawn_ms >= end_ms:
+                continue
+            if rng.random() > chances[monster] * (1 + self.progress(end_ms)):
+                continue
+            timestamp = rng.randint(max(start_ms, spawn_ms) + 1, end_ms - 1)
+            team = self.winner if rng.random() < 0.6 else self.enemy(self.winner)
+            takers = self.alive(team, timestamp)
+            if not takers:
+                continue
+            junglers = [p for p in takers if p.position == "JUNGLE"]
+            killer = junglers[0] if junglers and rng.random() < 0.75 else rng.choice(takers)
+            assists = self.takers(team, timestamp, killer, 4)
+            pit = PITS["DRAGON" if monster == "DRAGON" else "BARON_NASHOR"]
+            event = {
+                "bounty": 0,
+                "killerId": killer.participant_id,
+                "killerTeamId": team,
+                "monsterType": monster,
+                "position": {"x": pit[0], "y": pit[1]},
+                "timestamp": timestamp,
+                "type": "ELITE_MONSTER_KILL",
+            }
+            if assists:
+                event["assistingParticipantIds"] = assists
+            takedowns = [killer] + [self.by_id[pid] for pid in assists]
+
+            if monster == "DRAGON":
+                elder = max(self.objectives[t]["dragon"] for t in (100, 200)) >= 4
+                event["monsterSubType"] = "ELDER_DRAGON" if elder else rng.choice(DRAGON_TYPES)
+                self.objectives[team]["dragon"] += 1
+                self.first.setdefault("dragon", team)
+                killer.dragon_kills += 1
+                for p in takedowns:
+                    p.dragon_takedowns += 1
+                self.spawns[monster] = timestamp + 300_000 if not elder else timestamp + 360_000
+            elif monster == "HORDE":
+                self.objectives[team]["horde"] += 1
+                self.first.setdefault("horde", team)
+                self.horde_left -= 1
+                self.spawns[monster] = None if not self.horde_left else timestamp + rng.randint(1000, 20_000)
+            elif monster == "RIFTHERALD":
+                self.objectives[team]["riftHerald"] += 1
+                self.first.setdefault("riftHerald", team)
+                for p in takedowns:
+                    p.herald_takedowns += 1
+                self.spawns[monster] = None
+            else:
+                self.objectives[team]["baron"] += 1
+                self.first.setdefault("baron", team)
+                killer.baron_kills += 1
+                for p in takedowns:
+                    p.baron_takedowns += 1
+                for p in self.alive(team, timestamp):
+                    p.earn(300)
+                self.spawns[monster] = timestamp + 360_000
+            for p in takedowns:
+                p.damage["totalDamageDoneToObjectives"] += rng.uniform(1000, 6000)
+                self.gain_xp(p, 150, timestamp, events)
+            events.append(event)
+
+    def structure_kill(self, team, lane, tier, timestamp_ms, events, nexus=None):
+        """`team` destroys the given structure of the enemy team"""
+        rng = self.rng
+        owner = self.enemy(team)
+        takers = self.alive(team, timestamp_ms)
+        killer = rng.choice(takers) if takers and rng.random() < 0.85 else None
+        assists = self.takers(team, timestamp_ms, killer, 3) if killer else []
+        if nexus is not None:
+            position = _mirror(NEXUS_TURRETS[nexus], owner)
+            lane = "MID_LANE"
+        else:
+            blue_lane = lane if owner == 100 else MIRRORED_LANE[lane]
+            position = _mirror(STRUCTURES[blue_lane][tier], owner)
+        event = {
+            "bounty": 0 if tier == 3 else 250,
+            "buildingType": "INHIBITOR_BUILDING" if tier == 3 else "TOWER_BUILDING",
+            "killerId": killer.participant_id if killer else 0,
+            "laneType": lane,
+            "position": {"x": position[0], "y": position[1]},
+            "teamId": owner,
+            "timestamp": timestamp_ms,
+            "type": "BUILDING_KILL",
+        }
+        if tier != 3:
+            event["towerType"] = "NEXUS_TURRET" if nexus is not None else TOWER_TYPES[tier]
+        if assists:
+            event["assistingParticipantIds"] = assists
+        events.append(event)
+
+        takedowns = ([killer] if killer else []) + [self.by_id[pid] for pid in assists]
+        if tier == 3:
+            self.objectives[team]["inhibitor"] += 1
+            self.first.setdefault("inhibitor", team)
+            if killer:
+                killer.inhibitor_kills += 1
+            for p in takedowns:
+                p.inhibitor_takedowns += 1
+        else:
+            if "tower" not in self.first:
+                self.first["tower"] = team
+                if killer:
+                    killer.first_tower_kill = True
+                for pid in assists:
+                    self.by_id[pid].first_tower_assist = True
+            self.objectives[team]["tower"] += 1
+            if killer:
+                killer.turret_kills += 1
+            for p in takedowns:
+                p.turret_takedowns += 1
+        for p in takedowns:
+            p.earn(250 / max(1, len(takedowns)) + 50)
+            p.damage["totalDamageDoneToBuildings"] += rng.uniform(1500, 4000)
+            p.damage["totalDamageDoneToObjectives"] += rng.uniform(1500, 4000)
+
+    def sieges(self, start_ms, end_ms, events):
+        rng = self.rng
+        minutes = (end_ms - start_ms) / 60_000
+        for team in (100, 200):
+            owner = self.enemy(team)
+            # Turret plates, until 14:00
+            if 300_000 < end_ms <= 840_000:
+                for _ in range(_poisson(rng, 0.6 * minutes)):
+                    lanes = [lane for lane, left in self.plates[owner].items() if left and self.standing[owner][lane] == 0]
+                    if not lanes:
+                        break
+                    lane = rng.choice(lanes)
+                    self.plates[owner][lane] -= 1
+                    timestamp = rng.randint(start_ms + 1, end_ms - 1)
+                    takers = self.alive(team, timestamp)
+                    killer = rng.choice(takers) if takers else None
+                    blue_lane = lane if owner == 100 else MIRRORED_LANE[lane]
+                    x, y = _mirror(STRUCTURES[blue_lane][0], owner)
+                    events.append(
+                        {
+                            "killerId": killer.participant_id if killer else 0,
+                            "laneType": lane,
+                            "position": {"x": x, "y": y},
+                            "teamId": owner,
+                            "timestamp": timestamp,
+                            "type": "TURRET_PLATE_DESTROYED",
+                        }
+                    )
+                    if killer:
+                        killer.plates += 1
+                        killer.earn(125)
+            if end_ms <= 600_000:
+                continue
+            rate = (0.15 + 0.5 * self.progress(end_ms)) * (1.3 if team == self.winner else 0.6)
+            for _ in range(_poisson(rng, rate * minutes)):
+                lanes = [lane for lane, tier in self.standing[owner].items() if tier < 4]
+                if not lanes:
+                    break
+                lane = rng.choice(lanes)
+                tier = self.standing[owner][lane]
+                # The losing side rarely opens a base before the end
+                if tier == 3 and team != self.winner and rng.random() < 0.8:
+                    continue
+                self.standing[owner][lane] += 1
+                self.structure_kill(team, lane, tier, rng.randint(start_ms + 1, end_ms - 1), events)
+
+    def end_game(self, start_ms, end_ms, events):
+        """Final push of the winner: one lane down to the nexus turrets"""
+        rng = self.rng
+        loser = self.enemy(self.winner)
+        if self.surrender:
+            return
+        lane = max(self.standing[loser], key=lambda l: self.standing[loser][l])
+        timestamp = max(start_ms + 1, end_ms - 90_000)
+        while self.standing[loser][lane] < 4:
+            tier = self.standing[loser][lane]
+            self.standing[loser][lane] += 1
+            timestamp = min(end_ms - 5000, timestamp + rng.randint(3000, 12_000))
+            self.structure_kill(self.winner, lane, tier, timestamp, events)
+        for nexus in range(self.nexus_turrets[loser]):
+            timestamp = min(end_ms - 1000, timestamp + rng.randint(2000, 8000))
+            self.structure_kill(self.winner, "MID_LANE", 0, timestamp, events, nexus=nexus)
+        self.nexus_turrets[loser] = 0
+
+    # ----------------------
+    # Frames
+    # ----------------------
+
+    def participant_frame(self, player, timestamp_ms):
+        rng = self.rng
+        legendaries = sum(1 for i in player.inventory if ITEMS[i][1] == "legendary")
+        alive = player.alive(timestamp_ms)
+        health_max = int(600 + 95 * (player.level - 1) + 250 * legendaries)
+        position = self.position(player, timestamp_ms)
+        damage = player.damage
+        return {
+            "championStats": {
+                "abilityHaste": 10 * legendaries,
+                "abilityPower": int((40 + 80 * legendaries) if player.magic else 0),
+                "armor": int(30 + 4.5 * player.level + 10 * legendaries),
+                "armorPen": 0,
+                "armorPenPercent": 0,
+                "attackDamage": int(60 + 3.5 * (player.level - 1) + (0 if player.magic else 45 * legendaries)),
+                "attackSpeed": 100 + 5 * player.level,
+                "bonusArmorPenPercent": 0,
+                "bonusMagicPenPercent": 0,
+                "ccReduction": 0,
+                "cooldownReduction": 0,
+                "health": health_max if not alive else int(health_max * rng.uniform(0.2, 1.0)),
+                "healthMax": health_max,
+                "healthRegen": 8 + player.level,
+                "lifesteal": 0,
+                "magicPen": 0,
+                "magicPenPercent": 0,
+                "magicResist": int(32 + 2 * player.level),
+                "movementSpeed": 345 + (45 if any(ITEMS[i][1].startswith("boots") for i in player.inventory) else 0),
+                "omnivamp": 0,
+                "physicalVamp": 0,
+                "power": 300 + 40 * player.level,
+                "powerMax": 300 + 40 * player.level,
+                "powerRegen": 8,
+                "spellVamp": 0,
+            },
+            "currentGold": int(player.current_gold),
+            "damageStats": {
+                "magicDamageDone": int(damage["magicDamageDone"]),
+                "magicDamageDoneToChampions": int(damage["magicDamageDoneToChampions"]),
+                "magicDamageTaken": int(damage["magicDamageTaken"]),
+                "physicalDamageDone": int(damage["physicalDamageDone"]),
+                "physicalDamageDoneToChampions": int(damage["physicalDamageDoneToChampions"]),
+                "physicalDamageTaken": int(damage["physicalDamageTaken"]),
+                "totalDamageDone": int(player.damage_total("Done")),
+                "totalDamageDoneToChampions": int(player.damage_total("DoneToChampions")),
+                "totalDamageTaken": int(player.damage_total("Taken")),
+                "trueDamageDone": int(damage["trueDamageDone"]),
+                "trueDamageDoneToChampions": int(damage["trueDamageDoneToChampions"]),
+                "trueDamageTaken": int(damage["trueDamageTaken"]),
+            },
+            "goldPerSecond": 0,
+            "jungleMinionsKilled": int(player.jungle_cs),
+            "level": player.level,
+            "minionsKilled": int(player.cs),
+            "participantId": player.participant_id,
+            "position": {"x": position[0], "y": position[1]},
+            "timeEnemySpentControlled": int(player.enemy_cc_seconds),
+            "totalGold": int(player.total_gold),
+            "xp": int(player.xp),
+        }
+
+    def run(self):
+        rng = self.rng
+        boundaries = list(range(0, self.duration_ms, FRAME_INTERVAL_MS)) + [self.duration_ms]
+        for index, timestamp in enumerate(boundaries):
+            events = []
+            if index == 0:
+                events.append({"realTimestamp": self.creation_ms + 30_000, "timestamp": 0, "type": "PAUSE_END"})
+            else:
+                start = boundaries[index - 1]
+                last = timestamp == self.duration_ms
+                for player in self.players:
+                    if start == 0:
+                        self.level_up_first(player, events)
+                        self.shop(player, rng.randint(1000, 15_000), events)
+                    self.farm(player, start, timestamp, events)
+                    self.vision(player, start, timestamp, events)
+                self.fights(start, timestamp, events)
+                self.monsters(start, timestamp, events)
+                self.sieges(start, timestamp, events)
+                if last:
+                    self.end_game(start, timestamp, events)
+                for player in self.players:
+                    # Recalls: gold burning a hole in the pocket, or on death
+                    gold = player.current_gold
+                    if start and player.alive(timestamp) and (
+                        gold >= 2600 or (gold >= 1100 and rng.random() < 0.45) or rng.random() < 0.08
+                    ):
+                        self.shop(player, rng.randint(start + 1, timestamp - 1), events)
+                # Events scheduled past this frame (consumed potions, ...) move to the next one
+                events += self.pending
+                self.pending = [e for e in events if e["timestamp"] > timestamp]
+                events = [e for e in events if e["timestamp"] <= timestamp]
+                events.sort(key=lambda event: event["timestamp"])
+                if last:
+                    events.append(
+                        {
+                            "gameId": int(self.match_id.split("_", 1)[1]),
+                            "realTimestamp": self.creation_ms + 30_000 + self.duration_ms,
+                            "timestamp": timestamp,
+                            "type": "GAME_END",
+                            "winningTeam": self.winner,
+                        }
+                    )
+            frame_timestamp = timestamp if index == 0 or timestamp == self.duration_ms else timestamp + rng.randint(0, 40)
+            self.frames.append(
+                {
+                    "events": events,
+                    "participantFrames": {
+                        str(p.participant_id): self.participant_frame(p, timestamp) for p in self.players
+                    },
+                    "timestamp": frame_timestamp,
+                }
+            )
+        return self
+
+    def level_up_first(self, player, events):
+        slot = self.rng.randint(1, 3)
+        player.skill_points[slot - 1] += 1
+        events.append(
+            {
+                "levelUpType": "NORMAL",
+                "participantId": player.participant_id,
+                "skillSlot": slot,
+                "timestamp": self.rng.randint(1000, 60_000),
+                "type": "SKILL_LEVEL_UP",
+            }
+        )
+
+    # ----------------------
+    # Documents
+    # ----------------------
+
+    def participant(self, player):
+        rng = self.rng
+        team_kills = sum(p.kills for p in self.teams[player.team_id])
+        primary, sub = rng.sample(list(STYLES), 2)
+        items = [i for i in player.inventory][:6]
+        items += [0] * (6 - len(items))
+        minutes = self.duration / 60
+        won = player.team_id == self.winner
+        damage = player.damage
+        to_champions = int(player.damage_total("DoneToChampions"))
+        team_damage = sum(p.damage_total("DoneToChampions") for p in self.teams[player.team_id]) or 1
+        vision_score = int(player.wards_placed * 1.2 + player.wards_killed * 1.5 + player.control_wards_placed)
+        kda = (player.kills + player.assists) / max(1, player.deaths)
+        if not player.deaths:
+            kda = player.kills + player.assists
+        return {
+            "assists": player.assists,
+            "baronKills": player.baron_kills,
+            "champExperience": int(player.xp),
+            "champLevel": player.level,
+            "championId": player.champion_id,
+            "championName": player.champion,
+            "consumablesPurchased": player.consumables,
+            "damageDealtToBuildings": int(damage["totalDamageDoneToBuildings"]),
+            "damageDealtToObjectives": int(damage["totalDamageDoneToObjectives"]),
+            "damageDealtToTurrets": int(damage["totalDamageDoneToBuildings"]),
+            "damageSelfMitigated": int(damage["damageSelfMitigated"]),
+            "deaths": player.deaths,
+            "detectorWardsPlaced": player.control_wards_placed,
+            "doubleKills": player.multikills[2],
+            "dragonKills": player.dragon_kills,
+            "firstBloodAssist": player.first_blood_assist,
+            "firstBloodKill": player.first_blood_kill,
+            "firstTowerAssist": player.first_tower_assist,
+            "firstTowerKill": player.first_tower_kill,
+            "gameEndedInEarlySurrender": False,
+            "gameEndedInSurrender": self.surrender,
+            "goldEarned": int(player.total_gold),
+            "goldSpent": int(player.spent),
+            "individualPosition": player.position,
+            "inhibitorKills": player.inhibitor_kills,
+            "inhibitorTakedowns": player.inhibitor_takedowns,
+            "inhibitorsLost": self.objectives[self.enemy(player.team_id)]["inhibitor"],
+            **{f"item{slot}": item for slot, item in enumerate(items)},
+            "item6": player.trinket,
+            "itemsPurchased": player.items_purchased,
+            "killingSprees": player.sprees,
+            "kills": player.kills,
+            "lane": {"UTILITY": "BOTTOM"}.get(player.position, player.position),
+            "largestCriticalStrike": 0 if player.magic else rng.randint(0, 1200),
+            "largestKillingSpree": player.largest_spree if player.largest_spree >= 3 else 0,
+            "largestMultiKill": max([n for n, count in player.multikills.items() if count] or [1 if player.kills else 0]),
+            "longestTimeSpentLiving": int(max(player.longest_alive, (self.duration_ms - player.alive_since_ms) / 1000)),
+            "magicDamageDealt": int(damage["magicDamageDone"]),
+            "magicDamageDealtToChampions": int(damage["magicDamageDoneToChampions"]),
+            "magicDamageTaken": int(damage["magicDamageTaken"]),
+            "neutralMinionsKilled": int(player.jungle_cs),
+            "nexusKills": int(won and not self.surrender and player.position == "MIDDLE"),
+            "participantId": player.participant_id,
+            "pentaKills": player.multikills[5],
+            "perks": {
+                "statPerks": {"defense": 5001, "flex": 5008, "offense": 5005},
+                "styles": [
+                    {
+                        "description": "primaryStyle",
+                        "selections": [{"perk": perk, "var1": rng.randint(0, 2000), "var2": 0, "var3": 0} for perk in STYLES[primary]],
+                        "style": primary,
+                    },
+                    {
+                        "description": "subStyle",
+                        "selections": [{"perk": perk, "var1": rng.randint(0, 500), "var2": 0, "var3": 0} for perk in STYLES[sub][:2]],
+                        "style": sub,
+                    },
+                ],
+            },
+            "physicalDamageDealt": int(damage["physicalDamageDone"]),
+            "physicalDamageDealtToChampions": int(damage["physicalDamageDoneToChampions"]),
+            "physicalDamageTaken": int(damage["physicalDamageTaken"]),
+            "profileIcon": rng.randint(1, 6000),
+            "puuid": player.puuid,
+            "quadraKills": player.multikills[4],
+            "riotIdGameName": player.name,
+            "riotIdTagline": player.tag,
+            "role": {"UTILITY": "SUPPORT", "BOTTOM": "CARRY", "JUNGLE": "NONE"}.get(player.position, "SOLO"),
+            "sightWardsBoughtInGame": 0,
+            "summoner1Casts": rng.randint(2, 12),
+            "summoner1Id": 4,
+            "summoner2Casts": rng.randint(2, 12),
+            "summoner2Id": 11 if player.position == "JUNGLE" else rng.choice(SUMMONER_SPELLS[1:]),
+            "summonerLevel": rng.randint(30, 900),
+            "teamEarlySurrendered": False,
+            "teamId": player.team_id,
+            "teamPosition": player.position,
+            "timeCCingOthers": int(player.cc_seconds),
+            "timePlayed": self.duration,
+            "totalAllyJungleMinionsKilled": int(player.jungle_cs * 0.8),
+            "totalDamageDealt": int(player.damage_total("Done")),
+            "totalDamageDealtToChampions": to_champions,
+            "totalDamageShieldedOnTeammates": int(damage["totalDamageShieldedOnTeammates"]),
+            "totalDamageTaken": int(player.damage_total("Taken")),
+            "totalEnemyJungleMinionsKilled": int(player.jungle_cs * 0.2),
+            "totalHeal": int(damage["totalHeal"]),
+            "totalHealsOnTeammates": int(damage["totalHealsOnTeammates"]),
+            "totalMinionsKilled": int(player.cs),
+            "totalTimeCCDealt": int(player.cc_seconds * 3),
+            "totalTimeSpentDead": int(player.time_dead),
+            "totalUnitsHealed": 1 + (rng.randint(0, 4) if player.position == "UTILITY" else 0),
+            "tripleKills": player.multikills[3],
+            "trueDamageDealt": int(damage["trueDamageDone"]),
+            "trueDamageDealtToChampions": int(damage["trueDamageDoneToChampions"]),
+            "trueDamageTaken": int(damage["trueDamageTaken"]),
+            "turretKills": player.turret_kills,
+            "turretTakedowns": player.turret_takedowns,
+            "turretsLost": self.objectives[self.enemy(player.team_id)]["tower"],
+            "visionScore": vision_score,
+            "visionWardsBoughtInGame": player.control_wards_bought,
+            "wardsKilled": player.wards_killed,
+            "wardsPlaced": player.wards_placed,
+            "win": won,
+            "challenges": {
+                "baronTakedowns": player.baron_takedowns,
+                "controlWardsPlaced": player.control_wards_placed,
+                "damagePerMinute": round(to_champions / minutes, 2),
+                "dragonTakedowns": player.dragon_takedowns,
+                "epicMonsterSteals": int(rng.random() < 0.02),
+                "goldPerMinute": round(player.total_gold / minutes, 2),
+                "kda": round(kda, 2),
+                "killParticipation": round((player.kills + player.assists) / team_kills, 3) if team_kills else 0,
+                "riftHeraldTakedowns": player.herald_takedowns,
+                "skillshotsDodged": rng.randint(0, 200),
+                "skillshotsHit": rng.randint(0, 300),
+                "soloKills": rng.randint(0, player.kills),
+                "takedowns": player.kills + player.assists,
+                "teamBaronKills": self.objectives[player.team_id]["baron"],
+                "teamDamagePercentage": round(to_champions / team_damage, 3),
+                "turretPlatesTaken": player.plates,
+                "visionScorePerMinute": round(vision_score / minutes, 3),
+                "wardTakedowns": player.wards_killed,
+            },
+        }
+
+    def team(self, team_id, bans):
+        return {
+            "bans": [
+                {"championId": champion_id, "pickTurn": turn + 1}
+                for turn, (champion_id, _) in enumerate(bans)
+            ],
+            "objectives": {
+                name: {"first": self.first.get(name) == team_id, "kills": kills}
+                for name, kills in {"atakhan": 0, **self.objectives[team_id]}.items()
+            },
+            "teamId": team_id,
+            "win": team_id == self.winner,
+        }
+
+    def documents(self):
+        game_id = int(self.match_id.split("_", 1)[1])
+        metadata = {
+            "dataVersion": "2",
+            "matchId": self.match_id,
+            "participants": [p.puuid for p in self.players],
+        }
+        match_data = {
+            "metadata": metadata,
+            "info": {
+                "endOfGameResult": "GameComplete",
+                "gameCreation": self.creation_ms,
+                "gameDuration": self.duration,
+                "gameEndTimestamp": self.creation_ms + 30_000 + self.duration_ms,
+                "gameId": game_id,
+                "gameMode": "CLASSIC",
+                "gameName": f"teambuilder-match-{game_id}",
+                "gameStartTimestamp": self.creation_ms + 30_000,
+                "gameType": "MATCHED_GAME",
+                "gameVersion": GAME_VERSION,
+                "mapId": 11,
+                "participants": [self.participant(p) for p in self.players],
+                "platformId": PLATFORM,
+                "queueId": 420,
+                "teams": [self.team(100, self.bans[:5]), self.team(200, self.bans[5:])],
+                "tournamentCode": "",
+            },
+        }
+        timeline_data = {
+            "metadata": dict(metadata),
+            "info": {
+                "endOfGameResult": "GameComplete",
+                "frameInterval": FRAME_INTERVAL_MS,
+                "frames": self.frames,
+                "gameId": game_id,
+                "participants": [
+                    {"participantId": p.participant_id, "puuid": p.puuid} for p in self.players
+                ],
+            },
+        }
+        return match_data, timeline_data
+
+
+def game(match_id_, seed=0, minutes=DEFAULT_MINUTES, event_density=1.0, season_start=None):
+    """
+    Simulate one ranked game.
+
+    Args:
+        match_id_ (str): Match ID; encodes the tracked player (see `match_id`).
+        seed (int): Seed of the corpus.
+        minutes (tuple): (min, max) game length in minutes, drawn uniformly.
+        event_density (float): Multiplier of the combat event rates
+            (kills, fights, wards); objectives keep their spawn timers.
+        season_start (datetime): Start of the `gameCreation` range
+            (default: January 1st of the current year).
+
+    Returns:
+        tuple: (match-v5 document, timeline-v5 document).
+    """
+    return _GameSimulation(match_id_, seed, minutes, event_density, season_start).run().documents()
+
+
+def match(match_id_, seed=0, **shape):
+    """match-v5 document of a synthetic match (played by its encoded player)"""
+    return game(match_id_, seed=seed, **shape)[0]
+
+
+def timeline(match_id_, seed=0, **shape):
+    """timeline-v5 document consistent with `match(match_id_, seed)`"""
+    return game(match_id_, seed=seed, **shape)[1]
+
+
+def iter_games(count, seed=0, games_per_player=20, first=0, **shape):
+    """
+    Yields:
+        tuple: (match_id, match document, timeline document) of games
+        `first` to `first + count`, `games_per_player` per player.
+    """
+    for n in range(first, first + count):
+        match_id_ = match_id(n // games_per_player, n % games_per_player)
+        yield (match_id_,) + game(match_id_, seed=seed, **shape)
+
+
+def static_data():
+    """Data Dragon item.json / runesReforged.json covering the synthetic IDs"""
+    items = {
+        "data": {
+            str(item_id): {"name": ITEM_NAMES[item_id], "gold": {"total": price}}
+            for item_id, (price, _) in ITEMS.items()
+        }
+    }
+    runes = [
+        {
+            "id": style_id,
+            "key": f"Style{style_id}",
+            "name": f"Style {style_id}",
+            "slots": [{"runes": [{"id": perk, "name": f"Perk {perk}"} for perk in perks]}],
+        }
+        for style_id, perks in STYLES.items()
+    ]
+    return {"item": items, "runesReforged": runes}
+
+
+# ----------------------
+# Streaming to disk
+# ----------------------
+
+
+def _encode_range(job):
+    """
+    Worker: one range of games, serialized. For jsonl, returns the blocks of
+    match and timeline lines (gzip members when compressed: concatenated
+    members are a valid gzip file, so compression runs in the workers);
+    for corpus, the (match_id, match, timeline) documents.
+    """
+    first, count, seed, games_per_player, shape, output_format, compress = job
+    games = [
+        (match_id_, json.dumps(match_data, separators=(",", ":")), json.dumps(timeline_data, separators=(",", ":")))
+        for match_id_, match_data, timeline_data in iter_games(
+            count, seed=seed, games_per_player=games_per_player, first=first, **shape
+        )
+    ]
+    if output_format == "corpus":
+        return len(games), games
+    blocks = []
+    for column in (1, 2):
+        block = "".join(game_[column] + "\n" for game_ in games).encode("utf-8")
+        blocks.append(gzip.compress(block, compresslevel=5, mtime=0) if compress else block)
+    return len(games), blocks
+
+
+def _encoded_chunks(args, shape, chunk=50):
+    jobs = [
+        (first, min(chunk, args.games - first), args.seed, args.games_per_player, shape, args.format, args.compress)
+        for first in range(0, args.games, chunk)
+    ]
+    if args.workers <= 1:
+        yield from map(_encode_range, jobs)
+        return
+    import multiprocessing
+
+    with multiprocessing.Pool(args.workers) as pool:
+        # Ordered, so the output only depends on the seed
+        yield from pool.imap(_encode_range, jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream synthetic match/timeline payloads to disk")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "corpus"],
+        default="jsonl",
+        help="jsonl: matches.jsonl + timelines.jsonl; corpus: {player}/game_summary|game_history/{match_id}.json",
+    )
+    parser.add_argument("--compress", action="store_true", help="gzip the jsonl files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games-per-player", type=int, default=20)
+    parser.add_argument("--minutes", type=float, nargs=2, default=DEFAULT_MINUTES, metavar=("MIN", "MAX"))
+    parser.add_argument("--event-density", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    shape = {"minutes": tuple(args.minutes), "event_density": args.event_density}
+    os.makedirs(args.out, exist_ok=True)
+    started = time.perf_counter()
+    written = 0
+
+    if args.format == "jsonl":
+        suffix = ".jsonl.gz" if args.compress else ".jsonl"
+        with open(os.path.join(args.out, f"matches{suffix}"), "wb") as matches, open(
+            os.path.join(args.out, f"timelines{suffix}"), "wb"
+        ) as timelines:
+            for count, (match_block, timeline_block) in _encoded_chunks(args, shape):
+                matches.write(match_block)
+                timelines.write(timeline_block)
+                written += count
+                print(f"\r{written}/{args.games} games", end="", file=sys.stderr)
+    else:
+        for count, games in _encoded_chunks(args, shape):
+            for match_id_, match_line, timeline_line in games:
+                gamename, gametag = player_riot_id(player_of_match(match_id_)[0])
+                for folder, line in (("game_summary", match_line), ("game_history", timeline_line)):
+                    directory = os.path.join(args.out, f"{gamename}_{gametag}", folder)
+                    os.makedirs(directory, exist_ok=True)
+                    with open(os.path.join(directory, f"{match_id_}.json"), "w", encoding="utf-8") as file:
+                        file.write(line)
+            written += count
+            print(f"\r{written}/{args.games} games", end="", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {written} games in {elapsed:.1f} s ({written / elapsed:.1f} games/s) -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,38 @@ export async function fetchPlayerStats(summonerName, tagLine, region = null) {
   }
 }
 
+/**
+ * Fetch everything shown on the landing page in a single request
+ * @param {string} gameName - Game name
+ * @param {string} gameTag - Game tag (e.g., 'EUW')
+ * @returns {Promise<Object>} { stats, monthly, account, errors } - monthly and account are null when unavailable
+ */
+export async function fetchProfileBundle(gameName, gameTag) {
+  try {
+    const response = await fetch(
+      `${API_BASE_URL}/getProfileBundle?gamename=${encodeURIComponent(gameName)}&gametag=${encodeURIComponent(gameTag)}`
+    )
+    const data = await response.json()
+    const errors = data.errors || {}
+
+    if (!data.wrapped_up) {
+      throw new Error(data.error || `Failed to fetch stats: ${errors.wrapped_up || response.statusText}`)
+    }
+
+    return {
+      stats: validateStatsData(data.wrapped_up),
+      monthly: data.stats_monthly || null,
+      account: data.summoners && data.league_overview
+        ? { summoners: data.summoners, league_overview: data.league_overview }
+        : null,
+      errors
+    }
+  } catch (error) {
+    console.error('Error fetching profile bundle:', error)
+    throw error
+  }
+}
+
 /**
  * Fetch all games for a player with pagination
  * @param {string} gameName - Game name
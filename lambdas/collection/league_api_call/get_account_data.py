@@ -1,41 +1,124 @@
 # get_account_data.py
-import requests
-import pandas as pd
 import json
 from module.parsing_template import *
 from module.endpoints_call import *
 from datetime import datetime, timedelta
 import os
-import boto3
+from module.clients import get_client
+from module.collection_lease import CollectionLease, lease_key
+from module.fanout import get_dispatcher
+from module.pipeline import MAX_HANDOFFS, CollectionPipeline, handoff_reserve_ms
+from module.timeline_prefetch import PREFETCH_WORKER, default_max_requests, prefetch_timelines
+from module.secret_provider import get_riot_api_key
 import time
-import os
 
 
 def get_api_key():
-    return os.environ.get("RIOT_API_KEY")
+    return get_riot_api_key()
 
 
 def send_progress(endpoint, connection_id, data):
     """
-    Send a JSON-encoded progress message to a client via API Gateway WebSocket.
+    Send a JSON-encoded progress message to clients via API Gateway WebSocket.
 
     Args:
         endpoint (str): The API Gateway endpoint URL.
-        connection_id (str): The connection ID of the client. If None, the function does nothing.
-        data (dict): The data to send to the client.
+        connection_id (str or iterable): The client connection ID, or several of
+            them (e.g. a CollectionLease, which yields its subscribers). If None,
+            the function does nothing.
+        data (dict): The data to send to the clients.
 
     Behavior:
-        - Creates an API Gateway Management API client for the given endpoint.
-        - Sends the JSON-encoded `data` to the specified `connection_id`.
+        - Reuses the shared API Gateway Management API client for the given endpoint.
+        - Sends the JSON-encoded `data` to every connection; a client that went
+          away does not stop the others from being notified.
     """
     if connection_id is None:
         return
-    client = boto3.client("apigatewaymanagementapi", endpoint_url=endpoint)
-    client.post_to_connection(
-        ConnectionId=connection_id, Data=json.dumps(data).encode("utf-8")
+    connection_ids = [connection_id] if isinstance(connection_id, str) else connection_id
+    client = get_client("apigatewaymanagementapi", endpoint_url=endpoint)
+    payload = json.dumps(data).encode("utf-8")
+    for conn in connection_ids:
+        try:
+            client.post_to_connection(ConnectionId=conn, Data=payload)
+        except Exception as e:
+            print(f"Failed to notify {conn}: {e}")
+
+
+def hand_over(context, payload):
+    """
+    Continue the collection in a new invocation of this function.
+
+    Args:
+        context: Lambda context of the current invocation.
+        payload (dict): Event of the next invocation (same player and lease).
+    """
+    get_client("lambda").invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType="Event",
+        Payload=json.dumps(payload),
     )
 
 
+def start_timeline_prefetch(context, type_region, state, bucket_name):
+    """
+    Prefetch the timelines of every collected match once the collection is
+    complete: in a background invocation on Lambda, inline otherwise.
+    """
+    if not state.get("match_ids"):
+        return
+    payload = {
+        "worker": PREFETCH_WORKER,
+        "region": type_region,
+        "gamename": state["riot_gamename"],
+        "gametag": state["riot_gametag"],
+        "match_ids": state["match_ids"],
+        "bucket_name": bucket_name,
+    }
+    if context is not None:
+        hand_over(context, payload)
+    else:
+        run_timeline_prefetch(payload)
+
+
+def run_timeline_prefetch(event, context=None):
+    """
+    Background worker: prefetch timelines until done, the request budget is
+    spent, the key stays rate limited, or the invocation runs low on time.
+    Only the last case continues in a new invocation, with what is left of
+    the budget (`event["max_requests"]`) and at most MAX_HANDOFFS times
+    (`event["handoffs"]`).
+    """
+    max_requests = event.get("max_requests")
+    if max_requests is None:
+        max_requests = default_max_requests()
+    handoffs = int(event.get("handoffs") or 0)
+    deadline = None
+    if context is not None:
+        deadline = time.time() + (context.get_remaining_time_in_millis() - 30_000) / 1000
+    result = prefetch_timelines(
+        event["region"],
+        event["gamename"],
+        event["gametag"],
+        get_api_key(),
+        event["bucket_name"],
+        event["match_ids"],
+        max_requests=max_requests,
+        deadline=deadline,
+    )
+    print(json.dumps({"event": "timeline_prefetch", "handoffs": handoffs, **result}))
+    remaining_budget = max_requests - result["requests"]
+    if result["stopped"] == "deadline" and context is not None and remaining_budget > 0:
+        if handoffs >= MAX_HANDOFFS:
+            print(f"🛑 Timeline prefetch stopped after {handoffs} hand-overs")
+        else:
+            hand_over(
+                context,
+                {**event, "max_requests": remaining_budget, "handoffs": handoffs + 1},
+            )
+    return result
+
+
 def main(
     type_region,
     type_gamename,
@@ -44,92 +127,117 @@ def main(
     ranked_type="solo",
     bucket_name="s3-api-lol",
     bucket_process_data="s3-process-lol",
+    context=None,
 ):
+    """
+    Run (or resume) the collection pipeline of a player.
+
+    Stages run one bounded step at a time with a checkpoint saved after each
+    step (see `module.pipeline`). With COLLECTION_FANOUT set, big match
+    backfills are split across parallel workers (see `module.fanout`).
+    When `context` is given, every invocation runs at least one step, then
+    hands the collection over to a new invocation once less than
+    `handoff_reserve_ms` of its time is left; after MAX_HANDOFFS hand-overs
+    (`query_params["handoffs"]`) the collection is given up. Without a
+    context it runs to completion.
+    """
 
     connection_id = query_params.get("connectionId", None)
     endpoint = "https://v19yst44bk.execute-api.eu-west-3.amazonaws.com/production"
     API_KEY = get_api_key()
 
-    try:
-        send_progress(endpoint, connection_id, {"type": "progress", "progress": 0})
-        riot_encrypted_puuid, riot_gamename, riot_gametag = get_account_riotid(
-            type_region=type_region,
-            type_gamename=type_gamename,
-            type_gametag=type_gametag,
-            api_key=API_KEY,
+    # Started by websocketRouter: broadcast progress to every client attached
+    # to the lease, and release it when done so the next refresh can start
+    lease = None
+    if query_params.get("lease_id"):
+        lease = CollectionLease(
+            get_client("s3"),
+            os.environ.get("LEASE_BUCKET", bucket_name),
+            lease_key(type_gamename, type_gametag, ranked_type),
+            query_params["lease_id"],
         )
+        lease.renew()
+        connection_id = lease
 
-        get_league(
-            type_region,
-            riot_gamename,
-            riot_gametag,
-            riot_encrypted_puuid,
-            API_KEY,
-            bucket_name,
-        )
-        get_summoners(
-            type_region,
-            riot_gamename,
-            riot_gametag,
-            riot_encrypted_puuid,
-            API_KEY,
-            bucket_name,
-        )
-        end_time = time.time()
-        get_masteries(
-            type_region,
-            riot_gamename,
-            riot_gametag,
-            riot_encrypted_puuid,
-            API_KEY,
-            bucket_name,
-        )
-        end_time = time.time()
-        all_miss_ids, all_match_ids = get_all_match_id(
-            riot_gamename,
-            riot_gametag,
-            riot_encrypted_puuid,
-            type_region,
-            API_KEY,
-            bucket_name,
-            ranked_type,
-        )
-        end_time = time.time()
-        if len(all_miss_ids) > 0:
-            get_wrapped_up_games(
-                type_region,
-                riot_gamename,
-                riot_gametag,
-                riot_encrypted_puuid,
-                API_KEY,
-                bucket_name,
-                all_miss_ids,
-                endpoint,
-                connection_id,
-            )
-            set_wrapped_data(
-                riot_gamename, riot_gametag, bucket_name, bucket_process_data
-            )
-            set_summary_period_analysis(
-                riot_gamename, riot_gametag, bucket_name, bucket_process_data
-            )
-            send_progress(endpoint, connection_id, {"type": "progress", "progress": 90})
-            get_timeline_games(
-                type_region,
-                riot_gamename,
-                riot_gametag,
-                API_KEY,
-                bucket_name,
-                all_match_ids,
-            )
-        else:
-            print("No match ids found")
+    pipeline = CollectionPipeline(
+        get_client("s3"),
+        type_region,
+        type_gamename,
+        type_gametag,
+        ranked_type,
+        API_KEY,
+        endpoint,
+        connection_id,
+        bucket_name=bucket_name,
+        bucket_process_data=bucket_process_data,
+        dispatcher=get_dispatcher(context),
+    )
+    handed_over = False
+    handoffs = int(query_params.get("handoffs") or 0)
+    reserve_ms = None
+    if context is not None:
+        reserve_ms = handoff_reserve_ms(context.get_remaining_time_in_millis())
+    steps = 0
+
+    try:
+        state = pipeline.load()
+        while not pipeline.done(state):
+            # At least one step per invocation: a short timeout still progresses
+            if (
+                reserve_ms is not None
+                and steps > 0
+                and context.get_remaining_time_in_millis() < reserve_ms
+            ):
+                if handoffs >= MAX_HANDOFFS:
+                    print(f"🛑 Gave up after {handoffs} hand-overs at stage {state['stage']}")
+                    send_progress(
+                        endpoint,
+                        connection_id,
+                        {"type": "error", "message": "Collection is taking too long, try again later"},
+                    )
+                    return {
+                        "statusCode": 500,
+                        "body": json.dumps(
+                            {"error": "Too many hand-overs", "stage": state["stage"]}
+                        ),
+                    }
+                hand_over(
+                    context,
+                    {
+                        "region": type_region,
+                        "gamename": type_gamename,
+                        "gametag": type_gametag,
+                        "ranked_type": ranked_type,
+                        "connectionId": query_params.get("connectionId"),
+                        "lease_id": query_params.get("lease_id"),
+                        "handoffs": handoffs + 1,
+                    },
+                )
+                handed_over = True
+                print(f"⏭️ Handed over at stage {state['stage']} ({state['cursor']})")
+                return {
+                    "statusCode": 202,
+                    "body": json.dumps(
+                        {"message": "Collection continues", "stage": state["stage"]}
+                    ),
+                }
+            state = pipeline.step(state)
+            pipeline.save(state)
+            steps += 1
+
+        pipeline.clear()
         send_progress(endpoint, connection_id, {"type": "complete"})
+        start_timeline_prefetch(context, type_region, state, bucket_name)
         return {
             "statusCode": 200,
             "body": json.dumps({"message": "Full execution completed successfully"}),
         }
 
     except Exception as e:
+        # The checkpoint is kept: the next request resumes from the failed stage
         print(f"Error in main: {str(e)}")
         return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+
+    finally:
+        if lease is not None and not handed_over:
+            lease.release()
@@ -1,7 +1,16 @@
-from get_account_data import main
+from get_account_data import main, run_timeline_prefetch
+from module.fanout import SHARD_WORKER, run_match_shard
+from module.timeline_prefetch import PREFETCH_WORKER
+from module.clients import get_client, track_invocation
+from module.instrumentation import instrument_client, invocation_metrics
+from module.riot_client import get_riot_client
 import json
 
+# S3 calls show up as spans and byte counters in the invocation metrics
+instrument_client(get_client("s3"))
 
+
+@track_invocation
 def lambda_handler(event, context):
     """
     AWS Lambda handler to process a request and trigger the main workflow.
@@ -10,16 +19,56 @@ def lambda_handler(event, context):
         - region (str): game region, e.g., "euw1"
         - gamename (str): summoner's game name
         - gametag (str): summoner's tag/region suffix
-        - ranked_type (str): "solo", "flex", or "solo_and_flex"
+        - ranked_type (str): "solo" (default), "flex", or "solo_and_flex"
         - connectionId (str, optional)
+        - lease_id (str, optional): collection lease taken by websocketRouter
+        - handoffs (int, optional): hand-overs so far, set by the collection itself
+
+    Internal events carry a `worker` field instead, which websocketRouter never
+    forwards: "fetch_match_shard" events are fan-out workers that fetch the
+    matches of `event["shard"]` (see module.fanout), and "prefetch_timelines"
+    events download missing timelines in the background.
 
-    Extracts parameters from the event and calls `main(region, gamename, gametag, query_params, ranked_type)`.
+    Extracts parameters from the event and calls `main(region, gamename, gametag, query_params, ranked_type)`,
+    passing the Lambda context so long collections can hand over to a new invocation.
     """
+    player = event.get("shard") or event
+    with invocation_metrics(
+        action=event.get("worker") or event.get("action", "process"),
+        player=f"{player.get('gamename')}#{player.get('gametag')}",
+    ) as record:
+        get_riot_client().reset_metrics()
+        response = handle(event, context)
+        record["status"] = response.get("statusCode")
+        # Riot API accounting of this invocation, in the logs and the response
+        record["riot"] = get_riot_client().summary()
+        body = json.loads(response.get("body") or "{}")
+        body["riot_api"] = record["riot"]
+        response["body"] = json.dumps(body)
+        return response
+
+
+def handle(event, context):
+    """Route the event to the collection, a fan-out worker or the timeline prefetch"""
+    # Fan-out worker invoked by a collection's pipeline
+    if event.get("worker") == SHARD_WORKER:
+        report = run_match_shard(event["shard"])
+        return {"statusCode": 200, "body": json.dumps({"fetched": report["fetched"]})}
+
+    # Background timeline prefetch started at the end of a collection
+    if event.get("worker") == PREFETCH_WORKER:
+        result = run_timeline_prefetch(event, context)
+        return {"statusCode": 200, "body": json.dumps(result)}
+
     query_params = event.get("queryStringParameters", {})
     region = event.get("region")
     gamename = event.get("gamename")
     gametag = event.get("gametag")
-    ranked_type = event.get("ranked_type")
-    query_params = {"connectionId": event.get("connectionId")}
+    ranked_type = event.get("ranked_type") or "solo"
+    query_params = {
+        "connectionId": event.get("connectionId"),
+        "lease_id": event.get("lease_id"),
+        "handoffs": event.get("handoffs", 0),
+    }
 
-    main(region, gamename, gametag, query_params, ranked_type)
+    return main(region, gamename, gametag, query_params, ranked_type, context=context)
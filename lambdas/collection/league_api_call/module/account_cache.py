@@ -0,0 +1,160 @@
+"""
+Riot ID -> PUUID resolution cache
+
+A Riot ID almost never changes PUUID, so resolutions are kept in an
+in-process LRU (per warm container) in front of a persistent store shared
+by every Lambda (S3 by default, a local directory for offline runs).
+Entries expire after a TTL so renamed accounts are eventually re-resolved.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import quote
+
+from .clients import get_client
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def account_key(routing, gamename, gametag):
+    """Riot IDs are case-insensitive: normalise before using them as a key"""
+    return f"{routing}/{gamename.strip().lower()}_{gametag.strip().lower()}"
+
+
+class S3AccountStore:
+    """Persist resolutions as small JSON objects under `{prefix}{key}.json`"""
+
+    def __init__(self, bucket_name, prefix="account_cache/"):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+
+    def get(self, key):
+        s3 = get_client("s3")
+        try:
+            obj = s3.get_object(Bucket=self.bucket_name, Key=f"{self.prefix}{key}.json")
+        except s3.exceptions.NoSuchKey:
+            return None
+        return json.loads(obj["Body"].read())
+
+    def put(self, key, record):
+        get_client("s3").put_object(
+            Bucket=self.bucket_name,
+            Key=f"{self.prefix}{key}.json",
+            Body=json.dumps(record).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+
+class LocalAccountStore:
+    """Persist resolutions as JSON files in a local directory"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, key):
+        return self.directory / f"{quote(key, safe='')}.json"
+
+    def get(self, key):
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def put(self, key, record):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(key).write_text(json.dumps(record), encoding="utf-8")
+
+
+class AccountCache:
+    """
+    Two-level cache of account resolutions.
+
+    Args:
+        store: Persistent store (S3AccountStore, LocalAccountStore) or None
+            for an in-process only cache.
+        ttl_seconds (int): Lifetime of an entry, in both levels.
+        max_entries (int): Size of the in-process LRU.
+    """
+
+    def __init__(self, store=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, record):
+        return record is not None and time.time() - record.get("cached_at", 0) < self.ttl_seconds
+
+    def _remember(self, key, record):
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, routing, gamename, gametag):
+        """
+        Returns:
+            tuple or None: (riot_encrypted_puuid, riot_gamename, riot_gametag)
+        """
+        key = account_key(routing, gamename, gametag)
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self._entries.move_to_end(key)
+
+        if not self._fresh(record) and self.store is not None:
+            try:
+                record = self.store.get(key)
+            except Exception as e:
+                print(f"Account cache read failed for {key}: {e}")
+                record = None
+            if self._fresh(record):
+                self._remember(key, record)
+
+        if not self._fresh(record):
+            return None
+        return record["puuid"], record["gameName"], record["tagLine"]
+
+    def put(self, routing, gamename, gametag, puuid, riot_gamename, riot_gametag):
+        key = account_key(routing, gamename, gametag)
+        record = {
+            "puuid": puuid,
+            "gameName": riot_gamename,
+            "tagLine": riot_gametag,
+            "cached_at": time.time(),
+        }
+        self._remember(key, record)
+        if self.store is not None:
+            try:
+                self.store.put(key, record)
+            except Exception as e:
+                print(f"Account cache write failed for {key}: {e}")
+
+
+_cache = None
+
+
+def get_account_cache():
+    """
+    Container-wide cache, configured from the environment:
+        ACCOUNT_CACHE_DIR: use a local directory store (offline runs)
+        ACCOUNT_CACHE_BUCKET: S3 bucket of the store (default "s3-api-lol")
+        ACCOUNT_CACHE_TTL: entry lifetime in seconds (default 7 days)
+    """
+    global _cache
+    if _cache is None:
+        if os.environ.get("ACCOUNT_CACHE_DIR"):
+            store = LocalAccountStore(os.environ["ACCOUNT_CACHE_DIR"])
+        else:
+            store = S3AccountStore(os.environ.get("ACCOUNT_CACHE_BUCKET", "s3-api-lol"))
+        _cache = AccountCache(
+            store, ttl_seconds=int(os.environ.get("ACCOUNT_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        )
+    return _cache
@@ -0,0 +1,166 @@
+"""
+Collection leases
+
+A full collection of a player is expensive (hundreds of Riot API calls) and
+two concurrent runs would race on the same S3 keys. The websocketRouter
+therefore takes a lease per player and ranked type before invoking the
+collector:
+
+    collection_leases/{gamename}_{gametag}_{ranked_type}.json
+    {"lease_id", "expires_at", "subscribers": [connection ids]}
+
+The lease object is created with If-None-Match, so exactly one request
+starts the job; later requests add their WebSocket connection to
+`subscribers` and receive the running job's progress instead of starting a
+new one. The collector releases the lease when it finishes. A lease whose
+`expires_at` has passed (crashed or timed-out run) can be taken over.
+"""
+
+import json
+import time
+import uuid
+
+LEASE_FOLDER = "collection_leases"
+# A collector invocation cannot outlive the 15 min Lambda limit
+LEASE_TTL_SECONDS = 16 * 60
+SUBSCRIBERS_REFRESH_SECONDS = 2
+MAX_ATTEMPTS = 5
+
+
+def lease_key(gamename, gametag, ranked_type):
+    """Riot IDs are case-insensitive: normalise before using them as a key"""
+    return (
+        f"{LEASE_FOLDER}/{gamename.strip().lower()}_{gametag.strip().lower()}"
+        f"_{ranked_type or 'solo'}.json"
+    )
+
+
+def _read(s3, bucket_name, key):
+    try:
+        obj = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None, None
+    return json.loads(obj["Body"].read()), obj["ETag"]
+
+
+def _write(s3, bucket_name, key, record, etag):
+    """Conditional put; returns False if another writer got there first"""
+    condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+    try:
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=key,
+            Body=json.dumps(record).encode("utf-8"),
+            ContentType="application/json",
+            **condition,
+        )
+        return True
+    except s3.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] not in ("PreconditionFailed", "ConditionalRequestConflict"):
+            raise
+        return False
+
+
+def acquire_or_attach(s3, bucket_name, key, connection_id, ttl_seconds=LEASE_TTL_SECONDS):
+    """
+    Take the lease, or subscribe to the job holding it.
+
+    Args:
+        s3: boto3 S3 client.
+        bucket_name (str): Bucket holding the leases.
+        key (str): See `lease_key`.
+        connection_id (str): WebSocket connection to notify, or None.
+        ttl_seconds (int): Lifetime of a new lease.
+
+    Returns:
+        tuple: (lease_id, acquired). `acquired` is True when the caller
+        must start the job, False when it was attached to a running one.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        record, etag = _read(s3, bucket_name, key)
+        now = time.time()
+
+        if record is None or record["expires_at"] < now:
+            record = {
+                "lease_id": uuid.uuid4().hex,
+                "expires_at": now + ttl_seconds,
+                "subscribers": [connection_id] if connection_id else [],
+            }
+            if _write(s3, bucket_name, key, record, etag):
+                return record["lease_id"], True
+            continue
+
+        if connection_id is None or connection_id in record["subscribers"]:
+            return record["lease_id"], False
+        record["subscribers"].append(connection_id)
+        if _write(s3, bucket_name, key, record, etag):
+            return record["lease_id"], False
+
+    raise RuntimeError(f"Could not acquire or attach to {key} after {MAX_ATTEMPTS} attempts")
+
+
+class CollectionLease:
+    """
+    Lease held by a running collection.
+
+    Iterating over it yields the current subscribers (re-read at most every
+    `refresh_seconds`), so it can be passed wherever a connection ID is
+    expected to broadcast progress to every attached client.
+
+    Args:
+        s3: boto3 S3 client.
+        bucket_name (str): Bucket holding the leases.
+        key (str): See `lease_key`.
+        lease_id (str): ID returned by `acquire_or_attach`.
+        refresh_seconds (float): Subscriber list cache lifetime.
+    """
+
+    def __init__(self, s3, bucket_name, key, lease_id, refresh_seconds=SUBSCRIBERS_REFRESH_SECONDS):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.key = key
+        self.lease_id = lease_id
+        self.refresh_seconds = refresh_seconds
+        self._subscribers = []
+        self._read_at = 0.0
+
+    def __iter__(self):
+        if time.time() - self._read_at >= self.refresh_seconds:
+            try:
+                record, _ = _read(self.s3, self.bucket_name, self.key)
+                if record is not None and record["lease_id"] == self.lease_id:
+                    self._subscribers = record["subscribers"]
+            except Exception as e:
+                print(f"Failed to refresh subscribers of {self.key}: {e}")
+            self._read_at = time.time()
+        return iter(list(self._subscribers))
+
+    def renew(self, ttl_seconds=LEASE_TTL_SECONDS):
+        """
+        Push back the expiry of a lease still owned by this job.
+
+        Returns:
+            bool: False if the lease was lost (expired and taken over).
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            record, etag = _read(self.s3, self.bucket_name, self.key)
+            if record is None or record["lease_id"] != self.lease_id:
+                return False
+            record["expires_at"] = time.time() + ttl_seconds
+            if _write(self.s3, self.bucket_name, self.key, record, etag):
+                return True
+        return False
+
+    def release(self):
+        """Delete the lease, unless another job took it over meanwhile"""
+        for attempt in range(MAX_ATTEMPTS):
+            record, etag = _read(self.s3, self.bucket_name, self.key)
+            if record is None or record["lease_id"] != self.lease_id:
+                return
+            try:
+                self.s3.delete_object(Bucket=self.bucket_name, Key=self.key, IfMatch=etag)
+                return
+            except self.s3.exceptions.ClientError as e:
+                if e.response["Error"]["Code"] not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                    raise
+        print(f"⚠️ Lease {self.key} not released after {MAX_ATTEMPTS} attempts")
@@ -1,59 +1,73 @@
-import requests
+from .account_cache import get_account_cache
 from .parsing_template import *
-import pandas as pd
+# pandas (and numpy) are imported by the functions building tables, so fan-out
+# workers and the timeline prefetch never load them
 from datetime import datetime, timedelta
 import time
-import boto3
+from .clients import get_client
+from .context_index import update_context_index
+from .precomputed_response import put_response, response_key
+from .serialization import json_default, loads, put_json
+from .riot_client import BULK, INTERACTIVE, get_riot_client
+from .static_data import get_static_data
+from .instrumentation import increment, span
 from io import StringIO
-from io import BytesIO
 import json
-import numpy as np
+
+# 429s on one match (each after the client's own retries) before giving up
+MAX_RATE_LIMITED = 2
+
+
+class RateLimited(Exception):
+    """
+    The Riot API key stayed rate limited: `get_match_details` stopped early.
+
+    Attributes:
+        matches_data (list): Match data fetched before stopping.
+        processed (int): Match IDs fully handled (stored) before stopping.
+    """
+
+    def __init__(self, matches_data, processed):
+        super().__init__(f"Rate limited after {processed} matches")
+        self.matches_data = matches_data
+        self.processed = processed
 
 
 def send_progress(endpoint, connection_id, data):
     '''
-    Send a JSON-encoded message to a client via API Gateway WebSocket.
+    Send a JSON-encoded progress message to clients via API Gateway WebSocket.
 
     Args:
         endpoint (str): The API Gateway endpoint URL.
-        connection_id (str): The client connection ID. If None, nothing is sent.
-        data (dict): The data to send to the client.
+        connection_id (str or iterable): The client connection ID, or several of
+            them (e.g. a CollectionLease, which yields its subscribers). If None,
+            the function does nothing.
+        data (dict): The data to send to the clients.
 
     Behavior:
-        Creates a boto3 API Gateway Management API client and sends the JSON-encoded `data` to the given connection.
+        - Reuses the shared API Gateway Management API client for the given endpoint.
+        - Sends the JSON-encoded `data` to every connection; a client that went
+          away does not stop the others from being notified.
     '''
     if connection_id is None:
         return
-    client = boto3.client("apigatewaymanagementapi", endpoint_url=endpoint)
-    client.post_to_connection(
-        ConnectionId=connection_id, Data=json.dumps(data).encode("utf-8")
-    )
-
-
-def convert_numpy(obj):
-    '''
-    Convert numpy data types to native Python types.
-
-    Args:
-        obj: A numpy object (integer, floating, ndarray) or other.
-
-    Returns:
-        int, float, list, or str: Converted Python type suitable for JSON serialization.
-    '''
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    else:
-        return str(obj)
+    connection_ids = [connection_id] if isinstance(connection_id, str) else connection_id
+    client = get_client("apigatewaymanagementapi", endpoint_url=endpoint)
+    payload = json.dumps(data).encode("utf-8")
+    for conn in connection_ids:
+        try:
+            client.post_to_connection(ConnectionId=conn, Data=payload)
+        except Exception as e:
+            print(f"Failed to notify {conn}: {e}")
 
 
 def get_account_riotid(type_region, type_gamename, type_gametag, api_key):
     '''
     Retrieve the Riot account information by summoner name and tag.
 
+    Resolutions are served from the shared account cache when possible
+    (see module/account_cache.py); only misses call the Riot API.
+
     Args:
         type_region (str): Riot region code (e.g., "euw1").
         type_gamename (str): Summoner's in-game name.
@@ -63,12 +77,29 @@ def get_account_riotid(type_region, type_gamename, type_gametag, api_key):
     Returns:
         tuple: (riot_encrypted_puuid, riot_gamename, riot_gametag)
     '''
-    response = requests.get(
-        f"https://{get_routing_value(type_region)}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{type_gamename}/{type_gametag}?api_key={api_key}"
+    account_cache = get_account_cache()
+    routing = get_routing_value(type_region)
+    cached = account_cache.get(routing, type_gamename, type_gametag)
+    if cached is not None:
+        return cached
+
+    response = get_riot_client().get(
+        f"https://{routing}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{type_gamename}/{type_gametag}?api_key={api_key}",
+        priority=INTERACTIVE,
     )
-    riot_encrypted_puuid = response.json().get("puuid", "")
-    riot_gamename = response.json().get("gameName", "")
-    riot_gametag = response.json().get("tagLine", "")
+    data = response.json()
+    riot_encrypted_puuid = data.get("puuid", "")
+    riot_gamename = data.get("gameName", "")
+    riot_gametag = data.get("tagLine", "")
+    if response.status_code == 200 and riot_encrypted_puuid:
+        account_cache.put(
+            routing,
+            type_gamename,
+            type_gametag,
+            riot_encrypted_puuid,
+            riot_gamename,
+            riot_gametag,
+        )
     return riot_encrypted_puuid, riot_gamename, riot_gametag
 
 
@@ -92,12 +123,12 @@ def get_league(
         - Uploads a JSON summary to the specified S3 bucket.
         - Prints "unranked" if the player has no ranked data.
     '''
-    s3 = boto3.client("s3")
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
     file_key = f"{prefix}/league_overview.json"
 
     url = f"https://{type_region}.api.riotgames.com/lol/league/v4/entries/by-puuid/{riot_encrypted_puuid}?api_key={api_key}"
-    response = requests.get(url)
+    response = get_riot_client().get(url, priority=INTERACTIVE)
 
     if response.status_code == 200:
         data = response.json()
@@ -117,12 +148,9 @@ def get_league(
         }
 
         # Upload vers S3 en JSON
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=file_key,
-            Body=json.dumps(league_json, indent=4),
-            ContentType="application/json",  # <- corrige le type MIME
-        )
+        put_json(s3, bucket_name, file_key, league_json)
+
+        return league_json
 
 
 def get_summoners(
@@ -147,12 +175,12 @@ def get_summoners(
         - Parses the data using `parse_summoner`.
         - Uploads the JSON to the S3 bucket.
     '''
-    s3 = boto3.client("s3")
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
     file_key = f"{prefix}/summoners.json"
 
     url = f"https://{type_region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{riot_encrypted_puuid}?api_key={api_key}"
-    response = requests.get(url)
+    response = get_riot_client().get(url, priority=INTERACTIVE)
 
     if response.status_code == 200:
         data = response.json()
@@ -160,12 +188,7 @@ def get_summoners(
 
         summoner_json = {"status": "success", "data": summoner_parsed}
 
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=file_key,
-            Body=json.dumps(summoner_json, indent=4),
-            ContentType="application/json",
-        )
+        put_json(s3, bucket_name, file_key, summoner_json)
 
         return summoner_json
 
@@ -175,6 +198,37 @@ def get_summoners(
         return error_json
 
 
+def set_account_data_response(
+    type_gamename, type_gametag, summoner_json, league_json, bucket_name
+):
+    '''
+    Write the body served by getAccountData.
+
+    Args:
+        type_gamename (str): Summoner's in-game name.
+        type_gametag (str): Summoner's tag.
+        summoner_json (dict): Result of `get_summoners`.
+        league_json (dict): Result of `get_league`.
+        bucket_name (str): S3 bucket holding summoners.json and league_overview.json.
+
+    Behavior:
+        - When either file was not written (unranked player, API error), the
+          body of a previous collection is deleted rather than left stale:
+          the handler then falls back to reading both files.
+    '''
+    s3 = get_client("s3")
+    key = response_key(f"{type_gamename}_{type_gametag}", "account_data")
+    if not isinstance(league_json, dict) or summoner_json.get("status") != "success":
+        s3.delete_object(Bucket=bucket_name, Key=key)
+        return
+    put_response(
+        s3,
+        bucket_name,
+        key,
+        {"summoners": summoner_json, "league_overview": league_json},
+    )
+
+
 def get_masteries(
     type_region, type_gamename, type_gametag, riot_encrypted_puuid, api_key, bucket_name
 ):
@@ -197,12 +251,12 @@ def get_masteries(
         - Parses each champion using `parse_mastery`.
         - Uploads the JSON to the S3 bucket.
     '''
-    s3 = boto3.client("s3")
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
     file_key = f"{prefix}/champions_masteries.json"  # 
 
     url = f"https://{type_region}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{riot_encrypted_puuid}?api_key={api_key}"
-    response = requests.get(url)
+    response = get_riot_client().get(url, priority=INTERACTIVE)
 
     if response.status_code == 200:
         data = response.json()
@@ -210,12 +264,7 @@ def get_masteries(
 
         masteries_json = {"status": "success", "data": parsed_data}
 
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=file_key,
-            Body=json.dumps(masteries_json, indent=4),
-            ContentType="application/json",
-        )
+        put_json(s3, bucket_name, file_key, masteries_json)
 
         return masteries_json
 
@@ -234,7 +283,7 @@ def get_all_match_id(
     bucket_name,
     ranked_type,
 ):
-    s3 = boto3.client("s3")
+    s3 = get_client("s3")
 
     # 🔹 Liste les fichiers déjà présents
     response = s3.list_objects_v2(
@@ -283,7 +332,7 @@ def get_all_match_id(
             f"{base_url}?startTime={epoch_start_of_year}&endTime={epoch_now}"
             f"&{param}&start={start}&count={count}&api_key={api_key}"
         )
-        response = requests.get(url)
+        response = get_riot_client().get(url, priority=INTERACTIVE)
 
         if response.status_code != 200:
             print(f"❌ Error {response.status_code} on {start}")
@@ -330,12 +379,6 @@ def get_runes(p):
     return primary, sub
 
 
-def get_item_name(item_id, items_data):
-    if not item_id:
-        return None
-    return items_data.get("data", None).get(str(item_id), {}).get("name", None)
-
-
 stats_keys = {
     "championName": "Champion",
     "teamPosition": "Team Position",
@@ -365,162 +408,131 @@ stats_keys = {
 }
 
 
-def get_wrapped_up_games(
+def get_match_details(
     type_region,
     type_gamename,
     type_gametag,
-    riot_encrypted_puuid,
     api_key,
     bucket_name,
-    all_match_ids,
+    match_ids,
     endpoint,
     connection_id,
+    progress_done=0,
+    progress_total=None,
 ):
     '''
-    Fetch match data for a list of match IDs, process it, and store summaries in S3.
+    Fetch match details for a list of match IDs and store the raw JSON in S3.
 
     Args:
         type_region (str): Riot region code (e.g., "euw1").
         type_gamename (str): Summoner's in-game name.
         type_gametag (str): Summoner's tag/region suffix.
-        riot_encrypted_puuid (str): Player's encrypted PUUID.
         api_key (str): Riot API key.
-        bucket_name (str): Name of the S3 bucket to store match JSON and CSV.
-        all_match_ids (list): List of match IDs to retrieve and process.
+        bucket_name (str): S3 bucket to store the match JSON.
+        match_ids (list): Match IDs to retrieve.
         endpoint (str): API Gateway endpoint URL for sending progress updates.
         connection_id (str): WebSocket connection ID to send progress updates.
+        progress_done (int): Matches already fetched by previous chunks.
+        progress_total (int): Matches of the whole collection (defaults to `match_ids`).
+
+    Returns:
+        list: Match data of the successful requests.
 
     Behavior:
-        - Iterates over `all_match_ids` and retrieves match details via Riot API.
-        - Handles rate limiting by waiting when HTTP 429 is returned.
+        - Handles rate limiting by waiting when HTTP 429 is returned, then
+          retrying the same match; raises `RateLimited` (with the matches
+          fetched so far) when it is still rate limited after
+          MAX_RATE_LIMITED attempts.
         - Stores each match's raw JSON in S3 under "{gamename}_{gametag}/game_summary/".
-        - Identifies the player and their lane opponent in each match.
-        - Extracts stats, items, summoner spells, and runes for the player and opponent.
-        - Builds a full match summary including all participants' context.
-        - Stores detailed match context JSON in S3 under "{gamename}_{gametag}/game_context/".
-        - Aggregates all player data into a DataFrame and stores it as a CSV in S3.
-        - Sends progress updates via API Gateway WebSocket as processing proceeds.
+        - Sends progress updates (0 to 90) via API Gateway WebSocket.
     '''
-    s3 = boto3.client("s3")
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
-    file_key = f"{prefix}/{prefix}_games_summary.csv"
+    progress_total = progress_total or len(match_ids)
 
     matches_data = []
 
-    for i, match_id in enumerate(all_match_ids):
-        response = requests.get(
-            f"https://{get_routing_value(type_region)}.api.riotgames.com/lol/match/v5/matches/{match_id}?api_key={api_key}"
-        )
-
-        if response.status_code == 429:
+    for i, match_id in enumerate(match_ids):
+        for attempt in range(MAX_RATE_LIMITED):
+            with span("riot.match_detail"):
+                response = get_riot_client().get(
+                    f"https://{get_routing_value(type_region)}.api.riotgames.com/lol/match/v5/matches/{match_id}?api_key={api_key}",
+                    priority=BULK,
+                )
+            if response.status_code != 429:
+                break
+            if attempt == MAX_RATE_LIMITED - 1:
+                # The caller keeps what was fetched and resumes from this match
+                raise RateLimited(matches_data, i)
+            # Still rate limited after the client's retries: wait, then fetch
+            # the same match again instead of skipping it
             wait = int(response.headers.get("Retry-After", 30))
             print(f"Rate limit reached — awating {wait} secondes...")
             time.sleep(wait)
-            continue
 
         if response.status_code == 200:
             matches_data.append(response.json())
+            increment("matches.fetched")
 
-        json_bytes = BytesIO(
-            json.dumps(response.json(), indent=4, ensure_ascii=False).encode("utf-8")
-        )
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=f"{prefix}/game_summary/{match_id}.json",
-            Body=json_bytes.getvalue(),
-            ContentType="application/json",
-        )
+        # The Riot body is already compact JSON: stored without re-encoding
+        put_json(s3, bucket_name, f"{prefix}/game_summary/{match_id}.json", response.content)
         send_progress(
             endpoint,
             connection_id,
-            {"type": "progress", "progress": round(i / len(all_match_ids) * 90, 1)},
+            {
+                "type": "progress",
+                "progress": round((progress_done + i) / progress_total * 90, 1),
+            },
         )
 
+    return matches_data
+
+
+def set_game_contexts(
+    type_gamename,
+    type_gametag,
+    riot_encrypted_puuid,
+    bucket_name,
+    matches_data,
+    update_index=True,
+):
+    '''
+    Build the player/opponent context of each match and store it in S3.
+
+    Args:
+        type_gamename (str): Summoner's in-game name.
+        type_gametag (str): Summoner's tag/region suffix.
+        riot_encrypted_puuid (str): Player's encrypted PUUID.
+        bucket_name (str): S3 bucket to store the match contexts.
+        matches_data (list): Match data returned by `get_match_details`.
+        update_index (bool): Merge the contexts into the index. Parallel
+            workers leave it to the reducer, the index is not safe for
+            concurrent writers.
+
+    Returns:
+        list: The match contexts written.
+
+    Behavior:
+        - Identifies the player and their lane opponent in each match.
+        - Extracts stats, items, summoner spells, and runes for the player and opponent.
+        - Resolves item names with the static data of the match's patch.
+        - Stores detailed match context JSON in S3 under "{gamename}_{gametag}/game_context/".
+        - Merges those contexts into the player's game context index.
+    '''
+    s3 = get_client("s3")
+    prefix = f"{type_gamename}_{type_gametag}"
+
     all_matches = []
 
-    items_bucket = s3.get_object(
-        Bucket="ddragon-resources", Key="15.19.1/data/en_US/item.json"
-    )
-    items_data = json.loads(items_bucket["Body"].read())
+    static_data = get_static_data()
     data_player = []
-    runes = {
-        "style": {
-            8100: "Domination",
-            8300: "Inspiration",
-            8000: "Precision",
-            8400: "Resolve",
-            8200: "Sorcery",
-        },
-        "perk": {
-            8112: "Electrocute",
-            8128: "Dark Harvest",
-            9923: "Hail of Blades",
-            8126: "Cheap Shot",
-            8139: "Taste of Blood",
-            8143: "Sudden Impact",
-            8137: "Sixth Sense",
-            8140: "Grisly Mementos",
-            8141: "Deep Ward",
-            8135: "Treasure Hunter",
-            8105: "Relentless Hunter",
-            8106: "Ultimate Hunter",
-            8351: "Glacial Augment",
-            8360: "Unsealed Spellbook",
-            8369: "First Strike",
-            8306: "Hextech Flashtraption",
-            8304: "Magical Footwear",
-            8321: "Cash Back",
-            8313: "Triple Tonic",
-            8352: "Time Warp Tonic",
-            8345: "Biscuit Delivery",
-            8347: "Cosmic Insight",
-            8410: "Approach Velocity",
-            8316: "Jack Of All Trades",
-            8005: "Press the Attack",
-            8008: "Lethal Tempo",
-            8021: "Fleet Footwork",
-            8010: "Conqueror",
-            9101: "Absorb Life",
-            9111: "Triumph",
-            8009: "Presence of Mind",
-            9104: "Legend: Alacrity",
-            9105: "Legend: Haste",
-            9103: "Legend: Bloodline",
-            8014: "Coup de Grace",
-            8017: "Cut Down",
-            8299: "Last Stand",
-            8437: "Grasp of the Undying",
-            8439: "Aftershock",
-            8465: "Guardian",
-            8446: "Demolish",
-            8463: "Font of Life",
-            8401: "Shield Bash",
-            8429: "Conditioning",
-            8444: "Second Wind",
-            8473: "Bone Plating",
-            8451: "Overgrowth",
-            8453: "Revitalize",
-            8242: "Unflinching",
-            8214: "Summon Aery",
-            8229: "Arcane Comet",
-            8230: "Phase Rush",
-            8224: "Axiom Arcanist",
-            8226: "Manaflow Band",
-            8275: "Nimbus Cloak",
-            8210: "Transcendence",
-            8234: "Celerity",
-            8233: "Absolute Focus",
-            8237: "Scorch",
-            8232: "Waterwalking",
-            8236: "Gathering Storm",
-        },
-    }
 
     for (
         match_data
     ) in matches_data:  # ici, all_match_ids = liste de dictionnaires JSON déjà chargés
         match_id = match_data.get("metadata", {}).get("matchId")
         participants = match_data.get("info", {}).get("participants", [])
+        item_names = static_data.item_names(match_data.get("info", {}).get("gameVersion"))
 
         # Trouver le joueur principal
         player = next(
@@ -570,9 +582,7 @@ def get_wrapped_up_games(
                         label: get_nested_value(p, key)
                         for key, label in stats_keys.items()
                     },
-                    "items": [
-                        get_item_name(p.get(f"item{i}"), items_data) for i in range(7)
-                    ],
+                    "items": [item_names.get(p.get(f"item{i}")) for i in range(7)],
                     "summonerSpells": [p.get("summoner1Id"), p.get("summoner2Id")],
                     "runes": list(get_runes(p)),
                 }
@@ -622,47 +632,62 @@ def get_wrapped_up_games(
 
         all_matches.append(match_summary)
 
-        json_bytes = BytesIO(
-            json.dumps(match_summary, indent=4, ensure_ascii=False).encode("utf-8")
-        )
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=f"{prefix}/game_context/{match_id}.json",
-            Body=json_bytes.getvalue(),
-            ContentType="application/json",
-        )
+        put_json(s3, bucket_name, f"{prefix}/game_context/{match_id}.json", match_summary)
 
-    items_bucket = s3.get_object(
-        Bucket="ddragon-resources", Key="15.19.1/data/en_US/item.json"
-    )
-    items_data = json.loads(items_bucket["Body"].read())
+    # One object with every context of the player, read by getAllMatchIds
+    if update_index:
+        update_context_index(s3, bucket_name, prefix, all_matches)
+    return all_matches
+
+
+def set_games_summary_csv(type_gamename, type_gametag, riot_encrypted_puuid, bucket_name):
+    '''
+    Aggregate the player's stats of every stored match into the games summary CSV.
+
+    Args:
+        type_gamename (str): Summoner's in-game name.
+        type_gametag (str): Summoner's tag/region suffix.
+        riot_encrypted_puuid (str): Player's encrypted PUUID.
+        bucket_name (str): S3 bucket holding "game_summary/" and the CSV.
+    '''
+    import pandas as pd
+
+    s3 = get_client("s3")
+    prefix = f"{type_gamename}_{type_gametag}"
+    file_key = f"{prefix}/{prefix}_games_summary.csv"
+
+    static_data = get_static_data()
     matches_full_data = []
 
     data_player = []
-    runes = get_runes_from_id()
     response = s3.list_objects_v2(Bucket=bucket_name, Prefix=f"{prefix}/game_summary/")
     for obj in response["Contents"]:
         key = obj["Key"]
         if key.endswith(".json"):
             file_obj = s3.get_object(Bucket=bucket_name, Key=key)
-            file_content = file_obj["Body"].read().decode("utf-8")
             try:
-                data = json.loads(file_content)
+                data = loads(file_obj["Body"].read())
                 matches_full_data.append(data)
-            except json.JSONDecodeError:
+            except ValueError:
                 print(f" json not usable: {key}")
 
     for match_data in matches_full_data:
         participants = match_data.get("info", {}).get("participants", [])
+        game_version = match_data.get("info", {}).get("gameVersion")
+        item_names = static_data.item_names(game_version)
+        runes = static_data.rune_names(game_version)
+        if not runes["perk"]:
+            runes = get_runes_from_id()
         for player in participants:
             if player.get("puuid") == riot_encrypted_puuid:
                 data_player.append(
-                    get_data_player_infos(match_data, player, items_data, runes)
+                    get_data_player_infos(match_data, player, item_names, runes)
                 )
 
-    champions_masteries_df = pd.DataFrame(data_player)
-    csv_buffer = StringIO()
-    champions_masteries_df.to_csv(csv_buffer, index=False)
+    with span("pandas.summary_csv"):
+        champions_masteries_df = pd.DataFrame(data_player)
+        csv_buffer = StringIO()
+        champions_masteries_df.to_csv(csv_buffer, index=False)
 
     s3.put_object(
         Bucket=bucket_name,
@@ -672,77 +697,60 @@ def get_wrapped_up_games(
     )
 
 
-def get_timeline_games(
+def get_wrapped_up_games(
     type_region,
     type_gamename,
     type_gametag,
+    riot_encrypted_puuid,
     api_key,
     bucket_name,
     all_match_ids,
-    offset=0,
-    limit=5,
+    endpoint,
+    connection_id,
 ):
     '''
-    Fetch match timeline data for a subset of match IDs and store in S3.
+    Fetch match data for a list of match IDs, process it, and store summaries in S3.
 
     Args:
         type_region (str): Riot region code (e.g., "euw1").
         type_gamename (str): Summoner's in-game name.
         type_gametag (str): Summoner's tag/region suffix.
+        riot_encrypted_puuid (str): Player's encrypted PUUID.
         api_key (str): Riot API key.
-        bucket_name (str): S3 bucket to store match timeline JSON.
-        all_match_ids (list): List of match IDs to process.
-        offset (int, optional): Starting index in all_match_ids. Defaults to 0.
-        limit (int, optional): Maximum number of matches to process in this call. Defaults to 5.
+        bucket_name (str): Name of the S3 bucket to store match JSON and CSV.
+        all_match_ids (list): List of match IDs to retrieve and process.
+        endpoint (str): API Gateway endpoint URL for sending progress updates.
+        connection_id (str): WebSocket connection ID to send progress updates.
 
-    Returns:
-        dict: Information about processed matches including count, offset, total, and remaining.
+    Behavior:
+        - Iterates over `all_match_ids` and retrieves match details via Riot API.
+        - Handles rate limiting by waiting when HTTP 429 is returned, then
+          retrying the same match; raises `RateLimited` (with the matches
+          fetched so far) when it is still rate limited after
+          MAX_RATE_LIMITED attempts.
+        - Stores each match's raw JSON in S3 under "{gamename}_{gametag}/game_summary/".
+        - Identifies the player and their lane opponent in each match.
+        - Extracts stats, items, summoner spells, and runes for the player and opponent.
+        - Builds a full match summary including all participants' context.
+        - Stores detailed match context JSON in S3 under "{gamename}_{gametag}/game_context/".
+        - Merges those contexts into the player's game context index.
+        - Aggregates all player data into a DataFrame and stores it as a CSV in S3.
+        - Sends progress updates via API Gateway WebSocket as processing proceeds.
     '''
-    s3 = boto3.client("s3")
-    prefix = f"{type_gamename}_{type_gametag}"
-    offset = len(
-        s3.list_objects_v2(Bucket=bucket_name, Prefix=f"{prefix}/game_history/").get(
-            "Contents", []
-        )
+    matches_data = get_match_details(
+        type_region,
+        type_gamename,
+        type_gametag,
+        api_key,
+        bucket_name,
+        all_match_ids,
+        endpoint,
+        connection_id,
     )
-    match_ids_slice = all_match_ids[offset : offset + limit]
-    print("prout", match_ids_slice)
-
-    for match_id in match_ids_slice:
-        url = f"https://{get_routing_value(type_region)}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline?api_key={api_key}"
-        response = requests.get(url)
-
-        if response.status_code == 429:
-            wait = int(response.headers.get("Retry-After", 5))
-            print(f"Rate limit reached — awaiting {wait} secondes...")
-            time.sleep(wait)
-            continue
-
-        if response.status_code == 200:
-            try:
-                data = response.json()
-            except ValueError:
-                print(f"⚠️ not a JSON for {match_id}: {response.text[:200]}")
-                continue
-
-            json_bytes = BytesIO(
-                json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
-            )
-            s3.put_object(
-                Bucket=bucket_name,
-                Key=f"{prefix}/game_history/{match_id}.json",
-                Body=json_bytes.getvalue(),
-                ContentType="application/json",
-            )
-        else:
-            print(f"{response.status_code} error for {match_id}: {response.text[:200]}")
-
-    return {
-        "processed": len(match_ids_slice),
-        "offset": offset,
-        "total": len(all_match_ids),
-        "remaining": max(0, len(all_match_ids) - offset - limit),
-    }
+    set_game_contexts(
+        type_gamename, type_gametag, riot_encrypted_puuid, bucket_name, matches_data
+    )
+    set_games_summary_csv(type_gamename, type_gametag, riot_encrypted_puuid, bucket_name)
 
 
 def set_wrapped_data(type_gamename, type_gametag, bucket_name, bucket_process_data):
@@ -755,26 +763,34 @@ def set_wrapped_data(type_gamename, type_gametag, bucket_name, bucket_process_da
         bucket_name (str): S3 bucket containing the raw game summary CSV.
         bucket_process_data (str): S3 bucket to store the wrapped-up JSON.
     '''
-    s3 = boto3.client("s3")
+    import pandas as pd
+
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
     file_key = f"{prefix}/{prefix}_games_summary.csv"
 
     obj = s3.get_object(Bucket=bucket_name, Key=file_key)
     data = obj["Body"].read().decode("utf-8")
-    df = pd.read_csv(StringIO(data))
+    with span("pandas.wrapped"):
+        df = pd.read_csv(StringIO(data))
+        wrapped_up_json = parse_summary_to_wrapped_up(df)
 
-    wrapped_up_json = parse_summary_to_wrapped_up(df)
-
-    json_bytes = BytesIO(
-        json.dumps(
-            wrapped_up_json, indent=4, default=convert_numpy, ensure_ascii=False
-        ).encode("utf-8")
+    put_json(
+        s3, bucket_process_data, f"{prefix}/{prefix}_wrapped_up_stats.json", wrapped_up_json
     )
-    s3.put_object(
-        Bucket=bucket_process_data,
-        Key=f"{prefix}/{prefix}_wrapped_up_stats.json",
-        Body=json_bytes.getvalue(),
-        ContentType="application/json",
+
+    # Body served by getAndReturn
+    put_response(
+        s3,
+        bucket_process_data,
+        response_key(prefix, "wrapped_up"),
+        {
+            "exists": True,
+            "bucket": bucket_process_data,
+            "path": f"{prefix}/{prefix}_wrapped_up_stats.json",
+            "content": wrapped_up_json,
+        },
+        default=json_default,
     )
 
 
@@ -797,234 +813,231 @@ def set_summary_period_analysis(
         - Computes derived metrics such as CS per minute and winrate.
         - Stores results in S3 as JSON files for global, trimester, and monthly statistics.
     '''
-    s3 = boto3.client("s3")
+    import pandas as pd
+
+    s3 = get_client("s3")
     prefix = f"{type_gamename}_{type_gametag}"
     file_key = f"{prefix}/{prefix}_games_summary.csv"
 
     obj = s3.get_object(Bucket=bucket_name, Key=file_key)
     data = obj["Body"].read().decode("utf-8")
-    df = pd.read_csv(StringIO(data))
-
-    df["date"] = pd.to_datetime(df["gameCreation"], unit="ms")
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.month
-    df["month_name"] = df["date"].dt.strftime("%B")
-
-    def get_trimester(row):
-        if row["month"] >= 1 and row["month"] <= 3:
-            return f"Q1 {row['year']}"
-        elif row["month"] >= 4 and row["month"] <= 6:
-            return f"Q2 {row['year']}"
-        elif row["month"] >= 7 and row["month"] <= 9:
-            return f"Q3 {row['year']}"
-        else:
-            return f"Q4 {row['year']}"
+    with span("pandas.period_analysis"):
+        df = pd.read_csv(StringIO(data))
+
+        df["date"] = pd.to_datetime(df["gameCreation"], unit="ms")
+        df["year"] = df["date"].dt.year
+        df["month"] = df["date"].dt.month
+        df["month_name"] = df["date"].dt.strftime("%B")
+
+        def get_trimester(row):
+            if row["month"] >= 1 and row["month"] <= 3:
+                return f"Q1 {row['year']}"
+            elif row["month"] >= 4 and row["month"] <= 6:
+                return f"Q2 {row['year']}"
+            elif row["month"] >= 7 and row["month"] <= 9:
+                return f"Q3 {row['year']}"
+            else:
+                return f"Q4 {row['year']}"
+
+        df["trimester"] = df.apply(get_trimester, axis=1)
+
+        top_champions = df["champion_name"].value_counts().head(10).index.tolist()
+        df = df[df["champion_name"].isin(top_champions)]
+
+        for i, champ in enumerate(top_champions, 1):
+            count = (df["champion_name"] == champ).sum()
+
+        df["cs_total"] = df["total_minions_killed"] + df["neutralMinionsKilled"]
+        df["cs_per_min"] = (df["cs_total"] / df["gameDuration"]) * 60
+
+        stats_global = (
+            df.groupby(["champion_name", "teamPosition"])
+            .agg(
+                {
+                    "matchId": "count",
+                    "win": "sum",
+                    "kda": "mean",
+                    "kills_amount": "mean",
+                    "deaths_amount": "mean",
+                    "assists_amount": "mean",
+                    "cs_total": "mean",
+                    "cs_per_min": "mean",
+                    "total_damage_to_champions": "mean",
+                    "goldEarned": "mean",
+                    "totalDamageTaken": "mean",
+                    "visionScore": "mean",
+                    "wards_placed": "mean",
+                    "wards_killed": "mean",
+                }
+            )
+            .reset_index()
+        )
 
-    df["trimester"] = df.apply(get_trimester, axis=1)
+        stats_global.columns = [
+            "champion",
+            "position",
+            "games",
+            "wins",
+            "avg_kda",
+            "avg_kills",
+            "avg_deaths",
+            "avg_assists",
+            "avg_cs",
+            "avg_cs_per_min",
+            "avg_dmg_to_champs",
+            "avg_gold",
+            "avg_dmg_taken",
+            "avg_vision_score",
+            "avg_wards_placed",
+            "avg_wards_killed",
+        ]
 
-    top_champions = df["champion_name"].value_counts().head(10).index.tolist()
-    df = df[df["champion_name"].isin(top_champions)]
+        stats_global["winrate"] = (
+            stats_global["wins"] / stats_global["games"] * 100
+        ).round(1)
+        stats_global = stats_global.sort_values("games", ascending=False)
 
-    for i, champ in enumerate(top_champions, 1):
-        count = (df["champion_name"] == champ).sum()
+        stats_trimester = (
+            df.groupby(["champion_name", "teamPosition", "trimester"])
+            .agg(
+                {
+                    "matchId": "count",
+                    "win": "sum",
+                    "kda": "mean",
+                    "kills_amount": "mean",
+                    "deaths_amount": "mean",
+                    "assists_amount": "mean",
+                    "cs_total": "mean",
+                    "cs_per_min": "mean",
+                    "total_damage_to_champions": "mean",
+                    "goldEarned": "mean",
+                    "totalDamageTaken": "mean",
+                    "visionScore": "mean",
+                    "wards_placed": "mean",
+                    "wards_killed": "mean",
+                }
+            )
+            .reset_index()
+        )
 
-    df["cs_total"] = df["total_minions_killed"] + df["neutralMinionsKilled"]
-    df["cs_per_min"] = (df["cs_total"] / df["gameDuration"]) * 60
+        stats_trimester.columns = [
+            "champion",
+            "position",
+            "trimester",
+            "games",
+            "wins",
+            "avg_kda",
+            "avg_kills",
+            "avg_deaths",
+            "avg_assists",
+            "avg_cs",
+            "avg_cs_per_min",
+            "avg_dmg_to_champs",
+            "avg_gold",
+            "avg_dmg_taken",
+            "avg_vision_score",
+            "avg_wards_placed",
+            "avg_wards_killed",
+        ]
 
-    stats_global = (
-        df.groupby(["champion_name", "teamPosition"])
-        .agg(
-            {
-                "matchId": "count",
-                "win": "sum",
-                "kda": "mean",
-                "kills_amount": "mean",
-                "deaths_amount": "mean",
-                "assists_amount": "mean",
-                "cs_total": "mean",
-                "cs_per_min": "mean",
-                "total_damage_to_champions": "mean",
-                "goldEarned": "mean",
-                "totalDamageTaken": "mean",
-                "visionScore": "mean",
-                "wards_placed": "mean",
-                "wards_killed": "mean",
-            }
+        stats_trimester["winrate"] = (
+            stats_trimester["wins"] / stats_trimester["games"] * 100
+        ).round(1)
+        stats_trimester = stats_trimester.sort_values(["champion", "trimester"])
+
+        stats_monthly = (
+            df.groupby(
+                [
+                    "champion_name",
+                    "teamPosition",
+                    "trimester",
+                    "year",
+                    "month",
+                    "month_name",
+                ]
+            )
+            .agg(
+                {
+                    "matchId": "count",
+                    "win": "sum",
+                    "kda": "mean",
+                    "kills_amount": "mean",
+                    "deaths_amount": "mean",
+                    "assists_amount": "mean",
+                    "cs_total": "mean",
+                    "cs_per_min": "mean",
+                    "total_damage_to_champions": "mean",
+                    "goldEarned": "mean",
+                    "totalDamageTaken": "mean",
+                    "visionScore": "mean",
+                    "wards_placed": "mean",
+                    "wards_killed": "mean",
+                }
+            )
+            .reset_index()
         )
-        .reset_index()
-    )
 
-    stats_global.columns = [
-        "champion",
-        "position",
-        "games",
-        "wins",
-        "avg_kda",
-        "avg_kills",
-        "avg_deaths",
-        "avg_assists",
-        "avg_cs",
-        "avg_cs_per_min",
-        "avg_dmg_to_champs",
-        "avg_gold",
-        "avg_dmg_taken",
-        "avg_vision_score",
-        "avg_wards_placed",
-        "avg_wards_killed",
-    ]
-
-    stats_global["winrate"] = (
-        stats_global["wins"] / stats_global["games"] * 100
-    ).round(1)
-    stats_global = stats_global.sort_values("games", ascending=False)
-
-    stats_trimester = (
-        df.groupby(["champion_name", "teamPosition", "trimester"])
-        .agg(
-            {
-                "matchId": "count",
-                "win": "sum",
-                "kda": "mean",
-                "kills_amount": "mean",
-                "deaths_amount": "mean",
-                "assists_amount": "mean",
-                "cs_total": "mean",
-                "cs_per_min": "mean",
-                "total_damage_to_champions": "mean",
-                "goldEarned": "mean",
-                "totalDamageTaken": "mean",
-                "visionScore": "mean",
-                "wards_placed": "mean",
-                "wards_killed": "mean",
-            }
-        )
-        .reset_index()
-    )
+        stats_monthly.columns = [
+            "champion",
+            "position",
+            "trimester",
+            "year",
+            "month_number",
+            "month_name",
+            "games",
+            "wins",
+            "avg_kda",
+            "avg_kills",
+            "avg_deaths",
+            "avg_assists",
+            "avg_cs",
+            "avg_cs_per_min",
+            "avg_dmg_to_champs",
+            "avg_gold",
+            "avg_dmg_taken",
+            "avg_vision_score",
+            "avg_wards_placed",
+            "avg_wards_killed",
+        ]
 
-    stats_trimester.columns = [
-        "champion",
-        "position",
-        "trimester",
-        "games",
-        "wins",
-        "avg_kda",
-        "avg_kills",
-        "avg_deaths",
-        "avg_assists",
-        "avg_cs",
-        "avg_cs_per_min",
-        "avg_dmg_to_champs",
-        "avg_gold",
-        "avg_dmg_taken",
-        "avg_vision_score",
-        "avg_wards_placed",
-        "avg_wards_killed",
-    ]
-
-    stats_trimester["winrate"] = (
-        stats_trimester["wins"] / stats_trimester["games"] * 100
-    ).round(1)
-    stats_trimester = stats_trimester.sort_values(["champion", "trimester"])
-
-    stats_monthly = (
-        df.groupby(
-            [
-                "champion_name",
-                "teamPosition",
-                "trimester",
-                "year",
-                "month",
-                "month_name",
-            ]
-        )
-        .agg(
-            {
-                "matchId": "count",
-                "win": "sum",
-                "kda": "mean",
-                "kills_amount": "mean",
-                "deaths_amount": "mean",
-                "assists_amount": "mean",
-                "cs_total": "mean",
-                "cs_per_min": "mean",
-                "total_damage_to_champions": "mean",
-                "goldEarned": "mean",
-                "totalDamageTaken": "mean",
-                "visionScore": "mean",
-                "wards_placed": "mean",
-                "wards_killed": "mean",
-            }
-        )
-        .reset_index()
-    )
+        stats_monthly["winrate"] = (
+            stats_monthly["wins"] / stats_monthly["games"] * 100
+        ).round(1)
+        stats_monthly = stats_monthly.sort_values(["champion", "year", "month_number"])
 
-    stats_monthly.columns = [
-        "champion",
-        "position",
-        "trimester",
-        "year",
-        "month_number",
-        "month_name",
-        "games",
-        "wins",
-        "avg_kda",
-        "avg_kills",
-        "avg_deaths",
-        "avg_assists",
-        "avg_cs",
-        "avg_cs_per_min",
-        "avg_dmg_to_champs",
-        "avg_gold",
-        "avg_dmg_taken",
-        "avg_vision_score",
-        "avg_wards_placed",
-        "avg_wards_killed",
-    ]
-
-    stats_monthly["winrate"] = (
-        stats_monthly["wins"] / stats_monthly["games"] * 100
-    ).round(1)
-    stats_monthly = stats_monthly.sort_values(["champion", "year", "month_number"])
-
-    champion_exemple = stats_global.iloc[0]["champion"]
-    stats_champion = stats_global[stats_global["champion"] == champion_exemple].iloc[0]
-
-    stats_global_json = stats_global.to_dict(orient="records")
-    stats_trimester_json = stats_trimester.to_dict(orient="records")
-    stats_monthly_json = stats_monthly.to_dict(orient="records")
-
-    json_bytes = BytesIO(
-        json.dumps(
-            stats_global_json, indent=4, default=convert_numpy, ensure_ascii=False
-        ).encode("utf-8")
-    )
-    s3.put_object(
-        Bucket=bucket_process_data,
-        Key=f"{prefix}/{prefix}_stats_global_json.json",
-        Body=json_bytes.getvalue(),
-        ContentType="application/json",
-    )
+        champion_exemple = stats_global.iloc[0]["champion"]
+        stats_champion = stats_global[stats_global["champion"] == champion_exemple].iloc[0]
 
-    json_bytes = BytesIO(
-        json.dumps(
-            stats_trimester_json, indent=4, default=convert_numpy, ensure_ascii=False
-        ).encode("utf-8")
+        stats_global_json = stats_global.to_dict(orient="records")
+        stats_trimester_json = stats_trimester.to_dict(orient="records")
+        stats_monthly_json = stats_monthly.to_dict(orient="records")
+
+    put_json(
+        s3,
+        bucket_process_data,
+        f"{prefix}/{prefix}_stats_global_json.json",
+        stats_global_json,
     )
-    s3.put_object(
-        Bucket=bucket_process_data,
-        Key=f"{prefix}/{prefix}_stats_trimester_json.json",
-        Body=json_bytes.getvalue(),
-        ContentType="application/json",
+
+    put_json(
+        s3,
+        bucket_process_data,
+        f"{prefix}/{prefix}_stats_trimester_json.json",
+        stats_trimester_json,
     )
 
-    json_bytes = BytesIO(
-        json.dumps(
-            stats_monthly_json, indent=4, default=convert_numpy, ensure_ascii=False
-        ).encode("utf-8")
+    put_json(
+        s3,
+        bucket_process_data,
+        f"{prefix}/{prefix}_stats_monthly_json.json",
+        stats_monthly_json,
     )
-    s3.put_object(
-        Bucket=bucket_process_data,
-        Key=f"{prefix}/{prefix}_stats_monthly_json.json",
-        Body=json_bytes.getvalue(),
-        ContentType="application/json",
+
+    # Body served by getSummaryyear
+    put_response(
+        s3,
+        bucket_process_data,
+        response_key(prefix, "summary_year"),
+        stats_monthly_json,
+        default=json_default,
     )
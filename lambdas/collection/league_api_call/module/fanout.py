@@ -0,0 +1,202 @@
+"""
+Fan-out of match detail fetching
+
+For big backfills the missing match IDs are split into shards, each fetched
+by its own worker (an asynchronous invocation of this function, a local
+process for offline runs, or inline in tests). A worker stores the raw matches and their
+contexts, then writes a report:
+
+    {checkpoint}/runs/{run_id}/shard_{n:04d}.json
+    {"shard", "match_ids", "fetched", "contexts"}
+
+The orchestrating pipeline polls the reports, re-dispatches shards that
+never reported, and once all are in, reduces them: a single update of the
+game context index (which is not safe for concurrent writers).
+
+Workers share the rate limits of one Riot API key, but each container has
+its own limiter: a shard carries the number of workers running at once and
+its worker only uses that fraction of every window (`RiotClient.shared_by`).
+The pipeline sizes the shards so that no more workers run than the key can
+serve (`RiotClient.max_workers`).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .clients import get_client
+from .context_index import load_context_files
+from .endpoints_call import get_match_details, set_game_contexts
+from .riot_client import get_riot_client
+from .secret_provider import get_riot_api_key
+from .serialization import put_json
+
+# Internal events are routed on "worker", a field websocketRouter never
+# forwards: clients cannot start them
+SHARD_WORKER = "fetch_match_shard"
+DEFAULT_SHARD_SIZE = 10
+DEFAULT_FUNCTION_NAME = "league_api_call"
+
+
+def report_prefix(checkpoint_key, run_id):
+    return f"{checkpoint_key.replace('.json', '')}/runs/{run_id}/"
+
+
+def report_key(checkpoint_key, run_id, shard_index):
+    return f"{report_prefix(checkpoint_key, run_id)}shard_{shard_index:04d}.json"
+
+
+def split_shards(match_ids, shard_size):
+    return [match_ids[i : i + shard_size] for i in range(0, len(match_ids), shard_size)]
+
+
+def run_match_shard(shard):
+    """
+    Worker: fetch one shard of matches and report.
+
+    Args:
+        shard (dict): {"region", "gamename", "gametag", "puuid", "match_ids",
+            "shard_index", "run_id", "checkpoint_key", "bucket_name",
+            "workers"}, `workers` being the shards sharing the key at once.
+
+    Returns:
+        dict: The report written. A shard still rate limited after the
+        retries (`RateLimited`) writes no report: the pipeline dispatches it
+        again once SHARD_TIMEOUT_SECONDS have passed.
+    """
+    s3 = get_client("s3")
+    with get_riot_client().shared_by(shard.get("workers", 1)):
+        matches_data = get_match_details(
+            shard["region"],
+            shard["gamename"],
+            shard["gametag"],
+            get_riot_api_key(),
+            shard["bucket_name"],
+            shard["match_ids"],
+            endpoint=None,
+            connection_id=None,
+        )
+    contexts = set_game_contexts(
+        shard["gamename"],
+        shard["gametag"],
+        shard["puuid"],
+        shard["bucket_name"],
+        matches_data,
+        update_index=False,
+    )
+    report = {
+        "shard": shard["shard_index"],
+        "match_ids": shard["match_ids"],
+        "fetched": len(matches_data),
+        "contexts": contexts,
+    }
+    put_json(
+        s3,
+        shard["bucket_name"],
+        report_key(shard["checkpoint_key"], shard["run_id"], shard["shard_index"]),
+        report,
+    )
+    return report
+
+
+def reported_shards(s3, bucket_name, checkpoint_key, run_id):
+    """Indexes of the shards whose report is written"""
+    paginator = s3.get_paginator("list_objects_v2")
+    shards = set()
+    for page in paginator.paginate(
+        Bucket=bucket_name, Prefix=report_prefix(checkpoint_key, run_id)
+    ):
+        for obj in page.get("Contents", []):
+            name = obj["Key"].rsplit("/", 1)[-1]
+            shards.add(int(name.replace("shard_", "").replace(".json", "")))
+    return shards
+
+
+def load_reports(s3, bucket_name, checkpoint_key, run_id, shard_count):
+    keys = [report_key(checkpoint_key, run_id, n) for n in range(shard_count)]
+    reports = load_context_files(s3, bucket_name, keys)
+    for report in reports:
+        if "error" in report:
+            raise RuntimeError(f"Shard report unreadable: {report['key']}")
+    return reports
+
+
+def delete_reports(s3, bucket_name, checkpoint_key, run_id, shard_count):
+    for n in range(shard_count):
+        s3.delete_object(Bucket=bucket_name, Key=report_key(checkpoint_key, run_id, n))
+
+
+class LambdaDispatcher:
+    """Run each shard in an asynchronous invocation of the collector function"""
+
+    # Every shard runs at once
+    max_workers = None
+
+    def __init__(self, function_name=DEFAULT_FUNCTION_NAME):
+        self.function_name = function_name
+
+    def dispatch(self, shard):
+        get_client("lambda").invoke(
+            FunctionName=self.function_name,
+            InvocationType="Event",
+            Payload=json.dumps({"worker": SHARD_WORKER, "shard": shard}),
+        )
+
+    def shutdown(self):
+        pass
+
+
+class InlineDispatcher:
+    """Run each shard in this process as it is dispatched (tests, local runs)"""
+
+    max_workers = 1
+
+    def dispatch(self, shard):
+        # Like a failed worker: no report, the shard is dispatched again
+        try:
+            run_match_shard(shard)
+        except Exception as e:
+            print(f"Shard worker failed: {e}")
+
+    def shutdown(self):
+        pass
+
+
+class ProcessPoolDispatcher:
+    """Local emulation of the workers: one process per shard, up to max_workers"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.futures = []
+
+    def dispatch(self, shard):
+        self.futures.append(self.executor.submit(run_match_shard, shard))
+
+    def shutdown(self):
+        for future in self.futures:
+            if future.exception() is not None:
+                print(f"Shard worker failed: {future.exception()}")
+        self.executor.shutdown()
+
+
+def get_dispatcher(context=None):
+    """
+    Dispatcher configured from the environment:
+        COLLECTION_FANOUT: "lambda", "process", "inline", or unset (no fan-out)
+        COLLECTION_FANOUT_WORKERS: process pool size (default: CPU count)
+
+    Returns:
+        LambdaDispatcher, ProcessPoolDispatcher, InlineDispatcher or None.
+    """
+    mode = os.environ.get("COLLECTION_FANOUT")
+    if mode == "lambda":
+        return LambdaDispatcher(
+            context.invoked_function_arn if context is not None else DEFAULT_FUNCTION_NAME
+        )
+    if mode == "process":
+        workers = os.environ.get("COLLECTION_FANOUT_WORKERS")
+        return ProcessPoolDispatcher(int(workers) if workers else None)
+    if mode == "inline":
+        return InlineDispatcher()
+    return None
@@ -0,0 +1,177 @@
+"""
+Per-invocation instrumentation
+
+Lightweight spans and counters for the collector:
+
+    with span("stage.match_details"):
+        ...
+    increment("matches.fetched", len(matches_data))
+
+Spans record wall and CPU time (of the calling thread) and are aggregated by
+name; boto3 clients passed to `instrument_client` add one span per API
+operation ("s3.PutObject", ...) plus request, retry and byte counters.
+
+Everything recorded during an invocation is emitted as a single JSON line,
+easy to aggregate across runs (e.g. with CloudWatch Logs Insights):
+
+    {"event": "collection_metrics", "action", "duration_ms", "cpu_ms",
+     "container_peak_rss_mb", "peak_rss_growth_mb",
+     "spans": {name: {"count", "wall_ms", "cpu_ms", "max_ms"}},
+     "counters": {name: value}, ...}
+
+The kernel only keeps the peak RSS of the whole process, and a warm
+container serves many invocations: `container_peak_rss_mb` is that peak so
+far, and `peak_rss_growth_mb` how much this invocation raised it (0 when it
+stayed under the peak of an earlier one).
+"""
+
+import contextlib
+import json
+import resource
+import threading
+import time
+
+
+class Recorder:
+    """Spans and counters of the current invocation (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+
+    def add_span(self, name, wall, cpu):
+        with self._lock:
+            stats = self.spans.setdefault(
+                name, {"count": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["wall_ms"] += wall * 1000
+            stats["cpu_ms"] += cpu * 1000
+            stats["max_ms"] = max(stats["max_ms"], wall * 1000)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "spans": {
+                    name: {key: round(value, 2) for key, value in stats.items()}
+                    for name, stats in self.spans.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+
+recorder = Recorder()
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time a block (wall and thread CPU time) under `name`"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        recorder.add_span(
+            name, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+        )
+
+
+def increment(name, value=1):
+    recorder.count(name, value)
+
+
+def container_peak_rss_mb():
+    """Peak RSS of the process since the container started, not of one invocation"""
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def body_size(body):
+    """Length of a request body: bytes, str or seekable file object"""
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    if hasattr(body, "seek") and hasattr(body, "tell"):
+        position = body.tell()
+        body.seek(0, 2)
+        size = body.tell() - position
+        body.seek(position)
+        return size
+    return 0
+
+
+def instrument_client(client):
+    """
+    Record a span per API call and request/retry/byte counters of a boto3
+    client. Idempotent.
+    """
+    if getattr(client, "_instrumented", False):
+        return client
+    service = client.meta.service_model.endpoint_prefix
+    local = threading.local()
+
+    def before_call(model, params, **kwargs):
+        local.started = (time.perf_counter(), time.thread_time())
+        # Request body before signing/chunked encoding
+        size = body_size(params.get("body"))
+        if size:
+            recorder.count(f"{service}.bytes_out", size)
+
+    def after_call(http_response, parsed, model, **kwargs):
+        started = getattr(local, "started", None)
+        if started is not None:
+            recorder.add_span(
+                f"{service}.{model.name}",
+                time.perf_counter() - started[0],
+                time.thread_time() - started[1],
+            )
+        recorder.count(f"{service}.requests")
+        retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        if retries:
+            recorder.count(f"{service}.retries", retries)
+        length = http_response.headers.get("content-length")
+        if length and length.isdigit():
+            recorder.count(f"{service}.bytes_in", int(length))
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client._instrumented = True
+    return client
+
+
+@contextlib.contextmanager
+def invocation_metrics(**fields):
+    """
+    Collect the metrics of one invocation and log them as a single JSON line.
+
+    Args:
+        **fields: Extra fields of the record (action, player, ...).
+
+    Yields:
+        dict: The record, to which the caller may add fields (status, ...).
+    """
+    recorder.reset()
+    record = {"event": "collection_metrics", **fields}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    peak_start = container_peak_rss_mb()
+    try:
+        yield record
+    finally:
+        peak = container_peak_rss_mb()
+        record.update(
+            duration_ms=round((time.perf_counter() - wall_start) * 1000, 2),
+            cpu_ms=round((time.process_time() - cpu_start) * 1000, 2),
+            container_peak_rss_mb=peak,
+            peak_rss_growth_mb=round(peak - peak_start, 1),
+            **recorder.snapshot(),
+        )
+        print(json.dumps(record, default=str))
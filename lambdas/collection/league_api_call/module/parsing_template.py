@@ -1,5 +1,4 @@
 from datetime import datetime
-import pandas as pd
 
 
 def get_routing_value(type_region):
@@ -187,20 +186,33 @@ def get_runes_from_id():
     return runes_dict
 
 
-def get_data_player_infos(match_data, player, items_data, runes):
-    def get_item_name(item_id, items_data):
-        if not item_id:
-            return None
-        return items_data.get("data", None).get(str(item_id), {}).get("name", None)
+def get_data_player_infos(match_data, player, item_names, runes):
+    """
+    Flatten the stats of one participant into a summary CSV row.
+
+    Args:
+        match_data (dict): Match-v5 match.
+        player (dict): Participant of the match.
+        item_names (dict): {item_id: name} (see `StaticData.item_names`).
+        runes (dict): {"style": {id: name}, "perk": {id: name}}.
+    """
+    info = match_data.get("info", {})
+    queue_id = info.get("queueId")
+    styles = player.get("perks", {}).get("styles", [])
+    primary_style = styles[0] if styles else {}
+    sub_style = styles[1].get("style") if len(styles) > 1 else None
+    primary_perk = (primary_style.get("selections") or [{}])[0].get("perk")
+    challenges = player.get("challenges", {})
+    style_names = runes.get("style")
 
     data_player_json = {
         "matchId": match_data.get("metadata", {}).get("matchId"),
-        "gameCreation": match_data.get("info", {}).get("gameCreation"),
-        "gameDuration": match_data.get("info", {}).get("gameDuration"),
-        "gameMode": match_data.get("info", {}).get("gameMode"),
-        "queueId": match_data.get("info", {}).get("queueId"),
+        "gameCreation": info.get("gameCreation"),
+        "gameDuration": info.get("gameDuration"),
+        "gameMode": info.get("gameMode"),
+        "queueId": queue_id,
         "queueType": {420: "5v5 Ranked Solo games", 440: "5v5 Ranked Flex games"}.get(
-            match_data.get("info", {}).get("queueId"), "Other"
+            queue_id, "Other"
         ),
         "champion_name": player.get("championName"),
         "champion_id": player.get("championId"),
@@ -220,56 +232,41 @@ def get_data_player_infos(match_data, player, items_data, runes):
         "goldEarned": player.get("goldEarned"),
         "totalDamageTaken": player.get("totalDamageTaken"),
         "win": player.get("win"),
-        "items_0": get_item_name(player.get("item0"), items_data),
-        "items_1": get_item_name(player.get("item1"), items_data),
-        "items_2": get_item_name(player.get("item2"), items_data),
-        "items_3": get_item_name(player.get("item3"), items_data),
-        "items_4": get_item_name(player.get("item4"), items_data),
-        "items_5": get_item_name(player.get("item5"), items_data),
-        "items_6": get_item_name(player.get("item6"), items_data),
+        "items_0": item_names.get(player.get("item0")),
+        "items_1": item_names.get(player.get("item1")),
+        "items_2": item_names.get(player.get("item2")),
+        "items_3": item_names.get(player.get("item3")),
+        "items_4": item_names.get(player.get("item4")),
+        "items_5": item_names.get(player.get("item5")),
+        "items_6": item_names.get(player.get("item6")),
         "summoner1Id": player.get("summoner1Id"),
         "summoner2Id": player.get("summoner2Id"),
-        "primaryStyle": player.get("perks", {}).get("styles", [{}])[0].get("style"),
-        "primaryStyle_name": runes.get("style").get(
-            player.get("perks", {}).get("styles", [{}])[0].get("style")
-        ),
-        "subStyle": player.get("perks", {}).get("styles", [{}])[1].get("style")
-        if len(player.get("perks", {}).get("styles", [])) > 1
-        else None,
-        "subStyle_name": runes.get("style").get(
-            player.get("perks", {}).get("styles", [{}])[1].get("style")
-            if len(player.get("perks", {}).get("styles", [])) > 1
-            else None
-        ),
-        "primaryPerk": player.get("perks", {})
-        .get("styles", [{}])[0]
-        .get("selections", [{}])[0]
-        .get("perk"),
-        "primaryPerk_name": runes.get("perk").get(
-            player.get("perks", {})
-            .get("styles", [{}])[0]
-            .get("selections", [{}])[0]
-            .get("perk")
-        ),
+        "primaryStyle": primary_style.get("style"),
+        "primaryStyle_name": style_names.get(primary_style.get("style")),
+        "subStyle": sub_style,
+        "subStyle_name": style_names.get(sub_style),
+        "primaryPerk": primary_perk,
+        "primaryPerk_name": runes.get("perk").get(primary_perk),
         "pentakills": player.get("pentaKills"),
         "quadra_kills": player.get("quadraKills"),
         "triple_kills": player.get("tripleKills"),
         "skillshots_hit": player.get("skillshotsHit"),
         "first_blood_kill": player.get("firstBloodKill"),
-        "dragon_takedowns": player.get("challenges", {}).get("dragonTakedowns"),
-        "team_baron_kills": player.get("challenges", {}).get("teamBaronKills"),
+        "dragon_takedowns": challenges.get("dragonTakedowns"),
+        "team_baron_kills": challenges.get("teamBaronKills"),
         "visionScore": player.get("visionScore"),
         "wards_placed": player.get("wardsPlaced"),
         "wards_killed": player.get("wardsKilled"),
         "individual_position": player.get("individualPosition"),
-        "kda": player.get("challenges", {}).get("kda"),
-        "epic_monster_steals": player.get("challenges", {}).get("epicMonsterSteals"),
+        "kda": challenges.get("kda"),
+        "epic_monster_steals": challenges.get("epicMonsterSteals"),
     }
     return data_player_json
 
 
 def parse_summary_to_wrapped_up(df):
     """ """
+    import pandas as pd
 
     def format_time(seconds: int) -> str:
         days = seconds // 86400
@@ -0,0 +1,393 @@
+"""
+Resumable collection pipeline
+
+The collection of a player is split into explicit stages. After every step
+the pipeline state is saved to a checkpoint:
+
+    collection_checkpoints/{gamename}_{gametag}_{ranked_type}.json
+
+Long stages (match details) advance by bounded chunks, so a step never
+gets near the Lambda timeout, or are fanned out to parallel workers (see
+`module.fanout`). When the invocation runs low on time, the
+collector saves the checkpoint and invokes itself to continue; a run that
+crashed or timed out anyway is resumed by the next request instead of
+starting over.
+
+Timelines are not part of the pipeline: they are prefetched in the
+background once the collection is complete (see `module.timeline_prefetch`).
+"""
+
+import json
+import math
+import time
+import uuid
+
+from .endpoints_call import (
+    RateLimited,
+    get_account_riotid,
+    get_all_match_id,
+    get_league,
+    get_masteries,
+    get_match_details,
+    get_summoners,
+    send_progress,
+    set_account_data_response,
+    set_game_contexts,
+    set_games_summary_csv,
+    set_summary_period_analysis,
+    set_wrapped_data,
+)
+from .context_index import update_context_index
+from .instrumentation import span
+from .riot_client import get_riot_client
+from .fanout import (
+    DEFAULT_SHARD_SIZE,
+    delete_reports,
+    load_reports,
+    reported_shards,
+    run_match_shard,
+    split_shards,
+)
+
+STAGES = (
+    "account",
+    "profile",
+    "match_ids",
+    "match_details",
+    "fanout_dispatch",
+    "fanout_wait",
+    "fanout_reduce",
+    "summary_table",
+    "wrapped",
+    "period_analysis",
+    "done",
+)
+CHECKPOINT_FOLDER = "collection_checkpoints"
+MATCH_CHUNK_SIZE = 20
+# Share of the invocation time kept to finish the current step, save the
+# checkpoint and hand over (at most HANDOFF_RESERVE_MAX_MS)
+HANDOFF_RESERVE_FRACTION = 0.2
+HANDOFF_RESERVE_MAX_MS = 3 * 60 * 1000
+# A collection still not done after this many hand-overs is given up (its
+# checkpoint is kept: the next request resumes it)
+MAX_HANDOFFS = 20
+# Older checkpoints are dropped: the match list would be outdated
+CHECKPOINT_MAX_AGE_SECONDS = 24 * 3600
+FANOUT_POLL_SECONDS = 5
+# A worker cannot outlive the 15 min Lambda limit: shards silent for longer
+# than this are dispatched again
+SHARD_TIMEOUT_SECONDS = 16 * 60
+
+
+def handoff_reserve_ms(budget_ms):
+    """
+    Time to keep before handing over, from the time the invocation started
+    with (its configured timeout, minus the init).
+
+    Args:
+        budget_ms (int): `context.get_remaining_time_in_millis()` at the start
+            of the invocation.
+    """
+    return min(HANDOFF_RESERVE_MAX_MS, int(budget_ms * HANDOFF_RESERVE_FRACTION))
+
+
+def checkpoint_key(gamename, gametag, ranked_type):
+    """Riot IDs are case-insensitive: normalise before using them as a key"""
+    return (
+        f"{CHECKPOINT_FOLDER}/{gamename.strip().lower()}_{gametag.strip().lower()}"
+        f"_{ranked_type or 'solo'}.json"
+    )
+
+
+class CollectionPipeline:
+    """
+    Stages of a player collection, run one bounded step at a time.
+
+    Args:
+        s3: boto3 S3 client.
+        type_region (str): Riot region code (e.g., "euw1").
+        type_gamename (str): Summoner's in-game name, as requested.
+        type_gametag (str): Summoner's tag, as requested.
+        ranked_type (str): "solo", "flex", or "solo_and_flex".
+        api_key (str): Riot API key.
+        endpoint (str): API Gateway endpoint URL for progress updates.
+        connection_id: WebSocket connection ID(s) for progress updates.
+        bucket_name (str): Bucket of the raw data and checkpoints.
+        bucket_process_data (str): Bucket of the aggregated stats.
+        match_chunk_size (int): Match details fetched per step.
+        dispatcher: Fan-out workers (see `module.fanout.get_dispatcher`), or
+            None to fetch every match in this invocation.
+        shard_size (int): Matches per fan-out shard, at least (shards grow
+            when more workers would run than the Riot API key can serve).
+    """
+
+    def __init__(
+        self,
+        s3,
+        type_region,
+        type_gamename,
+        type_gametag,
+        ranked_type,
+        api_key,
+        endpoint,
+        connection_id,
+        bucket_name="s3-api-lol",
+        bucket_process_data="s3-process-lol",
+        match_chunk_size=MATCH_CHUNK_SIZE,
+        dispatcher=None,
+        shard_size=DEFAULT_SHARD_SIZE,
+    ):
+        self.s3 = s3
+        self.type_region = type_region
+        self.type_gamename = type_gamename
+        self.type_gametag = type_gametag
+        self.ranked_type = ranked_type
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.connection_id = connection_id
+        self.bucket_name = bucket_name
+        self.bucket_process_data = bucket_process_data
+        self.match_chunk_size = match_chunk_size
+        self.dispatcher = dispatcher
+        self.shard_size = shard_size
+        self.key = checkpoint_key(type_gamename, type_gametag, ranked_type)
+
+    # ----------------------
+    # Checkpoint
+    # ----------------------
+
+    def load(self):
+        """
+        Returns:
+            dict: The saved state if a recent one exists, else a new state.
+        """
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket_name, Key=self.key)
+            state = json.loads(obj["Body"].read())
+            if (
+                state["stage"] in STAGES
+                and time.time() - state["updated_at"] < CHECKPOINT_MAX_AGE_SECONDS
+            ):
+                print(f"♻️ Resuming collection at stage {state['stage']}")
+                return state
+        except self.s3.exceptions.NoSuchKey:
+            pass
+        return {"stage": STAGES[0], "cursor": 0, "started_at": time.time()}
+
+    def save(self, state):
+        state["updated_at"] = time.time()
+        self.s3.put_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            Body=json.dumps(state).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    def clear(self):
+        self.s3.delete_object(Bucket=self.bucket_name, Key=self.key)
+
+    # ----------------------
+    # Stages
+    # ----------------------
+
+    def step(self, state):
+        """
+        Run one bounded step of the current stage.
+
+        Returns:
+            dict: The new state (same stage with an advanced cursor for
+            chunked stages, next stage otherwise).
+        """
+        stage = state["stage"]
+        with span(f"stage.{stage}"):
+            next_stage = getattr(self, f"_stage_{stage}")(state)
+        if next_stage is not None:
+            state["stage"] = next_stage
+            state["cursor"] = 0
+        return state
+
+    def done(self, state):
+        return state["stage"] == "done"
+
+    def _progress(self, progress):
+        send_progress(
+            self.endpoint, self.connection_id, {"type": "progress", "progress": progress}
+        )
+
+    def _stage_account(self, state):
+        self._progress(0)
+        puuid, riot_gamename, riot_gametag = get_account_riotid(
+            type_region=self.type_region,
+            type_gamename=self.type_gamename,
+            type_gametag=self.type_gametag,
+            api_key=self.api_key,
+        )
+        state.update(puuid=puuid, riot_gamename=riot_gamename, riot_gametag=riot_gametag)
+        return "profile"
+
+    def _stage_profile(self, state):
+        player = (
+            self.type_region,
+            state["riot_gamename"],
+            state["riot_gametag"],
+            state["puuid"],
+            self.api_key,
+            self.bucket_name,
+        )
+        league_json = get_league(*player)
+        summoner_json = get_summoners(*player)
+        set_account_data_response(
+            state["riot_gamename"],
+            state["riot_gametag"],
+            summoner_json,
+            league_json,
+            self.bucket_name,
+        )
+        get_masteries(*player)
+        return "match_ids"
+
+    def _stage_match_ids(self, state):
+        missing_ids, match_ids = get_all_match_id(
+            state["riot_gamename"],
+            state["riot_gametag"],
+            state["puuid"],
+            self.type_region,
+            self.api_key,
+            self.bucket_name,
+            self.ranked_type,
+        )
+        state.update(missing_ids=missing_ids, match_ids=match_ids)
+        if not missing_ids:
+            print("No match ids found")
+            return "done"
+        if self.dispatcher is not None and len(missing_ids) > self.shard_size:
+            return "fanout_dispatch"
+        return "match_details"
+
+    def _stage_match_details(self, state):
+        cursor = state["cursor"]
+        chunk = state["missing_ids"][cursor : cursor + self.match_chunk_size]
+        processed = len(chunk)
+        try:
+            matches_data = get_match_details(
+                self.type_region,
+                state["riot_gamename"],
+                state["riot_gametag"],
+                self.api_key,
+                self.bucket_name,
+                chunk,
+                self.endpoint,
+                self.connection_id,
+                progress_done=cursor,
+                progress_total=len(state["missing_ids"]),
+            )
+        except RateLimited as e:
+            # Checkpoint what was fetched: the next step (or invocation,
+            # after a hand-over) resumes from the rate-limited match
+            print(f"⏳ {e}, resuming at match {cursor + e.processed}")
+            matches_data, processed = e.matches_data, e.processed
+        set_game_contexts(
+            state["riot_gamename"],
+            state["riot_gametag"],
+            state["puuid"],
+            self.bucket_name,
+            matches_data,
+        )
+        state["cursor"] = cursor + processed
+        if state["cursor"] < len(state["missing_ids"]):
+            return None
+        return "summary_table"
+
+    def _dispatch(self, state, shard_indexes):
+        shards = split_shards(state["missing_ids"], state.get("shard_size", self.shard_size))
+        for n in shard_indexes:
+            # Resumed without fan-out configured: run the shard here
+            dispatch = self.dispatcher.dispatch if self.dispatcher else run_match_shard
+            dispatch(
+                {
+                    "region": self.type_region,
+                    "gamename": state["riot_gamename"],
+                    "gametag": state["riot_gametag"],
+                    "puuid": state["puuid"],
+                    "match_ids": shards[n],
+                    "shard_index": n,
+                    "run_id": state["run_id"],
+                    "checkpoint_key": self.key,
+                    "bucket_name": self.bucket_name,
+                    "workers": state.get("workers", 1) if self.dispatcher else 1,
+                }
+            )
+        state["dispatched_at"] = time.time()
+
+    def _stage_fanout_dispatch(self, state):
+        # No more shards than the key can serve at once: bigger shards instead
+        missing = len(state["missing_ids"])
+        state["shard_size"] = max(
+            self.shard_size, math.ceil(missing / get_riot_client().max_workers())
+        )
+        state["run_id"] = uuid.uuid4().hex
+        state["shard_count"] = len(split_shards(state["missing_ids"], state["shard_size"]))
+        pool = self.dispatcher.max_workers if self.dispatcher else 1
+        state["workers"] = min(state["shard_count"], pool or state["shard_count"])
+        self._dispatch(state, range(state["shard_count"]))
+        print(
+            f"🔀 Dispatched {state['shard_count']} shards of {state['shard_size']} matches"
+            f" ({state['workers']} at once)"
+        )
+        return "fanout_wait"
+
+    def _stage_fanout_wait(self, state):
+        done = reported_shards(self.s3, self.bucket_name, self.key, state["run_id"])
+        self._progress(round(len(done) / state["shard_count"] * 90, 1))
+        if len(done) == state["shard_count"]:
+            return "fanout_reduce"
+
+        if time.time() - state["dispatched_at"] > SHARD_TIMEOUT_SECONDS:
+            missing = [n for n in range(state["shard_count"]) if n not in done]
+            print(f"⚠️ Re-dispatching shards {missing}")
+            self._dispatch(state, missing)
+        else:
+            time.sleep(FANOUT_POLL_SECONDS)
+        return None
+
+    def _stage_fanout_reduce(self, state):
+        reports = load_reports(
+            self.s3, self.bucket_name, self.key, state["run_id"], state["shard_count"]
+        )
+        update_context_index(
+            self.s3,
+            self.bucket_name,
+            f"{state['riot_gamename']}_{state['riot_gametag']}",
+            [context for report in reports for context in report["contexts"]],
+        )
+        delete_reports(
+            self.s3, self.bucket_name, self.key, state["run_id"], state["shard_count"]
+        )
+        if self.dispatcher is not None:
+            self.dispatcher.shutdown()
+        return "summary_table"
+
+    def _stage_summary_table(self, state):
+        set_games_summary_csv(
+            state["riot_gamename"], state["riot_gametag"], state["puuid"], self.bucket_name
+        )
+        return "wrapped"
+
+    def _stage_wrapped(self, state):
+        set_wrapped_data(
+            state["riot_gamename"],
+            state["riot_gametag"],
+            self.bucket_name,
+            self.bucket_process_data,
+        )
+        return "period_analysis"
+
+    def _stage_period_analysis(self, state):
+        set_summary_period_analysis(
+            state["riot_gamename"],
+            state["riot_gametag"],
+            self.bucket_name,
+            self.bucket_process_data,
+        )
+        self._progress(90)
+        return "done"
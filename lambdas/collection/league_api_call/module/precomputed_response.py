@@ -0,0 +1,109 @@
+"""
+Precomputed API responses
+
+Read-only UI endpoints used to download a JSON object, parse it and dump it
+again on every request. The producers now also write the exact response
+body, gzip-compressed, under `{prefix}/responses/{name}.json.gz`; the
+handlers stream those bytes back as-is.
+
+The body is compressed with a fixed mtime, so identical content always gives
+the same bytes and therefore the same S3 ETag. That ETag is returned to the
+browser, which revalidates with If-None-Match and gets a 304 while the
+player's data has not changed.
+"""
+
+import base64
+import gzip
+import json
+
+DEFAULT_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=86400"
+
+CORS_HEADERS = {"Access-Control-Allow-Origin": "*"}
+
+
+def response_key(prefix, name):
+    return f"{prefix}/responses/{name}.json.gz"
+
+
+def put_response(s3, bucket_name, key, payload, cache_control=DEFAULT_CACHE_CONTROL, default=None):
+    """
+    Write a ready-to-serve response body.
+
+    Args:
+        s3: boto3 S3 client.
+        bucket_name (str): Bucket read by the handler.
+        key (str): Object key, see `response_key`.
+        payload: JSON-serialisable response body.
+        cache_control (str): Cache-Control header returned to the browser.
+        default (callable): `json.dumps` fallback for non-JSON types.
+    """
+    body = json.dumps(payload, ensure_ascii=False, default=default).encode("utf-8")
+    s3.put_object(
+        Bucket=bucket_name,
+        Key=key,
+        Body=gzip.compress(body, mtime=0),
+        ContentType="application/json",
+        ContentEncoding="gzip",
+        CacheControl=cache_control,
+    )
+
+
+def _header(event, name):
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value or ""
+    return ""
+
+
+def serve_response(s3, bucket_name, key, event):
+    """
+    Serve a precomputed response without parsing it.
+
+    Returns:
+        dict or None: API Gateway response (200 with the gzip bytes, 304 if
+        the client's If-None-Match matches), or None if nothing was
+        precomputed for this key, so the caller can fall back.
+    """
+    client_etags = [
+        tag.strip().replace("W/", "", 1)
+        for tag in _header(event, "if-none-match").split(",")
+        if tag.strip()
+    ]
+    conditional = {"IfNoneMatch": client_etags[0]} if len(client_etags) == 1 else {}
+
+    try:
+        obj = s3.get_object(Bucket=bucket_name, Key=key, **conditional)
+    except s3.exceptions.NoSuchKey:
+        return None
+    except s3.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] not in ("304", "NotModified"):
+            raise
+        return {
+            "statusCode": 304,
+            "headers": {**CORS_HEADERS, "ETag": client_etags[0]},
+            "body": "",
+        }
+
+    headers = {
+        **CORS_HEADERS,
+        "Content-Type": "application/json",
+        "ETag": obj["ETag"],
+        "Cache-Control": obj.get("CacheControl") or DEFAULT_CACHE_CONTROL,
+    }
+    if obj["ETag"] in client_etags:
+        return {"statusCode": 304, "headers": headers, "body": ""}
+
+    body = obj["Body"].read()
+    if "gzip" in _header(event, "accept-encoding"):
+        return {
+            "statusCode": 200,
+            "headers": {**headers, "Content-Encoding": "gzip"},
+            "body": base64.b64encode(body).decode("ascii"),
+            "isBase64Encoded": True,
+        }
+    return {
+        "statusCode": 200,
+        "headers": headers,
+        "body": gzip.decompress(body).decode("utf-8"),
+    }
@@ -0,0 +1,113 @@
+"""
+Cached secrets
+
+SSM parameters are read once and kept for a TTL, so warm invocations skip
+the SSM round-trip while a rotated value still propagates within
+`ttl_seconds`. If a refresh fails, the last known value keeps being served.
+The Riot client refreshes the key early when the API rejects it (401/403),
+see `refresh_riot_api_key`.
+"""
+
+import os
+import threading
+import time
+
+from .clients import get_client
+
+DEFAULT_RIOT_API_KEY_PARAMETER = "/rift-rewind-challenge2/riot-api-key"
+DEFAULT_TTL_SECONDS = 300
+# A burst of rejected requests triggers one SSM read, not one per request
+MIN_REFRESH_SECONDS = 10
+
+
+class CachedSecret:
+    """
+    A decrypted SSM parameter with TTL-based refresh.
+
+    Args:
+        parameter_name (str): SSM parameter name.
+        ttl_seconds (int): How long a fetched value is served before refreshing.
+    """
+
+    def __init__(self, parameter_name, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.parameter_name = parameter_name
+        self.ttl_seconds = ttl_seconds
+        self._value = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns:
+            str: The parameter value.
+
+        Raises:
+            Exception: The SSM error, if no value was ever fetched.
+        """
+        if self._value is not None and time.time() - self._fetched_at < self.ttl_seconds:
+            return self._value
+
+        with self._lock:
+            if self._value is not None and time.time() - self._fetched_at < self.ttl_seconds:
+                return self._value
+            try:
+                parameter = get_client("ssm").get_parameter(
+                    Name=self.parameter_name, WithDecryption=True
+                )
+            except Exception as e:
+                if self._value is None:
+                    raise
+                print(f"Failed to refresh {self.parameter_name}, serving cached value: {e}")
+                self._fetched_at = time.time()
+                return self._value
+            self._value = parameter["Parameter"]["Value"]
+            self._fetched_at = time.time()
+            return self._value
+
+    def invalidate(self):
+        """
+        Force the next `get` to go back to SSM (e.g. after a 401/403).
+        Ignored within MIN_REFRESH_SECONDS of the last fetch.
+        """
+        with self._lock:
+            if time.time() - self._fetched_at >= MIN_REFRESH_SECONDS:
+                self._fetched_at = 0.0
+
+
+_riot_api_key = None
+
+
+def get_riot_api_key():
+    """
+    Riot API key shared by every handler.
+
+    Resolution order:
+        - RIOT_API_KEY_PARAMETER set: cached SSM parameter of that name.
+        - RIOT_API_KEY set: the environment value.
+        - otherwise: cached SSM parameter DEFAULT_RIOT_API_KEY_PARAMETER.
+    The SSM cache lifetime is SECRET_CACHE_TTL seconds (default 300).
+    """
+    global _riot_api_key
+    parameter_name = os.environ.get("RIOT_API_KEY_PARAMETER")
+    if not parameter_name and os.environ.get("RIOT_API_KEY"):
+        return os.environ["RIOT_API_KEY"]
+
+    if _riot_api_key is None:
+        _riot_api_key = CachedSecret(
+            parameter_name or DEFAULT_RIOT_API_KEY_PARAMETER,
+            ttl_seconds=int(os.environ.get("SECRET_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+        )
+    return _riot_api_key.get()
+
+
+def refresh_riot_api_key():
+    """
+    Re-read the Riot API key after the API rejected it (rotated key).
+
+    Returns:
+        str: The current key, which is the rejected one when the key comes
+        from the environment or SSM still holds it.
+    """
+    if _riot_api_key is not None:
+        _riot_api_key.invalidate()
+    return get_riot_api_key()
@@ -0,0 +1,426 @@
+"""
+Patch-aware static game data (Data Dragon)
+
+Items, runes, champions and summoner spells change with every patch, so a
+match is resolved against the data of its own patch, taken from
+`info.gameVersion` ("15.19.712.2345" -> Data Dragon version "15.19.1").
+
+Every file is looked up in order:
+
+    1. in-process cache (kept for the life of the container)
+    2. local snapshots: STATIC_DATA_DIR (default /tmp/ddragon), then the
+       `ddragon/` folder shipped next to this module, if any
+    3. S3 bucket "ddragon-resources": {version}/data/{language}/{file}.json
+    4. Data Dragon CDN, written back to the local snapshot and to S3
+
+When no layer has the patch (no network access, patch not mirrored yet),
+the nearest known version is used instead, so lookups keep working offline.
+That fallback is only kept UNAVAILABLE_RETRY_SECONDS: the patch is then
+looked up again, so a warm container picks it up once it is mirrored.
+Fetches lock their own (version, file) only: a slow CDN download does not
+hold up lookups of other files or patches.
+
+Hot lookups (item, perk and style names) are compiled once per patch into
+flat int-keyed dicts, see `item_names` and `rune_names`.
+
+Seed a snapshot for offline runs or for the deployment package with:
+
+    python -m module.static_data 15.19.1 15.20.1 --dir module/ddragon
+"""
+
+import json
+import os
+import threading
+import time
+
+from .clients import get_client
+
+DEFAULT_BUCKET = "ddragon-resources"
+DEFAULT_VERSION = "15.19.1"
+DEFAULT_LANGUAGE = "en_US"
+DEFAULT_CACHE_DIR = "/tmp/ddragon"
+BUNDLED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ddragon")
+CDN_URL = "https://ddragon.leagueoflegends.com/cdn"
+CDN_TIMEOUT_SECONDS = 5
+# How long the nearest-version fallback of a missing patch is served before
+# the patch is looked up again
+UNAVAILABLE_RETRY_SECONDS = 300
+
+# Data set -> Data Dragon file name
+DATA_FILES = {
+    "items": "item",
+    "runes": "runesReforged",
+    "champions": "champion",
+    "summoner_spells": "summoner",
+}
+
+
+def ddragon_version(game_version=None):
+    """
+    Data Dragon version of a match.
+
+    Args:
+        game_version (str): `info.gameVersion` of a match ("15.19.712.2345"),
+            a Data Dragon version ("15.19.1"), or None/"latest".
+
+    Returns:
+        str: "{major}.{minor}.1", or DEFAULT_VERSION if unknown.
+    """
+    if not game_version or game_version == "latest":
+        return os.environ.get("STATIC_DATA_VERSION", DEFAULT_VERSION)
+    parts = str(game_version).split(".")
+    if len(parts) < 2 or not (parts[0].isdigit() and parts[1].isdigit()):
+        return os.environ.get("STATIC_DATA_VERSION", DEFAULT_VERSION)
+    return f"{int(parts[0])}.{int(parts[1])}.1"
+
+
+def version_tuple(version):
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except ValueError:
+        return ()
+
+
+def compile_item_names(items_data):
+    """item.json -> {item_id (int): name}"""
+    return {
+        int(item_id): item["name"]
+        for item_id, item in (items_data or {}).get("data", {}).items()
+        if item_id.isdigit()
+    }
+
+
+def compile_rune_names(runes_data):
+    """runesReforged.json -> {"style": {id: name}, "perk": {id: name}}"""
+    names = {"style": {}, "perk": {}}
+    for style in runes_data or []:
+        names["style"][style["id"]] = style["name"]
+        for slot in style.get("slots", []):
+            for rune in slot.get("runes", []):
+                names["perk"][rune["id"]] = rune["name"]
+    return names
+
+
+class StaticData:
+    """
+    Layered cache of Data Dragon files.
+
+    Args:
+        bucket_name (str): S3 mirror of Data Dragon.
+        cache_dir (str): Writable local snapshot directory.
+        language (str): Data Dragon language code.
+        allow_network (bool): Allow the CDN layer. Defaults to true unless
+            STATIC_DATA_OFFLINE is set.
+    """
+
+    def __init__(
+        self,
+        bucket_name=DEFAULT_BUCKET,
+        cache_dir=None,
+        language=DEFAULT_LANGUAGE,
+        allow_network=None,
+    ):
+        self.bucket_name = bucket_name
+        self.cache_dir = cache_dir or os.environ.get("STATIC_DATA_DIR", DEFAULT_CACHE_DIR)
+        self.language = language
+        if allow_network is None:
+            allow_network = not os.environ.get("STATIC_DATA_OFFLINE")
+        self.allow_network = allow_network
+        self._cache = {}
+        self._tables = {}
+        # (version, file) -> (fallback data, time.time() of the next lookup)
+        self._unavailable = {}
+        self._s3_versions = None
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+
+    # ----------------------
+    # Public API
+    # ----------------------
+
+    def load(self, data_set, game_version=None):
+        """
+        Args:
+            data_set (str): "items", "runes", "champions" or "summoner_spells".
+            game_version (str): See `ddragon_version`.
+
+        Returns:
+            dict|list: The Data Dragon file of the closest available patch
+            ({} if none is available at all).
+        """
+        file_name = DATA_FILES[data_set]
+        version = ddragon_version(game_version)
+        key = (version, file_name)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._fetch_lock(key):
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            data = self._fetch(version, file_name)
+            if data is not None:
+                self._cache[key] = data
+                self._unavailable.pop(key, None)
+                return data
+            data = self._nearest(version, file_name)
+            self._unavailable[key] = (data, time.time() + UNAVAILABLE_RETRY_SECONDS)
+            return data
+
+    def _cached(self, key):
+        """Data of `key`, or its fallback until the patch is looked up again"""
+        data = self._cache.get(key)
+        if data is not None:
+            return data
+        fallback = self._unavailable.get(key)
+        if fallback is not None and time.time() < fallback[1]:
+            return fallback[0]
+        return None
+
+    def _fetch_lock(self, key):
+        with self._lock:
+            return self._fetch_locks.setdefault(key, threading.Lock())
+
+    def preload(self, data_sets=tuple(DATA_FILES), game_version=None):
+        """
+        Load data sets of a patch from the local snapshots only, without any
+        S3 or CDN request: meant for init. Whatever is missing locally, like
+        any other patch, is loaded on first use.
+
+        Args:
+            data_sets (iterable): Keys of DATA_FILES.
+            game_version (str): See `ddragon_version` (default: the
+                configured current patch).
+
+        Returns:
+            list: The data sets loaded.
+        """
+        version = ddragon_version(game_version)
+        loaded = []
+        for data_set in data_sets:
+            file_name = DATA_FILES[data_set]
+            data = self._read_local(version, file_name)
+            if data is None:
+                continue
+            with self._lock:
+                self._cache.setdefault((version, file_name), data)
+            loaded.append(data_set)
+        return loaded
+
+    def items(self, game_version=None):
+        return self.load("items", game_version)
+
+    def runes(self, game_version=None):
+        return self.load("runes", game_version)
+
+    def champions(self, game_version=None):
+        return self.load("champions", game_version)
+
+    def summoner_spells(self, game_version=None):
+        return self.load("summoner_spells", game_version)
+
+    def item_names(self, game_version=None):
+        """
+        Returns:
+            dict: {item_id (int): name}, compiled once per patch.
+        """
+        return self._compiled("item_names", game_version, compile_item_names, "items")
+
+    def rune_names(self, game_version=None):
+        """
+        Returns:
+            dict: {"style": {style_id: name}, "perk": {perk_id: name}},
+            compiled once per patch.
+        """
+        return self._compiled("rune_names", game_version, compile_rune_names, "runes")
+
+    def _compiled(self, table, game_version, compile_fn, data_set):
+        version = ddragon_version(game_version)
+        data = self.load(data_set, version)
+        # Compiled again when the data changes (a fallback replaced by the patch)
+        source, compiled = self._tables.get((version, table), (None, None))
+        if source is not data:
+            compiled = compile_fn(data)
+            self._tables[(version, table)] = (data, compiled)
+        return compiled
+
+    def snapshot(self, versions, target_dir=None):
+        """Write every data set of `versions` to a local snapshot directory"""
+        for version in versions:
+            for file_name in DATA_FILES.values():
+                data = self._fetch(version, file_name)
+                if data is None:
+                    print(f"⚠️ {file_name} {version} unavailable")
+                    continue
+                self._write_local(version, file_name, data, target_dir)
+                print(f"💾 {file_name} {version} saved")
+
+    # ----------------------
+    # Layers
+    # ----------------------
+
+    def _relative_path(self, version, file_name):
+        return f"{version}/data/{self.language}/{file_name}.json"
+
+    def _local_dirs(self):
+        return [self.cache_dir, BUNDLED_DIR]
+
+    def _fetch(self, version, file_name):
+        data = self._read_local(version, file_name)
+        if data is not None:
+            return data
+
+        data = self._read_s3(version, file_name)
+        if data is not None:
+            self._write_local(version, file_name, data)
+            return data
+
+        data = self._read_cdn(version, file_name)
+        if data is not None:
+            print(f"🌐 {file_name} {version} downloaded from Data Dragon")
+            self._write_local(version, file_name, data)
+            self._write_s3(version, file_name, data)
+        return data
+
+    def _read_local(self, version, file_name):
+        for directory in self._local_dirs():
+            path = os.path.join(directory, self._relative_path(version, file_name))
+            try:
+                with open(path, "rb") as file:
+                    return json.load(file)
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def _write_local(self, version, file_name, data, target_dir=None):
+        path = os.path.join(
+            target_dir or self.cache_dir, self._relative_path(version, file_name)
+        )
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write static data snapshot {path}: {e}")
+
+    def _read_s3(self, version, file_name):
+        try:
+            obj = get_client("s3").get_object(
+                Bucket=self.bucket_name, Key=self._relative_path(version, file_name)
+            )
+            return json.loads(obj["Body"].read())
+        except Exception:
+            return None
+
+    def _write_s3(self, version, file_name, data):
+        try:
+            get_client("s3").put_object(
+                Bucket=self.bucket_name,
+                Key=self._relative_path(version, file_name),
+                Body=json.dumps(data, ensure_ascii=False).encode("utf-8"),
+                ContentType="application/json",
+            )
+        except Exception as e:
+            print(f"⚠️ Could not mirror {file_name} {version} to S3: {e}")
+
+    def _read_cdn(self, version, file_name):
+        if not self.allow_network:
+            return None
+        # Only the CDN layer needs requests: imported on a cache miss, not at init
+        import requests
+
+        try:
+            response = requests.get(
+                f"{CDN_URL}/{self._relative_path(version, file_name)}",
+                timeout=CDN_TIMEOUT_SECONDS,
+            )
+            if response.status_code != 200:
+                return None
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    # ----------------------
+    # Offline fallback
+    # ----------------------
+
+    def _known_versions(self, file_name):
+        versions = {version for version, name in list(self._cache) if name == file_name}
+        for directory in self._local_dirs():
+            try:
+                versions.update(
+                    entry
+                    for entry in os.listdir(directory)
+                    if os.path.exists(
+                        os.path.join(directory, self._relative_path(entry, file_name))
+                    )
+                )
+            except OSError:
+                continue
+        if self._s3_versions is None:
+            try:
+                response = get_client("s3").list_objects_v2(
+                    Bucket=self.bucket_name, Delimiter="/"
+                )
+                self._s3_versions = {
+                    prefix["Prefix"].rstrip("/")
+                    for prefix in response.get("CommonPrefixes", [])
+                }
+            except Exception:
+                self._s3_versions = set()
+        versions.update(self._s3_versions)
+        return versions
+
+    def _nearest(self, version, file_name):
+        """Data of the closest older patch, else of the closest newer one"""
+        target = version_tuple(version)
+        candidates = sorted(
+            (v for v in self._known_versions(file_name) if version_tuple(v) and v != version),
+            key=version_tuple,
+        )
+        older = [v for v in candidates if version_tuple(v) < target]
+        newer = [v for v in candidates if version_tuple(v) > target]
+        for candidate in list(reversed(older)) + newer:
+            data = self._cache.get((candidate, file_name))
+            if data is None and (candidate, file_name) not in self._unavailable:
+                data = self._read_local(candidate, file_name) or self._read_s3(
+                    candidate, file_name
+                )
+            if data:
+                print(f"⚠️ {file_name} {version} unavailable, using {candidate}")
+                self._cache[(candidate, file_name)] = data
+                return data
+        print(f"⚠️ No {file_name} data available for {version}")
+        return {}
+
+
+_static_data = None
+_static_data_lock = threading.Lock()
+
+
+def get_static_data():
+    """
+    Container-wide static data, configured from the environment:
+        STATIC_DATA_DIR: writable snapshot directory (default /tmp/ddragon)
+        STATIC_DATA_OFFLINE: set to disable the Data Dragon CDN
+        STATIC_DATA_VERSION: version used when the patch is unknown
+    """
+    global _static_data
+    if _static_data is None:
+        with _static_data_lock:
+            if _static_data is None:
+                _static_data = StaticData()
+    return _static_data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Snapshot Data Dragon files")
+    parser.add_argument("versions", nargs="+", help='Data Dragon versions, e.g. "15.19.1"')
+    parser.add_argument("--dir", default=BUNDLED_DIR, help="Snapshot directory")
+    args = parser.parse_args()
+    get_static_data().snapshot(args.versions, args.dir)
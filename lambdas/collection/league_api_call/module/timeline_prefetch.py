@@ -0,0 +1,154 @@
+"""
+Background timeline prefetch
+
+The coach needs the timeline of a match before it can analyse it. Timelines
+are prefetched for every collected match, most recent first (the ones a
+player is most likely to open), after the collection itself is complete so
+the UI is not kept waiting.
+
+The worker is idempotent: missing timelines are recomputed from the
+`game_history/` listing, so a run that stops early (request budget, Lambda
+deadline) is simply continued by the next one.
+"""
+
+import os
+import time
+
+from .clients import get_client
+from .context_index import match_sort_key
+from .instrumentation import increment, span
+from .parsing_template import get_routing_value
+from .riot_client import BULK, get_riot_client
+from .serialization import put_json
+
+PREFETCH_WORKER = "prefetch_timelines"
+# Riot development keys allow 100 requests per 2 minutes: stay under it so
+# interactive traffic keeps some room
+DEFAULT_MIN_INTERVAL_SECONDS = 1.5
+DEFAULT_MAX_REQUESTS = 200
+MAX_RETRIES = 3
+# 429s in a row on one match (after the client's own retries) before the run
+# stops: the key is throttled, the next collection continues the prefetch
+MAX_RATE_LIMITED = 3
+
+
+def default_max_requests():
+    """Request budget of a prefetch chain (TIMELINE_PREFETCH_MAX_REQUESTS, default 200)"""
+    return int(os.environ.get("TIMELINE_PREFETCH_MAX_REQUESTS", DEFAULT_MAX_REQUESTS))
+
+
+def missing_timelines(s3, bucket_name, prefix, match_ids):
+    """
+    Returns:
+        list: Match IDs without a stored timeline, most recent first.
+    """
+    paginator = s3.get_paginator("list_objects_v2")
+    stored = set()
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=f"{prefix}/game_history/"):
+        stored.update(
+            obj["Key"].rsplit("/", 1)[-1].replace(".json", "")
+            for obj in page.get("Contents", [])
+        )
+    missing = [match_id for match_id in set(match_ids) if match_id not in stored]
+    return sorted(missing, key=match_sort_key, reverse=True)
+
+
+def prefetch_timelines(
+    type_region,
+    type_gamename,
+    type_gametag,
+    api_key,
+    bucket_name,
+    match_ids,
+    max_requests=None,
+    min_interval_seconds=None,
+    deadline=None,
+):
+    '''
+    Download the missing timelines of a player's matches.
+
+    Args:
+        type_region (str): Riot region code (e.g., "euw1").
+        type_gamename (str): Summoner's in-game name.
+        type_gametag (str): Summoner's tag/region suffix.
+        api_key (str): Riot API key.
+        bucket_name (str): S3 bucket holding "game_history/".
+        match_ids (list): Matches whose timeline should be stored.
+        max_requests (int): Riot API request budget of this run
+            (default: `default_max_requests()`).
+        min_interval_seconds (float): Minimum delay between two requests
+            (TIMELINE_PREFETCH_INTERVAL, default 1.5).
+        deadline (float): `time.time()` after which no request is started.
+
+    Returns:
+        dict: {"fetched", "failed", "remaining", "requests", "stopped"};
+        "stopped" is "done" once every timeline is stored or failed
+        permanently, else "budget", "deadline" or "rate_limited" (one match
+        rate limited MAX_RATE_LIMITED times in a row).
+    '''
+    if max_requests is None:
+        max_requests = default_max_requests()
+    if min_interval_seconds is None:
+        min_interval_seconds = float(
+            os.environ.get("TIMELINE_PREFETCH_INTERVAL", DEFAULT_MIN_INTERVAL_SECONDS)
+        )
+
+    s3 = get_client("s3")
+    prefix = f"{type_gamename}_{type_gametag}"
+    queue = missing_timelines(s3, bucket_name, prefix, match_ids)
+    print(f"🕒 {len(queue)} timelines to prefetch for {prefix}")
+
+    fetched, failed, requests_made, retries, rate_limited = 0, [], 0, 0, 0
+    last_request = 0.0
+    stopped = "done"
+    while queue:
+        if requests_made >= max_requests:
+            stopped = "budget"
+            break
+        wait = last_request + min_interval_seconds - time.time()
+        if deadline is not None and time.time() + max(wait, 0) > deadline:
+            stopped = "deadline"
+            break
+        if wait > 0:
+            time.sleep(wait)
+
+        match_id = queue[0]
+        url = f"https://{get_routing_value(type_region)}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline?api_key={api_key}"
+        last_request = time.time()
+        requests_made += 1
+        with span("riot.timeline"):
+            response = get_riot_client().get(url, priority=BULK)
+
+        if response.status_code == 429:
+            rate_limited += 1
+            if rate_limited >= MAX_RATE_LIMITED:
+                stopped = "rate_limited"
+                break
+            # Retry the same match once the window has passed
+            retry_after = int(response.headers.get("Retry-After", 5))
+            print(f"Rate limit reached — awaiting {retry_after} secondes...")
+            last_request = time.time() + retry_after - min_interval_seconds
+            continue
+
+        if response.status_code == 200:
+            put_json(
+                s3, bucket_name, f"{prefix}/game_history/{match_id}.json", response.content
+            )
+            fetched += 1
+            increment("timelines.fetched")
+        elif response.status_code >= 500 and retries < MAX_RETRIES:
+            retries += 1
+            continue
+        else:
+            print(f"{response.status_code} error for {match_id}: {response.text[:200]}")
+            failed.append(match_id)
+        retries = rate_limited = 0
+        queue.pop(0)
+
+    return {
+        "fetched": fetched,
+        "failed": failed,
+        "remaining": len(queue),
+        "requests": requests_made,
+        "stopped": stopped,
+    }
@@ -0,0 +1,107 @@
+"""
+Output schema of the coaching analysis
+
+The LLM is asked to answer with a JSON object following `LoLAnalysis`.
+Kept out of `all_game_data` so pydantic is only imported when a prompt is
+built, not for cached analyses.
+"""
+
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+# ----------------------
+# Nested reusable models
+# ----------------------
+
+
+class Player(BaseModel):
+    champion: str = Field(..., description="The champion played by the player")
+    role: str = Field(..., description="The role of the player in the game")
+    score: float = Field(
+        ..., ge=0, le=10, description="Overall performance score (0-10)"
+    )
+
+
+class Phase(BaseModel):
+    title: str = Field(..., description="Phase summary title")
+    rating: float = Field(
+        ..., ge=0, le=10, description="Impact rating for the phase (0-10)"
+    )
+    strengths: List[str] = Field(
+        ..., description="List of strengths observed in this phase"
+    )
+    issues: List[str] = Field(..., description="List of issues observed in this phase")
+
+
+class StrengthOrIssue(BaseModel):
+    title: str = Field(..., description="Title of the strength or issue")
+    details: List[str] = Field(
+        ..., description="Detailed points describing the strength or issue"
+    )
+
+
+class CoachingPoint(BaseModel):
+    title: str = Field(..., description="Coaching point title")
+    problem: str = Field(..., description="Problem to address")
+    solutions: List[str] = Field(
+        ..., description="Recommended solutions for the problem"
+    )
+
+
+class GameOutcomeAnalysis(BaseModel):
+    summary: str = Field(..., description="Summary of the game outcome")
+    key_factors: List[str] = Field(
+        ..., description="Key factors that influenced the game outcome"
+    )
+
+
+class ActionableImprovement(BaseModel):
+    priority: Literal["CRITICAL", "HIGH", "MEDIUM", "LOW"] = Field(
+        ..., description="Priority of the improvement"
+    )
+    action: str = Field(..., description="Action to take")
+    # impact: str = Field(..., description="Expected impact of the action")
+
+
+class FinalVerdict(BaseModel):
+    summary: str = Field(
+        ..., description="Final summary verdict of the player's performance"
+    )
+    key_takeaways: List[str] = Field(
+        ..., description="Key takeaways for improvement or reinforcement"
+    )
+
+
+# ----------------------
+# Main schema
+# ----------------------
+
+
+class PhaseAnalysis(BaseModel):
+    early_game: Phase = Field(..., description="Analysis of the early game phase")
+    mid_game: Phase = Field(..., description="Analysis of the mid game phase")
+    late_game: Phase = Field(..., description="Analysis of the late game phase")
+
+
+class LoLAnalysis(BaseModel):
+    player: Player = Field(..., description="Player information and overall score")
+    phase_analysis: PhaseAnalysis = Field(..., description="Phase-wise game analysis")
+    global_strengths: List[StrengthOrIssue] = Field(
+        ..., description="Global strengths observed throughout the game"
+    )
+    global_issues: List[StrengthOrIssue] = Field(
+        ..., description="Global issues observed throughout the game"
+    )
+    coaching_points: List[CoachingPoint] = Field(
+        ..., description="Specific coaching points for the player"
+    )
+    game_outcome_analysis: GameOutcomeAnalysis = Field(
+        ..., description="Analysis of the overall game outcome"
+    )
+    actionable_improvements: List[ActionableImprovement] = Field(
+        ..., description="Actionable improvements with priority"
+    )
+    final_verdict: FinalVerdict = Field(
+        ..., description="Final verdict summarizing player performance"
+    )
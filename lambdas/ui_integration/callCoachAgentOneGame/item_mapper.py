@@ -1,12 +1,11 @@
 """
 Item ID to Name Mapper
-Uses Riot's Data Dragon API to map item IDs to readable names
+Uses Riot's Data Dragon, through the shared static data cache, to map item IDs
+to readable names
 """
 
-import requests
-import json
 from typing import Dict, Optional
-from functools import lru_cache
+from module.static_data import StaticData, ddragon_version, get_static_data
 
 
 class ItemMapper:
@@ -17,30 +16,23 @@ class ItemMapper:
         Initialize item mapper
 
         Args:
-            version: Patch version (e.g., "13.24.1" or "latest")
+            version: Match gameVersion (e.g., "15.19.712.2345"), patch version
+                (e.g., "15.19.1") or "latest" for the default patch
             language: Language code (e.g., "en_US", "ko_KR", "fr_FR")
         """
-        self.version = version
+        self.version = ddragon_version(version)
         self.language = language
         self.items_cache = None
         self._load_items()
 
     def _load_items(self):
-        """Load item data from Data Dragon"""
+        """Load item data from the static data cache (memory, disk, S3, CDN)"""
         try:
-            # Get latest version if needed
-            if self.version == "latest":
-                versions_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-                versions = requests.get(versions_url).json()
-                self.version = versions[0]
-
-            # Fetch item data
-            items_url = f"https://ddragon.leagueoflegends.com/cdn/{self.version}/data/{self.language}/item.json"
-            response = requests.get(items_url)
-            response.raise_for_status()
-
-            data = response.json()
-            self.items_cache = data["data"]
+            static_data = get_static_data()
+            if self.language != static_data.language:
+                static_data = _static_data_for(self.language)
+            data = static_data.items(self.version)
+            self.items_cache = data.get("data", {})
             print(f"✓ Loaded {len(self.items_cache)} items from patch {self.version}")
 
         except Exception as e:
@@ -92,16 +84,36 @@ class ItemMapper:
         return ", ".join(names)
 
 
-# Singleton instance for convenience
-_mapper_instance = None
+# One instance per patch and language, kept for the life of the container
+_mapper_instances: Dict[tuple, ItemMapper] = {}
+_language_static_data: Dict[str, StaticData] = {}
 
 
-def get_item_mapper(version: str = "latest", language: str = "en_US") -> ItemMapper:
-    """Get or create singleton ItemMapper instance"""
-    global _mapper_instance
-    if _mapper_instance is None:
-        _mapper_instance = ItemMapper(version, language)
-    return _mapper_instance
+def _static_data_for(language: str) -> StaticData:
+    """Static data cache of a non-default language"""
+    if language not in _language_static_data:
+        _language_static_data[language] = StaticData(language=language)
+    return _language_static_data[language]
+
+
+def get_item_mapper(version: Optional[str] = "latest", language: str = "en_US") -> ItemMapper:
+    """Get or create the ItemMapper of a patch (match gameVersion or "latest")"""
+    key = (ddragon_version(version), language)
+    if key not in _mapper_instances:
+        _mapper_instances[key] = ItemMapper(key[0], language)
+    return _mapper_instances[key]
+
+
+def get_item_names(version: Optional[str] = "latest") -> Dict[int, str]:
+    """
+    Item ID to name table of a patch (match gameVersion or "latest"), compiled
+    once per container from the local static data cache
+    """
+    try:
+        return get_static_data().item_names(version)
+    except Exception as e:
+        print(f"Warning: Could not load item names: {e}")
+        return {}
 
 
 def map_item_id(item_id: int) -> str:
@@ -1,24 +1,41 @@
 # lambda_function.py
 
 import json
-import boto3
-import asyncio
 from all_game_data import analyze_single_match
 from module.retrieve_account import *
-import os
+from module.clients import track_invocation
+from module.riot_client import get_riot_client
+from module.secret_provider import get_riot_api_key
+from module.static_data import get_static_data
 
+# Items of the configured current patch (STATIC_DATA_VERSION) come from the
+# local snapshot during init, without S3 or CDN requests. Other patches, or
+# this one when no snapshot is bundled, are loaded on first use, per patch.
+get_static_data().preload(("items",))
 
+
+@track_invocation
 def lambda_handler(event, context):
 
     if event.get("body") is not None:
         event = json.loads(event.get("body"))
 
+    get_riot_client().reset_metrics()
+    try:
+        return analyze(event)
+    finally:
+        # The analysis is returned as is: Riot API accounting goes to the logs
+        get_riot_client().log_metrics()
+
+
+def analyze(event):
+    """Resolve the player's account and analyze the requested match"""
     region = event.get("region")
     gameid = event.get("gameid")
     gamename = event.get("gamename")
     gametag = event.get("gametag")
 
-    API_KEY = os.environ.get("RIOT_API_KEY")
+    API_KEY = get_riot_api_key()
 
     riot_encrypted_puuid, riot_gamename, riot_gametag = get_account_riotid(
         type_region=region,
@@ -0,0 +1,213 @@
+"""
+LLM backends for the coaching agent
+Bedrock in production, a local replay stub for offline runs and load tests
+"""
+
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_MODEL_ID = "eu.anthropic.claude-haiku-4-5-20251001-v1:0"
+DEFAULT_BEDROCK_REGION = "eu-west-3"
+
+SYSTEM_PROMPT = (
+    "You are a League of Legends performance analyst. Your analysis depends on the role of the player. "
+    "Analyze the provided match data and return ONLY valid JSON matching the schema provided. Be concise. "
+    "Do not include any explanation or markdown formatting, just the raw JSON."
+)
+
+
+class LLMBackend:
+    """Interface every coaching backend implements"""
+
+    name = "base"
+
+    def generate(self, prompt: str, key: Optional[str] = None) -> str:
+        """
+        Send a prompt to the model and return the raw text answer
+
+        Args:
+            prompt: Full user prompt (match data + schema)
+            key: Optional identifier of the request (the match ID), used by
+                 backends that record or replay responses
+
+        Returns:
+            Raw model output
+        """
+        raise NotImplementedError
+
+
+class BedrockBackend(LLMBackend):
+    """Calls a Bedrock model through the Converse API, with throttling retries"""
+
+    name = "bedrock"
+
+    def __init__(
+        self,
+        model_id: str = DEFAULT_MODEL_ID,
+        client=None,
+        region_name: str = DEFAULT_BEDROCK_REGION,
+        max_retries: int = 5,
+        record_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            model_id: Bedrock model or inference profile ID
+            client: Existing bedrock-runtime client (created if None)
+            region_name: Region used when creating the client
+            max_retries: Attempts on ThrottlingException
+            record_dir: If set, every answer is written to {record_dir}/{key}.json
+                        so it can be replayed later by ReplayBackend
+        """
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(
+                "bedrock-runtime",
+                region_name=region_name,
+                config=Config(
+                    max_pool_connections=5,
+                    retries={"max_attempts": 3, "mode": "adaptive"},
+                ),
+            )
+        self.client = client
+        self.model_id = model_id
+        self.max_retries = max_retries
+        self.record_dir = record_dir
+
+    def generate(self, prompt: str, key: Optional[str] = None) -> str:
+        from botocore.exceptions import ClientError
+
+        for attempt in range(self.max_retries):
+            try:
+                response = self.client.converse(
+                    modelId=self.model_id,
+                    messages=[{"role": "user", "content": [{"text": prompt}]}],
+                    system=[{"text": SYSTEM_PROMPT}],
+                )
+                text_content = response["output"]["message"]["content"][0]["text"]
+                if self.record_dir and key:
+                    self._record(key, text_content)
+                return text_content
+
+            except ClientError as e:
+                if e.response["Error"]["Code"] == "ThrottlingException":
+                    if attempt < self.max_retries - 1:
+                        wait_time = (2**attempt) + (time.time() % 1)  # Add jitter
+                        print(
+                            f"⏳ Rate limited, waiting {wait_time:.2f}s before retry {attempt + 1}/{self.max_retries}"
+                        )
+                        time.sleep(wait_time)
+                    else:
+                        raise
+                else:
+                    raise
+
+    def _record(self, key: str, text_content: str):
+        path = Path(self.record_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / f"{key}.json").write_text(text_content, encoding="utf-8")
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Local stand-in for Bedrock
+
+    Replays recorded answers instead of calling a model. An answer recorded
+    for the requested key ({key}.json in the replay directory) is preferred,
+    otherwise recorded answers are served round-robin. Latency is simulated
+    with a sleep so load tests keep a realistic shape.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        responses_dir: Optional[str] = None,
+        responses: Optional[List[str]] = None,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            responses_dir: Directory of recorded answers (*.json / *.txt)
+            responses: In-memory answers, used in addition to the directory
+            latency_ms: Simulated model latency per call
+            jitter_ms: Uniform jitter added on top of latency_ms
+            seed: Seed of the jitter generator, for reproducible runs
+        """
+        self.by_key: Dict[str, str] = {}
+        self.responses: List[str] = list(responses or [])
+        if responses_dir:
+            for path in sorted(Path(responses_dir).iterdir()):
+                if path.suffix in (".json", ".txt"):
+                    text = path.read_text(encoding="utf-8")
+                    self.by_key[path.stem] = text
+                    self.responses.append(text)
+        if not self.responses:
+            raise ValueError("ReplayBackend needs at least one recorded response")
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._next = 0
+
+    def generate(self, prompt: str, key: Optional[str] = None) -> str:
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += self._rng.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if key is not None and key in self.by_key:
+            return self.by_key[key]
+
+        text_content = self.responses[self._next % len(self.responses)]
+        self._next += 1
+        return text_content
+
+
+def get_backend(name: Optional[str] = None, **kwargs) -> LLMBackend:
+    """
+    Build the backend selected by name or by the LLM_BACKEND env variable
+
+    Env variables:
+        LLM_BACKEND: "bedrock" (default) or "replay"
+        LLM_MODEL_ID: Bedrock model ID
+        LLM_RECORD_DIR: Directory where Bedrock answers are recorded
+        LLM_REPLAY_DIR: Directory of recorded answers for the replay backend
+        LLM_REPLAY_LATENCY_MS / LLM_REPLAY_JITTER_MS: Simulated latency
+    """
+    name = name or os.environ.get("LLM_BACKEND", "bedrock")
+
+    if name == "bedrock":
+        kwargs.setdefault("model_id", os.environ.get("LLM_MODEL_ID", DEFAULT_MODEL_ID))
+        kwargs.setdefault("record_dir", os.environ.get("LLM_RECORD_DIR"))
+        return BedrockBackend(**kwargs)
+
+    if name == "replay":
+        kwargs.setdefault("responses_dir", os.environ.get("LLM_REPLAY_DIR"))
+        kwargs.setdefault(
+            "latency_ms", float(os.environ.get("LLM_REPLAY_LATENCY_MS", 0))
+        )
+        kwargs.setdefault("jitter_ms", float(os.environ.get("LLM_REPLAY_JITTER_MS", 0)))
+        return ReplayBackend(**kwargs)
+
+    raise ValueError(f"Unknown LLM backend '{name}', expected 'bedrock' or 'replay'")
+
+
+def parse_llm_json(text_content: str) -> dict:
+    """Parse model output, stripping any markdown code fences"""
+    text_content = text_content.strip()
+    if text_content.startswith("```json"):
+        text_content = text_content[7:]
+    if text_content.startswith("```"):
+        text_content = text_content[3:]
+    if text_content.endswith("```"):
+        text_content = text_content[:-3]
+    return json.loads(text_content.strip())
@@ -8,14 +8,6 @@ from dataclasses import dataclass, field
 from collections import defaultdict
 import statistics
 
-# Try to import item mapper, gracefully handle if not available
-try:
-    from item_mapper import get_item_mapper
-    ITEM_MAPPER_AVAILABLE = True
-except ImportError:
-    ITEM_MAPPER_AVAILABLE = False
-    print("Warning: item_mapper not available. Items will show as IDs only.")
-
 
 @dataclass
 class ObjectiveSpawn:
@@ -117,6 +109,7 @@ class TimelineAnalysis:
     # Matchup and build info
     matchup: str = ""  # e.g., "Zed vs Talon"
     build: List[int] = field(default_factory=list)  # Final item IDs
+    build_names: List[str] = field(default_factory=list)  # Final item names, set by resolve_item_names
     build_path: List[Dict[str, Any]] = field(default_factory=list)  # Build path with timestamps: [{"item_id": int, "timestamp": float, "item_name": str}]
     team_comp: Dict[str, List[str]] = field(default_factory=dict)  # ally_team and enemy_team
 
@@ -563,19 +556,11 @@ def parse_timeline(match_data: Dict, timeline_data: Dict, puuid: str) -> Timelin
                         event_timestamp_ms = event.get('timestamp', timestamp_ms)
                         event_timestamp_sec = event_timestamp_ms / 1000
 
-                        # Get item name if mapper is available
-                        item_name = str(item_id)
-                        if ITEM_MAPPER_AVAILABLE:
-                            try:
-                                mapper = get_item_mapper()
-                                item_name = mapper.get_item_name(item_id)
-                            except Exception:
-                                pass
-
+                        # Names are resolved after parsing (see resolve_item_names)
                         special_events['build_path'].append({
                             'item_id': item_id,
                             'timestamp': event_timestamp_sec,
-                            'item_name': item_name
+                            'item_name': str(item_id)
                         })
 
             # Store important events where player participated
@@ -693,6 +678,28 @@ def parse_timeline(match_data: Dict, timeline_data: Dict, puuid: str) -> Timelin
     return analysis
 
 
+def resolve_item_names(analysis: TimelineAnalysis, item_names: Dict[int, str]) -> TimelineAnalysis:
+    """
+    Post-process a parsed timeline: name the items of the build path and final build
+
+    Kept out of parse_timeline so parsing never waits on static data.
+
+    Args:
+        analysis: Result of parse_timeline
+        item_names: Item ID to name table of the match's patch
+            (see item_mapper.get_item_names)
+
+    Returns:
+        The same analysis, with item names set
+    """
+    for item_info in analysis.build_path:
+        item_info['item_name'] = item_names.get(item_info['item_id'], f"Unknown Item ({item_info['item_id']})")
+    analysis.build_names = [
+        item_names.get(item_id, f"Unknown Item ({item_id})") for item_id in analysis.build
+    ]
+    return analysis
+
+
 def format_for_llm(analysis: TimelineAnalysis, match_result: str, match_data: Dict) -> str:
     """
     Format timeline analysis into LLM-readable text
@@ -787,13 +794,9 @@ Vision: {phase.wards_placed}wards ({phase.control_wards_placed}control wards) /
         
         return output
     
-    # Format final build with item names if mapper available
-    if ITEM_MAPPER_AVAILABLE and analysis.build:
-        try:
-            mapper = get_item_mapper()
-            build_str = ", ".join(mapper.get_item_name(item_id) for item_id in analysis.build)
-        except Exception:
-            build_str = ", ".join(str(item_id) for item_id in analysis.build)
+    # Format final build with item names if they were resolved
+    if analysis.build_names:
+        build_str = ", ".join(analysis.build_names)
     else:
         build_str = ", ".join(str(item_id) for item_id in analysis.build) if analysis.build else "No items"
 
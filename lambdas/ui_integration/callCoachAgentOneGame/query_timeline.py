@@ -980,6 +980,44 @@ INSIGHTS:
     return output
 
 
+def save_timeline(region: str, gamename: str, gametag: str, game_id: str, bucket_name: str) -> bool:
+    """
+    Fetch a match timeline from the Riot API and store it next to the match summary
+
+    Args:
+        region: Platform region (e.g., "euw1")
+        gamename: Player's game name
+        gametag: Player's tag
+        game_id: Match ID
+        bucket_name: S3 bucket holding "{gamename}_{gametag}/game_history/"
+
+    Returns:
+        True if the timeline was stored, False otherwise
+    """
+    from module.clients import get_client
+    from module.retrieve_account import get_routing_value
+    from module.riot_client import INTERACTIVE, get_riot_client
+    from module.secret_provider import get_riot_api_key
+    from module.serialization import put_json
+
+    api_key = get_riot_api_key()
+    url = f"https://{get_routing_value(region)}.api.riotgames.com/lol/match/v5/matches/{game_id}/timeline?api_key={api_key}"
+    # A user is waiting for this analysis
+    response = get_riot_client().get(url, priority=INTERACTIVE)
+
+    if response.status_code != 200:
+        print(f"{response.status_code} error for {game_id} timeline: {response.text[:200]}")
+        return False
+
+    put_json(
+        get_client("s3"),
+        bucket_name,
+        f"{gamename}_{gametag}/game_history/{game_id}.json",
+        response.content,
+    )
+    return True
+
+
 if __name__ == "__main__":
     print("Timeline Parser Module Loaded")
     print("Usage: analysis = parse_timeline(match_data, timeline_data, puuid)")
@@ -1,5 +1,8 @@
 import json
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from precomputed_response import response_key, serve_response
+from serialization import loads
 
 s3 = boto3.client("s3")
 BUCKET_NAME = "s3-api-lol"
@@ -19,20 +22,24 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Missing gamename or gametag parameter"}),
         }
 
-    combined_data = {}
+    precomputed = serve_response(
+        s3, BUCKET_NAME, response_key(prefix, "account_data"), event
+    )
+    if precomputed:
+        return precomputed
 
-    for file_name in FILES_TO_FETCH:
+    def fetch(file_name):
         s3_key = f"{prefix}/{file_name}"
         try:
             response = s3.get_object(Bucket=BUCKET_NAME, Key=s3_key)
-            file_content = response["Body"].read().decode("utf-8")
-            data = json.loads(file_content)
-            key_name = file_name.replace(".json", "")
-            combined_data[key_name] = data
+            return file_name.replace(".json", ""), loads(response["Body"].read())
 
         except Exception as e:
             print(f"Error fetching {s3_key}: {e}")
-            combined_data[file_name] = {"error": str(e)}
+            return file_name, {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=len(FILES_TO_FETCH)) as executor:
+        combined_data = dict(executor.map(fetch, FILES_TO_FETCH))
 
     return {
         "statusCode": 200,
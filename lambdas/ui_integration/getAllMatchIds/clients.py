@@ -0,0 +1,94 @@
+"""
+Shared boto3 clients
+
+Clients are created once per Lambda container (the S3 client at import
+time, the others on first use) and reused by every warm invocation.
+boto3 clients are thread-safe once built, so only creation is locked.
+"""
+
+import functools
+import json
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+
+_INIT_STARTED = time.perf_counter()
+
+CLIENT_CONFIGS = {
+    "s3": Config(
+        max_pool_connections=10, retries={"max_attempts": 3, "mode": "adaptive"}
+    ),
+    "bedrock-runtime": Config(
+        max_pool_connections=5, retries={"max_attempts": 3, "mode": "adaptive"}
+    ),
+}
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(service_name, region_name=None, endpoint_url=None):
+    """
+    Return the shared client for a service, creating it on first use.
+
+    Args:
+        service_name (str): boto3 service name ("s3", "ssm", "lambda",
+            "bedrock-runtime", "apigatewaymanagementapi", ...).
+        region_name (str, optional): Region override.
+        endpoint_url (str, optional): Endpoint override, e.g. the API Gateway
+            management endpoint of a WebSocket API.
+
+    Returns:
+        botocore.client.BaseClient: The cached client.
+    """
+    key = (service_name, region_name, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = boto3.client(
+                    service_name,
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    config=CLIENT_CONFIGS.get(service_name),
+                )
+                _clients[key] = client
+    return client
+
+
+def track_invocation(handler):
+    """
+    Decorator logging one JSON line per invocation with cold/warm state.
+
+    The first invocation of a container is the cold one; `init_ms` is the
+    time spent between this module's import and that first call.
+    """
+    state = {"invocations": 0}
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        started = time.perf_counter()
+        cold_start = state["invocations"] == 0
+        state["invocations"] += 1
+        try:
+            return handler(event, context)
+        finally:
+            record = {
+                "event": "invocation",
+                "handler": handler.__module__,
+                "cold_start": cold_start,
+                "invocation": state["invocations"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+            if cold_start:
+                record["init_ms"] = round((started - _INIT_STARTED) * 1000, 2)
+            print(json.dumps(record))
+
+    return wrapper
+
+
+# Every handler talks to S3: build its client during the init phase
+get_client("s3")
@@ -1,25 +1,42 @@
 # lambda_function.py
 
 import json
-import boto3
 from retrieveaccount import *
+from clients import get_client, track_invocation
+from riot_client import get_riot_client
+from secret_provider import get_riot_api_key
+from context_index import load_context_page, load_context_page_from_objects
 
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
 
+
+@track_invocation
 def lambda_handler(event, context):
 
     if event.get("body") is not None:
         event = json.loads(event.get("body"))
 
+    get_riot_client().reset_metrics()
+    try:
+        response = list_matches(event)
+    finally:
+        get_riot_client().log_metrics()
+    if "body" in response:
+        body = json.loads(response["body"])
+        body["riot_api"] = get_riot_client().summary()
+        response["body"] = json.dumps(body)
+    return response
+
+
+def list_matches(event):
+    """Page of the player's match contexts"""
     region = event.get("region")
     gamename = event.get("gamename")
     gametag = event.get("gametag")
 
-    ssm = boto3.client("ssm")
     try:
-        parameter = ssm.get_parameter(
-            Name="/rift-rewind-challenge2/riot-api-key", WithDecryption=True
-        )
-        API_KEY = parameter["Parameter"]["Value"]
+        API_KEY = get_riot_api_key()
     except Exception as e:
         print(f"Failed to get API key: {str(e)}")
         return {"statusCode": 500, "error": "Failed to retrieve API key"}
@@ -31,40 +48,34 @@ def lambda_handler(event, context):
         api_key=API_KEY,
     )
     bucket_name = "s3-api-lol"
-    folder = f"{riot_gamename}_{riot_gametag}/game_context"
-    s3 = boto3.client("s3")
+    prefix = f"{riot_gamename}_{riot_gametag}"
+    folder = f"{prefix}/game_context"
+    s3 = get_client("s3")
 
-    paginator = s3.get_paginator("list_objects_v2")
-    page_iterator = paginator.paginate(Bucket=bucket_name, Prefix=folder)
-
-    file_keys = []
-    for page in page_iterator:
-        if "Contents" in page:
-            file_keys.extend([obj["Key"] for obj in page["Contents"]])
-
-    if not file_keys:
+    try:
+        page = max(1, int(event.get("page") or 1))
+        page_size = min(MAX_PAGE_SIZE, max(1, int(event.get("page_size") or DEFAULT_PAGE_SIZE)))
+    except (TypeError, ValueError):
         return {
-            "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "file_count": 0,
-                    "files": [],
-                    "message": f"No files found in folder '{folder}'",
-                }
-            ),
+            "statusCode": 400,
+            "body": json.dumps({"error": "'page' and 'page_size' must be integers"}),
         }
 
-    files_content = []
-    for key in file_keys:
-        try:
-            obj = s3.get_object(Bucket=bucket_name, Key=key)
-            content = obj["Body"].read().decode("utf-8")
-            files_content.append(json.loads(content))
-        except Exception as e:
-            print(f"Failed to load {key}: {str(e)}")
-            files_content.append({"key": key, "error": str(e)})
+    # Manifest + the shards overlapping the page when the collector built the index
+    result = load_context_page(s3, bucket_name, prefix, page, page_size)
+    if result is None:
+        result = load_context_page_from_objects(s3, bucket_name, prefix, page, page_size)
+    files_content, total_files = result
 
-    return {
-        "statusCode": 200,
-        "body": json.dumps({"file_count": len(files_content), "files": files_content}),
+    body = {
+        "file_count": len(files_content),
+        "files": files_content,
+        "page": page,
+        "page_size": page_size,
+        "has_more": page * page_size < total_files,
+        "total_files": total_files,
     }
+    if total_files == 0:
+        body["message"] = f"No files found in folder '{folder}'"
+
+    return {"statusCode": 200, "body": json.dumps(body)}
@@ -1,4 +1,5 @@
-import requests
+from riot_client import INTERACTIVE, get_riot_client
+from account_cache import get_account_cache
 
 
 def get_routing_value(type_region):
@@ -27,10 +28,27 @@ def get_routing_value(type_region):
 
 
 def get_account_riotid(type_region, type_gamename, type_gametag, api_key):
-    response = requests.get(
-        f"https://{get_routing_value(type_region)}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{type_gamename}/{type_gametag}?api_key={api_key}"
+    account_cache = get_account_cache()
+    routing = get_routing_value(type_region)
+    cached = account_cache.get(routing, type_gamename, type_gametag)
+    if cached is not None:
+        return cached
+
+    response = get_riot_client().get(
+        f"https://{routing}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{type_gamename}/{type_gametag}?api_key={api_key}",
+        priority=INTERACTIVE,
     )
-    riot_encrypted_puuid = response.json().get("puuid", "")
-    riot_gamename = response.json().get("gameName", "")
-    riot_gametag = response.json().get("tagLine", "")
+    data = response.json()
+    riot_encrypted_puuid = data.get("puuid", "")
+    riot_gamename = data.get("gameName", "")
+    riot_gametag = data.get("tagLine", "")
+    if response.status_code == 200 and riot_encrypted_puuid:
+        account_cache.put(
+            routing,
+            type_gamename,
+            type_gametag,
+            riot_encrypted_puuid,
+            riot_gamename,
+            riot_gametag,
+        )
     return riot_encrypted_puuid, riot_gamename, riot_gametag
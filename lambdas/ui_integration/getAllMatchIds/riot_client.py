@@ -0,0 +1,387 @@
+"""
+Riot API client with priority lanes
+
+Every Riot request shares the rate limits of one API key. Requests are
+tagged with a priority class:
+
+    interactive: a user is waiting (account lookup, first refresh, coach)
+    bulk:        backfills (match details, timeline prefetch)
+
+Bulk requests may only use `bulk_share` of each rate-limit window; the rest
+is reserved for interactive ones, which are also served first whenever both
+are queued. The limiter lives in the container: the split holds between
+the requests of one container, not across Lambdas. Other containers using
+the same key are only seen through the 429s they cause, on which every lane
+pauses for Retry-After and the request is retried (fan-out workers divide
+the windows between them, see `shared_by`). On a 401/403 the API key is
+re-read from its secret and, if it was rotated, the request is sent again
+once with the new key.
+
+Queue wait per class is recorded, as well as per endpoint accounting
+(status codes, latency histogram, bytes, 429s and the time they cost), so
+it shows which endpoints use the rate budget. `summary` returns both and
+`log_metrics` logs them; `reset_metrics` starts a new accounting period
+(one per invocation in the handlers).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+# Development key limits: (requests, window in seconds)
+DEFAULT_RATE_LIMITS = ((20, 1), (100, 120))
+DEFAULT_BULK_SHARE = 0.7
+MAX_RETRIES = 3
+# Rejected API key: it was probably rotated
+AUTH_ERRORS = (401, 403)
+WAIT_SAMPLES = 1024
+# Upper bounds of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+MATCH_ID = re.compile(r"^[A-Z0-9]+_\d+$")
+RIOT_HOST = re.compile(r"^https://([a-z0-9]+)\.api\.riotgames\.com")
+# Path segments followed by identifiers, and how many
+ID_SEGMENTS = {"by-riot-id": 2, "by-puuid": 1, "by-summoner": 1, "by-champion": 1}
+
+
+def with_api_key(url, api_key):
+    """`url` with its `api_key` query parameter replaced"""
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name != "api_key"]
+    query.append(("api_key", api_key))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def endpoint_name(url):
+    """
+    Endpoint template of a Riot API URL, without routing host, query and
+    identifiers, e.g. "/lol/match/v5/matches/{matchId}/timeline".
+    """
+    parts = urlsplit(url).path.strip("/").split("/")
+    template = []
+    pending_ids = 0
+    for part in parts:
+        if pending_ids:
+            template.append("{id}")
+            pending_ids -= 1
+        elif MATCH_ID.match(part):
+            template.append("{matchId}")
+        else:
+            template.append(part)
+            pending_ids = ID_SEGMENTS.get(part, 0)
+    return "/" + "/".join(template)
+
+
+class LaneMetrics:
+    """Queue wait statistics of one priority class"""
+
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, wait):
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._waits.append(wait)
+
+    def snapshot(self):
+        waits = sorted(self._waits)
+        p95 = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "wait_ms_avg": round(self.total_wait / self.requests * 1000, 1) if self.requests else 0.0,
+            "wait_ms_p95": round(p95 * 1000, 1),
+            "wait_ms_max": round(self.max_wait * 1000, 1),
+        }
+
+
+class EndpointMetrics:
+    """Status codes, latency, bytes and rate limiting of one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.bytes = 0
+        self.rate_limited = 0
+        self.rate_limit_wait = 0.0
+        self.total_latency = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._latencies = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, status, latency, size):
+        self.requests += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes += size
+        self.total_latency += latency
+        self._latencies.append(latency)
+        latency_ms = latency * 1000
+        bucket = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        self.histogram[bucket] += 1
+
+    def snapshot(self):
+        latencies = sorted(self._latencies)
+
+        def percentile(q):
+            return round(latencies[int(q * (len(latencies) - 1))] * 1000, 1) if latencies else 0.0
+
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "requests": self.requests,
+            "status": {str(status): n for status, n in self.statuses.items()},
+            "latency_ms_avg": round(self.total_latency / self.requests * 1000, 1) if self.requests else 0.0,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "latency_ms_histogram": dict(zip(labels, self.histogram)),
+            "bytes": self.bytes,
+            "rate_limited": self.rate_limited,
+            "rate_limit_wait_ms": round(self.rate_limit_wait * 1000, 1),
+        }
+
+
+class RiotClient:
+    """
+    Rate-limited Riot API client.
+
+    Args:
+        rate_limits (tuple): ((requests, window_seconds), ...) of the API key.
+        bulk_share (float): Fraction of each window bulk requests may use.
+        session: `requests`-like object with a `get` method. Defaults to a
+            `requests.Session` created on the first request, so handlers
+            that never call the Riot API do not import `requests`.
+        base_url (str): Send requests to "{base_url}/{routing host}/{path}"
+            instead of "https://{routing host}.api.riotgames.com/{path}"
+            (e.g. a local fake Riot server for benchmarks).
+    """
+
+    def __init__(
+        self,
+        rate_limits=DEFAULT_RATE_LIMITS,
+        bulk_share=DEFAULT_BULK_SHARE,
+        session=None,
+        base_url=None,
+    ):
+        self.rate_limits = tuple(rate_limits)
+        self.bulk_share = bulk_share
+        self._session = session
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+        self._sent = deque()
+        self._longest_window = max(window for _, window in self.rate_limits)
+        self._waiting = {priority: 0 for priority in PRIORITIES}
+        self._blocked_until = 0.0
+        self._workers = 1
+        self._cond = threading.Condition()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._cond:
+                if self._session is None:
+                    import requests
+
+                    self._session = requests.Session()
+        return self._session
+
+    def max_workers(self):
+        """
+        Most parallel workers the bulk budget of the key can be split across,
+        each keeping at least one request per rate-limit window.
+        """
+        return max(1, min(int(limit * self.bulk_share) for limit, _ in self.rate_limits))
+
+    @contextmanager
+    def shared_by(self, workers):
+        """
+        Within the block, use 1/`workers` of every rate-limit window: the key
+        is shared with `workers - 1` other workers (fan-out shards).
+        """
+        with self._cond:
+            previous, self._workers = self._workers, max(1, workers)
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._workers = previous
+                self._cond.notify_all()
+
+    def reset_metrics(self):
+        """Start a new accounting period"""
+        # Cleared under the lock: other threads may be recording
+        with self._metrics_lock:
+            self.metrics = {priority: LaneMetrics() for priority in PRIORITIES}
+            self.endpoints = {}
+
+    def _record(self, endpoint, status, latency, size, rate_limit_wait=0.0):
+        with self._metrics_lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = EndpointMetrics()
+            metrics.record(status, latency, size)
+            if status == 429:
+                metrics.rate_limited += 1
+                metrics.rate_limit_wait += rate_limit_wait
+
+    def _capacity_wait(self, priority, now):
+        """Seconds before a request of `priority` fits in every window"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        while self._sent and self._sent[0] <= now - self._longest_window:
+            self._sent.popleft()
+
+        share = 1.0 if priority == INTERACTIVE else self.bulk_share
+        wait = 0.0
+        for limit, window in self.rate_limits:
+            allowed = max(1, int(limit * share / self._workers))
+            recent = [t for t in self._sent if t > now - window]
+            if len(recent) >= allowed:
+                wait = max(wait, recent[-allowed] + window - now)
+        return wait
+
+    def acquire(self, priority=BULK):
+        """Block until a request of `priority` may be sent, and record the wait"""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._capacity_wait(priority, now)
+                    # Interactive callers take freed capacity first
+                    preempted = priority == BULK and self._waiting[INTERACTIVE] > 0
+                    if wait <= 0 and not preempted:
+                        self._sent.append(now)
+                        break
+                    self._cond.wait(timeout=wait if wait > 0 else 0.05)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+        self.metrics[priority].record(time.monotonic() - start)
+
+    def get(self, url, priority=BULK, **kwargs):
+        """
+        GET a Riot API URL in the given priority class.
+
+        Returns:
+            requests.Response: The last response (a 429 only if every retry
+            was rate limited too).
+        """
+        endpoint = endpoint_name(url)
+        if self.base_url:
+            url = RIOT_HOST.sub(lambda host: f"{self.base_url}/{host.group(1)}", url, count=1)
+        key_refreshed = False
+        attempt = 0
+        while attempt <= MAX_RETRIES:
+            self.acquire(priority)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except Exception:
+                self._record(endpoint, "error", time.monotonic() - started, 0)
+                raise
+            latency = time.monotonic() - started
+            if response.status_code in AUTH_ERRORS and not key_refreshed:
+                key_refreshed = True
+                retry_url = self._refresh_api_key(url)
+                if retry_url is not None:
+                    self._record(endpoint, response.status_code, latency, len(response.content))
+                    url = retry_url
+                    continue
+            if response.status_code != 429:
+                self._record(endpoint, response.status_code, latency, len(response.content))
+                return response
+
+            if attempt == MAX_RETRIES:
+                self._record(endpoint, 429, latency, len(response.content))
+                return response
+            retry_after = float(response.headers.get("Retry-After", 1))
+            self._record(endpoint, 429, latency, len(response.content), rate_limit_wait=retry_after)
+            self.metrics[priority].rate_limited += 1
+            with self._cond:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            attempt += 1
+        return response
+
+    def _refresh_api_key(self, url):
+        """
+        Returns:
+            str or None: `url` with the current API key, or None when the key
+            in `url` is still the current one (nothing to retry with).
+        """
+        # Imported here: the client itself needs no AWS access
+        from secret_provider import refresh_riot_api_key
+
+        used = dict(parse_qsl(urlsplit(url).query)).get("api_key")
+        try:
+            current = refresh_riot_api_key()
+        except Exception as e:
+            print(f"Could not refresh the Riot API key: {e}")
+            return None
+        if not used or current == used:
+            return None
+        print("🔑 Riot API key rotated, retrying with the new key")
+        return with_api_key(url, current)
+
+    def snapshot(self):
+        return {priority: lane.snapshot() for priority, lane in self.metrics.items()}
+
+    def summary(self):
+        """
+        Returns:
+            dict: {"lanes": {priority: queue wait stats},
+                   "endpoints": {endpoint: status/latency/bytes/429 stats}}
+        """
+        with self._metrics_lock:
+            endpoints = {name: metrics.snapshot() for name, metrics in self.endpoints.items()}
+        return {"lanes": self.snapshot(), "endpoints": endpoints}
+
+    def log_metrics(self):
+        print(json.dumps({"event": "riot_client", **self.summary()}))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def parse_rate_limits(value):
+    """"20:1,100:120" -> ((20, 1), (100, 120))"""
+    return tuple(
+        (int(limit), int(window))
+        for limit, window in (pair.split(":") for pair in value.split(","))
+    )
+
+
+def get_riot_client():
+    """
+    Container-wide client, configured from the environment:
+        RIOT_RATE_LIMITS: "requests:seconds,..." (default "20:1,100:120")
+        RIOT_BULK_SHARE: share of each window usable by bulk requests (default 0.7)
+        RIOT_API_BASE_URL: base URL replacing the Riot API hosts (default unset)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RiotClient(
+                    rate_limits=parse_rate_limits(os.environ.get("RIOT_RATE_LIMITS", "20:1,100:120")),
+                    bulk_share=float(os.environ.get("RIOT_BULK_SHARE", DEFAULT_BULK_SHARE)),
+                    base_url=os.environ.get("RIOT_API_BASE_URL"),
+                )
+    return _client
@@ -0,0 +1,153 @@
+"""
+Stored JSON artifacts
+
+Every JSON object the pipeline stores in S3 (profiles, raw matches and
+timelines, game contexts, aggregated stats, coach analyses) goes through
+this module:
+
+    - `dumps` writes compact JSON, with orjson when it is installed (about
+      ten times faster than `json`, and numpy values are native), with the
+      standard library otherwise;
+    - `put_json` compresses it (STORAGE_COMPRESSION: "gzip" by default,
+      "zstd" when `zstandard` is installed, or "none") and sets the
+      Content-Encoding of the object. Keys keep their `.json` name;
+    - `loads` reads any stored object back: gzip, zstd and plain JSON are
+      told apart by their first bytes, so objects written before (indented,
+      uncompressed) are still readable.
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+
+def json_default(obj):
+    """Fallback for values JSON does not know: numpy/pandas values, then str"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj):
+    """
+    Serialize an object to compact JSON.
+
+    Returns:
+        bytes: UTF-8 JSON without indentation or spaces.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # e.g. integers over 64 bits: the standard library handles them
+            pass
+    return json.dumps(
+        obj, separators=(",", ":"), ensure_ascii=False, default=json_default
+    ).encode("utf-8")
+
+
+def storage_compression():
+    """Compression of new objects, from STORAGE_COMPRESSION (default "gzip")"""
+    compression = os.environ.get("STORAGE_COMPRESSION", "gzip").lower()
+    return compression if compression in COMPRESSIONS else "gzip"
+
+
+def compress(data, compression=None):
+    """
+    Args:
+        data (bytes): Serialized JSON.
+        compression (str): "gzip", "zstd" or "none"; defaults to
+            `storage_compression()`. zstd falls back to gzip when the
+            `zstandard` package is not installed.
+
+    Returns:
+        tuple: (body bytes, Content-Encoding or None)
+    """
+    compression = compression or storage_compression()
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            compression = "gzip"
+        else:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), "zstd"
+    if compression == "gzip":
+        # Fixed mtime: identical content gives identical bytes (and ETag)
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    return data, None
+
+
+def put_json(s3, bucket_name, key, obj, compression=None, **kwargs):
+    """
+    Store a JSON artifact.
+
+    Args:
+        s3: boto3 S3 client.
+        bucket_name (str): Destination bucket.
+        key (str): Object key.
+        obj: JSON-serialisable object, or bytes already holding JSON (e.g. a
+            Riot API response body), stored as they are.
+        compression (str): See `compress`.
+        **kwargs: Extra `put_object` arguments (IfMatch, CacheControl...).
+
+    Returns:
+        dict: The `put_object` response.
+    """
+    data = obj if isinstance(obj, (bytes, bytearray)) else dumps(obj)
+    body, encoding = compress(bytes(data), compression)
+    if encoding:
+        kwargs["ContentEncoding"] = encoding
+    return s3.put_object(
+        Bucket=bucket_name,
+        Key=key,
+        Body=body,
+        ContentType="application/json",
+        **kwargs,
+    )
+
+
+def decode(body):
+    """
+    Uncompressed JSON bytes of a stored object, whatever its format.
+
+    Args:
+        body (bytes or str): Object content, e.g. `get_object(...)["Body"].read()`.
+    """
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if body[:2] == GZIP_MAGIC:
+        return gzip.decompress(body)
+    if body[:4] == ZSTD_MAGIC:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
+
+
+def loads(body):
+    """Parse a stored object (gzip, zstd or plain JSON)"""
+    data = decode(body)
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN / Infinity written by `json` in older objects
+            pass
+    return json.loads(data)
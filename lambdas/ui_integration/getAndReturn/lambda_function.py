@@ -1,6 +1,8 @@
 import json
 import boto3
 import os
+from precomputed_response import response_key, serve_response
+from serialization import loads
 
 s3 = boto3.client("s3")
 
@@ -32,9 +34,14 @@ def lambda_handler(event, context):
     file_key = f"{key_prefix}/{key_prefix}_wrapped_up_stats.json"
 
     try:
+        precomputed = serve_response(
+            s3, bucket_name, response_key(key_prefix, "wrapped_up"), event
+        )
+        if precomputed:
+            return precomputed
+
         response = s3.get_object(Bucket=bucket_name, Key=file_key)
-        file_content = response["Body"].read().decode("utf-8")
-        json_content = json.loads(file_content)
+        json_content = loads(response["Body"].read())
 
         return {
             "statusCode": 200,
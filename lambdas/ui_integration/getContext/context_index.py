@@ -0,0 +1,295 @@
+"""
+Consolidated per-player game context index
+
+The collector writes one `game_context/{match_id}.json` object per match.
+Reading them back one by one costs one GET per match, so the collector also
+maintains a sorted index of every match summary of the player, most recent
+first (by `gameCreation`), split into fixed-size shards:
+
+    {prefix}/game_context_index/manifest.json
+    {prefix}/game_context_index/{generation}_{writer}_{n:05d}.json
+
+A page of history therefore costs the manifest plus one or two shard reads,
+whatever the size of the season. Shards of a new generation are written
+before the manifest that points to them, so readers never see a half-written
+index, and the previous generation is only deleted by the rewrite after, so
+a reader holding the previous manifest can still read its shards. The
+manifest is written conditionally on the ETag it was read with: of two
+overlapping writers, the second one merges again on top of the first
+instead of dropping its matches. Shard names carry a random `writer` token,
+so writers starting in the same millisecond never overwrite (or delete)
+each other's shards. Readers fall back to a concurrent loader
+over `game_context/` when the index does not exist yet.
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from serialization import loads, put_json
+
+INDEX_FOLDER = "game_context_index"
+SHARD_SIZE = 50
+MAX_WORKERS = 16
+MAX_ATTEMPTS = 5
+
+
+def manifest_key(prefix):
+    return f"{prefix}/{INDEX_FOLDER}/manifest.json"
+
+
+def shard_key(prefix, shard_name):
+    return f"{prefix}/{INDEX_FOLDER}/{shard_name}"
+
+
+def match_sort_key(key):
+    """Riot match IDs grow with time on a platform: "EUW1_7595664875" -> 7595664875"""
+    match_id = key.rsplit("/", 1)[-1].replace(".json", "")
+    number = match_id.rsplit("_", 1)[-1]
+    return int(number) if number.isdigit() else 0
+
+
+def list_context_keys(s3, bucket_name, prefix):
+    """All `game_context/` object keys of a player, most recent match first."""
+    paginator = s3.get_paginator("list_objects_v2")
+    keys = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=f"{prefix}/game_context/"):
+        keys.extend(
+            obj["Key"] for obj in page.get("Contents", []) if obj["Key"].endswith(".json")
+        )
+    return sorted(keys, key=match_sort_key, reverse=True)
+
+
+def load_context_files(s3, bucket_name, keys, max_workers=MAX_WORKERS):
+    """
+    Fetch and parse many JSON objects concurrently.
+
+    Returns:
+        list: Parsed objects in the order of `keys`; a failed read is
+        returned as {"key": key, "error": message}.
+    """
+
+    def load(key):
+        try:
+            obj = s3.get_object(Bucket=bucket_name, Key=key)
+            return loads(obj["Body"].read())
+        except Exception as e:
+            print(f"Failed to load {key}: {str(e)}")
+            return {"key": key, "error": str(e)}
+
+    if not keys:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+        return list(executor.map(load, keys))
+
+
+def load_manifest(s3, bucket_name, prefix):
+    """
+    Returns:
+        dict or None: {"count", "shard_size", "shards", "previous",
+        "updated_at"}, or None if the player has no index yet. `previous`
+        lists the shards of the generation before, kept for readers still
+        holding its manifest.
+    """
+    return _load_manifest(s3, bucket_name, prefix)[0]
+
+
+def _load_manifest(s3, bucket_name, prefix):
+    """(manifest, ETag), or (None, None) if the player has no index yet"""
+    try:
+        obj = s3.get_object(Bucket=bucket_name, Key=manifest_key(prefix))
+    except s3.exceptions.NoSuchKey:
+        return None, None
+    return loads(obj["Body"].read()), obj["ETag"]
+
+
+def _load_shards(s3, bucket_name, prefix, shard_names):
+    shards = load_context_files(
+        s3, bucket_name, [shard_key(prefix, name) for name in shard_names]
+    )
+    for shard in shards:
+        if "error" in shard:
+            raise RuntimeError(f"Index shard unreadable: {shard['key']}")
+    return [match for shard in shards for match in shard["matches"]]
+
+
+def load_context_index(s3, bucket_name, prefix):
+    """
+    Returns:
+        list or None: Every match summary, most recent first, or None if
+        the player has no index yet.
+    """
+    manifest = load_manifest(s3, bucket_name, prefix)
+    if manifest is None:
+        return None
+    return _load_shards(s3, bucket_name, prefix, manifest["shards"])
+
+
+def load_context_page(s3, bucket_name, prefix, page, page_size):
+    """
+    Read one page of history (1-based) from the index.
+
+    Only the shards overlapping the page are fetched.
+
+    Returns:
+        tuple or None: (matches, total_count), or None if the player has
+        no index yet.
+    """
+    manifest = load_manifest(s3, bucket_name, prefix)
+    if manifest is None:
+        return None
+
+    total = manifest["count"]
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    if start >= end:
+        return [], total
+
+    shard_size = manifest["shard_size"]
+    first_shard, last_shard = start // shard_size, (end - 1) // shard_size
+    matches = _load_shards(
+        s3, bucket_name, prefix, manifest["shards"][first_shard : last_shard + 1]
+    )
+    offset = first_shard * shard_size
+    return matches[start - offset : end - offset], total
+
+
+def load_context_page_from_objects(s3, bucket_name, prefix, page, page_size):
+    """
+    Fallback for players without an index: list `game_context/` and fetch
+    only the objects of the requested page, concurrently.
+
+    Returns:
+        tuple: (matches, total_count)
+    """
+    keys = list_context_keys(s3, bucket_name, prefix)
+    start = (page - 1) * page_size
+    return load_context_files(s3, bucket_name, keys[start : start + page_size]), len(keys)
+
+
+def iter_context_matches(s3, bucket_name, prefix, start=0, window=4):
+    """
+    Iterate over a player's match summaries from position `start` (0-based,
+    most recent first), fetching `window` index shards (or MAX_WORKERS
+    `game_context/` objects) at a time so a consumer that stops early does
+    not pay for the rest of the history.
+
+    Returns:
+        tuple: (generation, iterator). `generation` is the manifest's
+        `updated_at`, or None when reading `game_context/` objects; failed
+        object reads are yielded as {"key", "error"} so positions stay stable.
+    """
+    manifest = load_manifest(s3, bucket_name, prefix)
+
+    if manifest is None:
+        keys = list_context_keys(s3, bucket_name, prefix)[start:]
+
+        def from_objects():
+            for i in range(0, len(keys), MAX_WORKERS):
+                yield from load_context_files(s3, bucket_name, keys[i : i + MAX_WORKERS])
+
+        return None, from_objects()
+
+    shard_size = manifest["shard_size"]
+    first_shard = start // shard_size
+    shard_names = manifest["shards"][first_shard:]
+
+    def from_shards():
+        skip = start - first_shard * shard_size
+        for i in range(0, len(shard_names), window):
+            matches = _load_shards(s3, bucket_name, prefix, shard_names[i : i + window])
+            yield from matches[skip:]
+            skip = 0
+
+    return manifest["updated_at"], from_shards()
+
+
+def update_context_index(s3, bucket_name, prefix, match_summaries, shard_size=SHARD_SIZE):
+    """
+    Merge new match summaries into the player's index and write it back.
+
+    When the player has no index yet, it is seeded from the existing
+    `game_context/` objects so it is complete from the first write. The
+    manifest is only replaced if nobody else did since it was read
+    (If-Match / If-None-Match); otherwise the merge starts over.
+
+    Args:
+        s3: boto3 S3 client.
+        bucket_name (str): Bucket holding the player folder.
+        prefix (str): Player folder, "{gamename}_{gametag}".
+        match_summaries (list): Summaries just written to `game_context/`.
+        shard_size (int): Matches per shard.
+
+    Returns:
+        list: The merged index, most recent first.
+
+    Raises:
+        RuntimeError: The manifest kept changing for MAX_ATTEMPTS attempts.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        manifest, etag = _load_manifest(s3, bucket_name, prefix)
+        if manifest is None:
+            existing = load_context_files(
+                s3, bucket_name, list_context_keys(s3, bucket_name, prefix)
+            )
+            matches = [m for m in existing if "error" not in m]
+        else:
+            matches = _load_shards(s3, bucket_name, prefix, manifest["shards"])
+
+        by_id = {m.get("matchId"): m for m in matches}
+        for summary in match_summaries:
+            by_id[summary.get("matchId")] = summary
+        merged = sorted(by_id.values(), key=lambda m: m.get("gameCreation") or 0, reverse=True)
+
+        generation = int(time.time() * 1000)
+        writer = uuid.uuid4().hex[:8]
+        shards = {
+            f"{generation}_{writer}_{n:05d}.json": merged[start : start + shard_size]
+            for n, start in enumerate(range(0, len(merged), shard_size))
+        }
+
+        def put_shard(item):
+            name, shard_matches = item
+            put_json(s3, bucket_name, shard_key(prefix, name), {"matches": shard_matches})
+
+        if shards:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(shards))) as executor:
+                list(executor.map(put_shard, shards.items()))
+
+        new_manifest = {
+            "count": len(merged),
+            "shard_size": shard_size,
+            "shards": list(shards),
+            "previous": manifest["shards"] if manifest is not None else [],
+            "updated_at": generation,
+        }
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            put_json(s3, bucket_name, manifest_key(prefix), new_manifest, **condition)
+        except s3.exceptions.ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                raise
+            # Another writer won: these shards are referenced by no manifest
+            _delete_shards(s3, bucket_name, prefix, shards)
+            time.sleep(0.05 * (attempt + 1))
+            continue
+
+        # The generation before the previous one is unreachable: readers that
+        # loaded its manifest have had a whole generation to finish
+        if manifest is not None:
+            referenced = set(new_manifest["shards"]) | set(new_manifest["previous"])
+            _delete_shards(
+                s3,
+                bucket_name,
+                prefix,
+                [name for name in manifest.get("previous", []) if name not in referenced],
+            )
+        return merged
+
+    raise RuntimeError(f"Context index of {prefix} not updated after {MAX_ATTEMPTS} attempts")
+
+
+def _delete_shards(s3, bucket_name, prefix, shard_names):
+    for name in shard_names:
+        s3.delete_object(Bucket=bucket_name, Key=shard_key(prefix, name))
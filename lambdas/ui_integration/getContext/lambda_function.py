@@ -1,11 +1,55 @@
+import base64
 import json
 import boto3
+from context_index import iter_context_matches
+
+s3 = boto3.client("s3")
+
+DEFAULT_MAX_BYTES = 1_000_000
+# API Gateway / Lambda responses are capped at 6 MB
+MAX_BYTES = 5_000_000
+
+
+def project_match(match):
+    """Fields of a game context exported to the agent"""
+    player = match.get("player", {})
+    stats = player.get("stats", {})
+    return {
+        "matchId": match.get("matchId"),
+        "gameCreation": match.get("gameCreation"),
+        "duration": match.get("duration"),
+        "champion": player.get("champion"),
+        "lane": player.get("lane"),
+        "win": player.get("win"),
+        "kills": stats.get("kills"),
+        "deaths": stats.get("deaths"),
+        "assists": stats.get("assists"),
+        "damage": stats.get("totalDamageDealtToChampions"),
+        "gold": stats.get("goldEarned"),
+        "cs": (stats.get("totalMinionsKilled") or 0)
+        + (stats.get("neutralMinionsKilled") or 0),
+        "visionScore": stats.get("visionScore"),
+        "opponentChampion": match.get("opponent", {}).get("champion"),
+    }
+
+
+def encode_token(offset, generation):
+    return base64.urlsafe_b64encode(
+        json.dumps({"offset": offset, "generation": generation}).encode("utf-8")
+    ).decode("ascii")
+
+
+def decode_token(token):
+    state = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    return int(state["offset"]), state.get("generation")
 
 
 def lambda_handler(event, context):
-    query_params = event.get("queryStringParameters")
+    query_params = event.get("queryStringParameters", {}) or {}
     bucket_name = "s3-api-lol"
     prefix = query_params.get("prefix")
+    if not prefix and query_params.get("gamename") and query_params.get("gametag"):
+        prefix = f"{query_params['gamename']}_{query_params['gametag']}"
 
     if not prefix:
         return {
@@ -13,33 +57,51 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Missing 'prefix' parameter"}),
         }
 
-    s3 = boto3.client("s3")
-
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=f"{prefix}/game_context/")
-    files = response.get("Contents", [])
-
-    all_data = []
-
-    for obj in files:
-        key = obj["Key"]
-
-        if key.endswith("/"):
-            continue
+    try:
+        max_bytes = min(MAX_BYTES, int(query_params.get("max_bytes") or DEFAULT_MAX_BYTES))
+        offset, token_generation = (
+            decode_token(query_params["continuation_token"])
+            if query_params.get("continuation_token")
+            else (0, None)
+        )
+    except (TypeError, ValueError, KeyError):
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "Invalid 'max_bytes' or 'continuation_token'"}),
+        }
 
-        file_obj = s3.get_object(Bucket=bucket_name, Key=key)
-        file_content = file_obj["Body"].read().decode("utf-8")
+    generation, matches = iter_context_matches(s3, bucket_name, prefix, start=offset)
+    if offset and token_generation != generation:
+        return {
+            "statusCode": 409,
+            "body": json.dumps(
+                {"error": "Match history changed since the export started, restart it"}
+            ),
+        }
 
-        try:
-            data = json.loads(file_content)
-            all_data.append(data)
-        except json.JSONDecodeError:
-            print(f"⚠️ Fichier non JSON valide: {key}")
+    # Serialize records one by one and stop before the body exceeds max_bytes
+    records = []
+    size = 0
+    position = offset
+    truncated = False
+    for match in matches:
+        if "error" not in match:
+            record = json.dumps(project_match(match))
+            if records and size + len(record) + 1 > max_bytes:
+                truncated = True
+                break
+            records.append(record)
+            size += len(record) + 1
+        position += 1
 
+    token = encode_token(position, generation) if truncated else None
     return {
         "statusCode": 200,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*",
         },
-        "body": json.dumps({"data": data}),
+        "body": '{"data": ['
+        + ",".join(records)
+        + f'], "count": {len(records)}, "continuation_token": {json.dumps(token)}}}',
     }
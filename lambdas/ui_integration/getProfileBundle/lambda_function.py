@@ -0,0 +1,66 @@
+import json
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from serialization import decode
+
+s3 = boto3.client("s3")
+API_BUCKET = "s3-api-lol"
+PROCESS_BUCKET = "s3-process-lol"
+
+
+def bundle_parts(prefix):
+    """Per-player objects shown on the landing page: {part name: (bucket, key)}"""
+    return {
+        "summoners": (API_BUCKET, f"{prefix}/summoners.json"),
+        "league_overview": (API_BUCKET, f"{prefix}/league_overview.json"),
+        "wrapped_up": (PROCESS_BUCKET, f"{prefix}/{prefix}_wrapped_up_stats.json"),
+        "stats_monthly": (PROCESS_BUCKET, f"{prefix}/{prefix}_stats_monthly_json.json"),
+    }
+
+
+def fetch_part(item):
+    name, (bucket_name, key) = item
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+        return name, decode(response["Body"].read()), None
+    except s3.exceptions.NoSuchKey:
+        return name, None, "not_found"
+    except Exception as e:
+        print(f"Error fetching {key}: {e}")
+        return name, None, str(e)
+
+
+def lambda_handler(event, context):
+    query_params = event.get("queryStringParameters", {}) or {}
+    gamename = query_params.get("gamename")
+    gametag = query_params.get("gametag")
+
+    if not gamename or not gametag:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "Missing gamename or gametag parameter"}),
+        }
+
+    parts = bundle_parts(f"{gamename}_{gametag}")
+    with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+        results = list(executor.map(fetch_part, parts.items()))
+
+    # The stored objects are already JSON written by the collector: splice
+    # their (decompressed) bytes into the bundle instead of parsing and dumping
+    # them again
+    fields = [
+        f'"{name}": {content.decode("utf-8")}'
+        for name, content, error in results
+        if error is None
+    ]
+    errors = {name: error for name, content, error in results if error is not None}
+    fields.append(f'"errors": {json.dumps(errors)}')
+
+    return {
+        "statusCode": 404 if len(errors) == len(parts) else 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*",
+        },
+        "body": "{" + ", ".join(fields) + "}",
+    }
@@ -0,0 +1,93 @@
+import json
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from score_index import load_score_index, score_entry, update_score_index
+from serialization import loads
+
+s3 = boto3.client("s3")
+
+MAX_MATCH_IDS = 100
+
+
+def load_analysis_scores(bucket_name, prefix, match_ids):
+    """Read full analyses of matches not in the index yet (written before it existed)"""
+
+    def load(match_id):
+        try:
+            response = s3.get_object(
+                Bucket=bucket_name, Key=f"{prefix}/llm_output/{match_id}_analysis.json"
+            )
+        except s3.exceptions.NoSuchKey:
+            return match_id, None
+        return match_id, score_entry(match_id, loads(response["Body"].read()))
+
+    with ThreadPoolExecutor(max_workers=min(16, len(match_ids))) as executor:
+        return {
+            match_id: entry
+            for match_id, entry in executor.map(load, match_ids)
+            if entry is not None
+        }
+
+
+def backfill_score_index(bucket_name, prefix, entries):
+    """Best effort: the scores are returned anyway, the next request retries"""
+    try:
+        update_score_index(s3, bucket_name, prefix, entries)
+    except Exception as e:
+        print(f"Score index backfill skipped: {e}")
+
+
+def lambda_handler(event, context):
+    bucket_name = "s3-api-lol"
+
+    if event.get("body"):
+        params = json.loads(event["body"])
+        match_ids = params.get("match_ids") or []
+    else:
+        params = event.get("queryStringParameters", {}) or {}
+        match_ids = [m for m in (params.get("match_ids") or "").split(",") if m]
+    gamename = params.get("gamename")
+    gametag = params.get("gametag")
+
+    if not gamename or not gametag:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "Missing gamename or gametag parameter"}),
+        }
+    if len(match_ids) > MAX_MATCH_IDS:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"At most {MAX_MATCH_IDS} match_ids per request"}),
+        }
+
+    prefix = f"{gamename}_{gametag}"
+    match_ids = list(dict.fromkeys(match_ids))
+
+    try:
+        index, _ = load_score_index(s3, bucket_name, prefix)
+        scores = {m: index[m] for m in match_ids if m in index}
+
+        not_indexed = [m for m in match_ids if m not in index]
+        if not_indexed:
+            found = load_analysis_scores(bucket_name, prefix, not_indexed)
+            scores.update(found)
+            if found:
+                backfill_score_index(bucket_name, prefix, found)
+
+        return {
+            "statusCode": 200,
+            "headers": {
+                "Content-Type": "application/json",
+                "Access-Control-Allow-Origin": "*",
+            },
+            "body": json.dumps(
+                {
+                    "scores": scores,
+                    "missing": [m for m in match_ids if m not in scores],
+                }
+            ),
+        }
+
+    except Exception as e:
+        print(f"Erreur : {e}")
+        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
@@ -0,0 +1,71 @@
+"""
+Per-player score index
+Compact {match_id: {score, summary}} map maintained next to the full analyses
+so the game history can show every score with a single read
+"""
+
+import time
+from typing import Dict
+
+from serialization import loads, put_json
+
+MAX_ATTEMPTS = 5
+
+
+def score_index_key(folder: str) -> str:
+    return f"{folder}/llm_output/score_index.json"
+
+
+def score_entry(match_id: str, analysis: Dict) -> Dict:
+    """Fields of an analysis shown in the game history (same shape as getScoreSummary)"""
+    return {
+        "match_id": match_id,
+        "score": analysis.get("player", {}).get("score"),
+        "summary": analysis.get("final_verdict", {}).get("summary"),
+    }
+
+
+def load_score_index(s3, bucket_name: str, folder: str):
+    """
+    Returns:
+        (scores dict, ETag or None when the index does not exist yet)
+    """
+    try:
+        obj = s3.get_object(Bucket=bucket_name, Key=score_index_key(folder))
+    except s3.exceptions.NoSuchKey:
+        return {}, None
+    return loads(obj["Body"].read())["scores"], obj["ETag"]
+
+
+def update_score_index(s3, bucket_name: str, folder: str, entries: Dict[str, Dict]) -> bool:
+    """
+    Merge score entries into the player's index
+
+    Uses S3 conditional writes (If-Match / If-None-Match) so concurrent
+    analyses of the same player never drop each other's entries.
+
+    Args:
+        s3: boto3 S3 client
+        bucket_name: Bucket holding the player folder
+        folder: Player folder, "{gamename}_{gametag}"
+        entries: {match_id: score_entry(...)}
+
+    Returns:
+        True if the index was written
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        scores, etag = load_score_index(s3, bucket_name, folder)
+        scores.update(entries)
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            put_json(
+                s3, bucket_name, score_index_key(folder), {"scores": scores}, **condition
+            )
+            return True
+        except s3.exceptions.ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                raise
+            time.sleep(0.05 * (attempt + 1))
+    print(f"⚠️ Score index of {folder} not updated after {MAX_ATTEMPTS} attempts")
+    return False
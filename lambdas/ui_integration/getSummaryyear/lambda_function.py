@@ -1,5 +1,7 @@
 import json
 import boto3
+from precomputed_response import response_key, serve_response
+from serialization import loads
 
 s3 = boto3.client("s3")
 
@@ -21,9 +23,14 @@ def lambda_handler(event, context):
     object_key = f"{prefix}/{prefix}_stats_monthly_json.json"
 
     try:
+        precomputed = serve_response(
+            s3, bucket_name, response_key(prefix, "summary_year"), event
+        )
+        if precomputed:
+            return precomputed
+
         response = s3.get_object(Bucket=bucket_name, Key=object_key)
-        file_content = response["Body"].read().decode("utf-8")
-        data = json.loads(file_content)
+        data = loads(response["Body"].read())
 
         return {
             "statusCode": 200,
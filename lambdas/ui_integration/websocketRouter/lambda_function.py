@@ -1,34 +1,61 @@
 import boto3
 import json
 import os
+from collection_lease import CollectionLease, acquire_or_attach, lease_key
 
 lambda_client = boto3.client("lambda")
+s3 = boto3.client("s3")
+LEASE_BUCKET = os.environ.get("LEASE_BUCKET", "s3-api-lol")
+# Actions clients may request; the collector's internal modes are not
+# reachable from here
+CLIENT_ACTIONS = ("process",)
 
 
 def lambda_handler(event, context):
 
     body = json.loads(event.get("body", "{}"))
 
-    
+
     connection_id = event["requestContext"]["connectionId"]
     region = body.get("region")
     gamename = body.get("gamename")
     gametag = body.get("gametag")
+    ranked_type = body.get("ranked_type", "solo")
     action = body.get("action", "process")
 
-    
-    lambda_client.invoke(
-        FunctionName="league_api_call", 
-        InvocationType="Event",
-        Payload=json.dumps(
-            {
-                "connectionId": connection_id,
-                "region": region,
-                "gamename": gamename,
-                "gametag": gametag,
-                "action": action,
-            }
-        ),
+    if not gamename or not gametag:
+        return {"statusCode": 400, "body": "Missing gamename or gametag"}
+    if action not in CLIENT_ACTIONS:
+        return {"statusCode": 400, "body": f"Unknown action {action}"}
+
+    # One collection per player and ranked type: later requests only
+    # subscribe to the progress of the running one
+    lease_id, acquired = acquire_or_attach(
+        s3, LEASE_BUCKET, lease_key(gamename, gametag, ranked_type), connection_id
     )
+    if not acquired:
+        return {"statusCode": 200, "body": f"Attached to running collection {lease_id}"}
+
+    try:
+        lambda_client.invoke(
+            FunctionName="league_api_call",
+            InvocationType="Event",
+            Payload=json.dumps(
+                {
+                    "connectionId": connection_id,
+                    "region": region,
+                    "gamename": gamename,
+                    "gametag": gametag,
+                    "ranked_type": ranked_type,
+                    "action": action,
+                    "lease_id": lease_id,
+                }
+            ),
+        )
+    except Exception:
+        CollectionLease(
+            s3, LEASE_BUCKET, lease_key(gamename, gametag, ranked_type), lease_id
+        ).release()
+        raise
 
     return {"statusCode": 200, "body": f"Started processing {str(event)}"}
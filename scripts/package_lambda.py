@@ -0,0 +1,105 @@
+"""
+Build the deployment package of a Lambda
+
+Zips a Lambda folder (without Python caches) into `dist/{name}.zip`. Lambdas
+resolving Data Dragon data (`module/static_data.py`) also get a snapshot of
+the current patch (STATIC_DATA_VERSION, default `DEFAULT_VERSION`) in
+`module/ddragon/`, the folder their init preload reads, so the first request
+does not fetch item names from S3 or the CDN:
+
+    python scripts/package_lambda.py callCoachAgentOneGame
+    python scripts/package_lambda.py callCoachAgentOneGame --static-data-dir ./ddragon
+
+The snapshot is copied from `--static-data-dir` (laid out like
+STATIC_DATA_DIR: {version}/data/{language}/{file}.json) when given, else
+downloaded with `python -m module.static_data` (S3 mirror, then the CDN).
+The build fails when the items of the patch are missing.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LAMBDAS = ROOT / "lambdas"
+DEFAULT_OUTPUT_DIR = ROOT / "dist"
+LANGUAGE = "en_US"
+
+
+def lambda_dir(name):
+    matches = [path.parent for path in LAMBDAS.glob(f"*/{name}/lambda_function.py")]
+    if not matches:
+        raise SystemExit(f"Unknown Lambda {name}")
+    return matches[0]
+
+
+def current_version(source):
+    """Current patch as the Lambda resolves it (STATIC_DATA_VERSION or its default)"""
+    completed = subprocess.run(
+        [sys.executable, "-c", "from module.static_data import ddragon_version; print(ddragon_version())"],
+        cwd=source,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.strip()
+
+
+def add_static_data(build, version, static_data_dir=None):
+    """Write the Data Dragon snapshot of `version` to `build/module/ddragon`"""
+    target = build / "module" / "ddragon"
+    if static_data_dir:
+        source = Path(static_data_dir) / version / "data" / LANGUAGE
+        if source.is_dir():
+            shutil.copytree(source, target / version / "data" / LANGUAGE, dirs_exist_ok=True)
+    else:
+        subprocess.run(
+            [sys.executable, "-m", "module.static_data", version, "--dir", str(target)],
+            cwd=build,
+            check=True,
+        )
+    items = target / version / "data" / LANGUAGE / "item.json"
+    if not items.exists():
+        raise SystemExit(f"❌ No item data for patch {version}: the package would preload nothing")
+    print(f"📦 Data Dragon {version} snapshot added")
+
+
+def package(name, output_dir=DEFAULT_OUTPUT_DIR, static_data_dir=None):
+    """
+    Returns:
+        Path: The zip file written.
+    """
+    source = lambda_dir(name)
+    with tempfile.TemporaryDirectory(prefix=f"package_{name}_") as tmp:
+        build = Path(tmp) / name
+        shutil.copytree(source, build, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+        if (build / "module" / "static_data.py").exists():
+            add_static_data(build, current_version(build), static_data_dir)
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        archive = output_dir / f"{name}.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for path in sorted(build.rglob("*")):
+                if path.is_file():
+                    zip_file.write(path, path.relative_to(build).as_posix())
+    print(f"✅ {archive} ({os.path.getsize(archive) / 1024:.0f} KiB)")
+    return archive
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build Lambda deployment packages")
+    parser.add_argument("lambdas", nargs="+", help="Lambda directory names")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--static-data-dir", help="Local Data Dragon snapshot to bundle")
+    args = parser.parse_args(argv)
+    return [package(name, args.output_dir, args.static_data_dir) for name in args.lambdas]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Shared fixtures: moto S3 and the flat UI Lambda modules
+
+Every UI Lambda folder is deployed on its own, so helper copies share their
+module names (`serialization`, `context_index`...). `lambda_module` imports
+a module from one folder the way that Lambda sees it, its siblings first.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+UI_LAMBDAS = ROOT / "lambdas" / "ui_integration"
+BUCKET = "s3-api-lol"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """boto3 S3 client on an in-memory S3 (moto) holding BUCKET"""
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-3")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    with moto.mock_aws():
+        import boto3
+
+        client = boto3.client("s3")
+        client.create_bucket(
+            Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "eu-west-3"}
+        )
+        yield client
+
+
+@pytest.fixture
+def lambda_module(s3):
+    """
+    Import a module of a UI Lambda folder: `lambda_module("getContext",
+    "context_index")`. Modules building clients at import see moto's S3.
+    """
+
+    def load(folder, name):
+        path = str(UI_LAMBDAS / folder)
+        for sibling in (UI_LAMBDAS / folder).glob("*.py"):
+            sys.modules.pop(sibling.stem, None)
+        sys.path.insert(0, path)
+        try:
+            return importlib.import_module(name)
+        finally:
+            sys.path.remove(path)
+
+    return load
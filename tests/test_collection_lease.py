@@ -0,0 +1,100 @@
+"""
+Collection leases: one collection per player, every client attached
+
+Runs `collection_lease.py` (the websocketRouter copy) against an in-memory
+S3 (moto).
+
+    python -m pytest tests
+"""
+
+import pytest
+
+BUCKET = "s3-api-lol"
+
+
+@pytest.fixture
+def leases(lambda_module):
+    return lambda_module("websocketRouter", "collection_lease")
+
+
+@pytest.fixture
+def key(leases):
+    return leases.lease_key(" Player ", "EUW", "solo")
+
+
+def lease_record(s3, leases, key):
+    return leases._read(s3, BUCKET, key)[0]
+
+
+def test_riot_ids_are_case_insensitive(leases, key):
+    assert leases.lease_key("player", "euw ", "solo") == key
+    assert leases.lease_key("Player", "EUW", None) == key
+    assert leases.lease_key("Player", "EUW", "flex") != key
+
+
+def test_first_request_starts_the_collection_and_others_attach(s3, leases, key):
+    lease_id, acquired = leases.acquire_or_attach(s3, BUCKET, key, "conn-1")
+    assert acquired
+
+    assert leases.acquire_or_attach(s3, BUCKET, key, "conn-2") == (lease_id, False)
+    # Reconnecting with the same connection, or without any, changes nothing
+    assert leases.acquire_or_attach(s3, BUCKET, key, "conn-2") == (lease_id, False)
+    assert leases.acquire_or_attach(s3, BUCKET, key, None) == (lease_id, False)
+    assert lease_record(s3, leases, key)["subscribers"] == ["conn-1", "conn-2"]
+
+
+def test_running_collection_broadcasts_to_late_subscribers(s3, leases, key):
+    lease_id, _ = leases.acquire_or_attach(s3, BUCKET, key, "conn-1")
+    lease = leases.CollectionLease(s3, BUCKET, key, lease_id, refresh_seconds=0)
+    assert list(lease) == ["conn-1"]
+
+    leases.acquire_or_attach(s3, BUCKET, key, "conn-2")
+
+    assert list(lease) == ["conn-1", "conn-2"]
+
+
+def test_release_frees_the_player(s3, leases, key):
+    lease_id, _ = leases.acquire_or_attach(s3, BUCKET, key, "conn-1")
+    lease = leases.CollectionLease(s3, BUCKET, key, lease_id)
+    assert lease.renew()
+
+    lease.release()
+
+    assert lease_record(s3, leases, key) is None
+    assert leases.acquire_or_attach(s3, BUCKET, key, "conn-2")[1]
+    assert not lease.renew()
+
+
+def test_expired_lease_is_taken_over(s3, leases, key):
+    stale_id, _ = leases.acquire_or_attach(s3, BUCKET, key, "conn-1", ttl_seconds=-1)
+    stale = leases.CollectionLease(s3, BUCKET, key, stale_id)
+
+    lease_id, acquired = leases.acquire_or_attach(s3, BUCKET, key, "conn-2")
+
+    assert acquired and lease_id != stale_id
+    assert lease_record(s3, leases, key)["subscribers"] == ["conn-2"]
+    # The crashed run coming back neither renews nor releases the new lease
+    assert not stale.renew()
+    stale.release()
+    assert lease_record(s3, leases, key)["lease_id"] == lease_id
+
+
+def test_concurrent_attaches_are_both_kept(s3, leases, key):
+    lease_id, _ = leases.acquire_or_attach(s3, BUCKET, key, "conn-1")
+
+    class RacingS3:
+        """Attaches conn-2 between the read and the write of conn-3, once"""
+
+        raced = False
+
+        def __getattr__(self, name):
+            return getattr(s3, name)
+
+        def put_object(self, **kwargs):
+            if not RacingS3.raced:
+                RacingS3.raced = True
+                leases.acquire_or_attach(s3, BUCKET, key, "conn-2")
+            return s3.put_object(**kwargs)
+
+    assert leases.acquire_or_attach(RacingS3(), BUCKET, key, "conn-3") == (lease_id, False)
+    assert lease_record(s3, leases, key)["subscribers"] == ["conn-1", "conn-2", "conn-3"]
@@ -0,0 +1,212 @@
+"""
+Context index: shards, pagination and concurrent writers
+
+Runs `context_index.py` and the getContext handler (the getContext copies)
+against an in-memory S3 (moto).
+
+    python -m pytest tests
+"""
+
+import base64
+import json
+
+import pytest
+
+BUCKET = "s3-api-lol"
+PREFIX = "Player_EUW"
+SHARD_SIZE = 3
+
+
+def summary(n):
+    return {
+        "matchId": f"EUW1_{1000 + n}",
+        "gameCreation": 1_700_000_000_000 + n,
+        "duration": 1800,
+        "player": {"champion": "Ahri", "lane": "MIDDLE", "win": n % 2 == 0, "stats": {}},
+    }
+
+
+def match_ids(matches):
+    return [m["matchId"] for m in matches]
+
+
+def index_keys(s3):
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=f"{PREFIX}/game_context_index/")
+    return {obj["Key"].rsplit("/", 1)[-1] for obj in response.get("Contents", [])}
+
+
+@pytest.fixture
+def context_index(lambda_module):
+    return lambda_module("getContext", "context_index")
+
+
+@pytest.fixture
+def indexed(s3, context_index):
+    """Index of 7 matches over 3 shards; returns their IDs, most recent first"""
+    merged = context_index.update_context_index(
+        s3, BUCKET, PREFIX, [summary(n) for n in range(7)], shard_size=SHARD_SIZE
+    )
+    return match_ids(merged)
+
+
+class RacingS3:
+    """S3 client on which `before_manifest` runs just before each conditional manifest write"""
+
+    def __init__(self, s3, manifest_key, before_manifest):
+        self._s3 = s3
+        self._manifest_key = manifest_key
+        self._before_manifest = before_manifest
+
+    def __getattr__(self, name):
+        return getattr(self._s3, name)
+
+    def put_object(self, **kwargs):
+        if kwargs["Key"] == self._manifest_key:
+            self._before_manifest()
+        return self._s3.put_object(**kwargs)
+
+
+def test_index_is_sorted_and_sharded(s3, context_index, indexed):
+    assert indexed == [f"EUW1_{1000 + n}" for n in reversed(range(7))]
+    manifest = context_index.load_manifest(s3, BUCKET, PREFIX)
+    assert manifest["count"] == 7
+    assert len(manifest["shards"]) == 3
+    assert match_ids(context_index.load_context_index(s3, BUCKET, PREFIX)) == indexed
+
+
+@pytest.mark.parametrize("page, page_size", [(1, 2), (2, 2), (2, 4), (3, 3), (1, 10), (5, 2)])
+def test_pages_across_shard_boundaries(s3, context_index, indexed, page, page_size):
+    matches, total = context_index.load_context_page(s3, BUCKET, PREFIX, page, page_size)
+
+    start = (page - 1) * page_size
+    assert total == 7
+    assert match_ids(matches) == indexed[start : start + page_size]
+
+
+@pytest.mark.parametrize("start", [0, 2, 3, 5, 7])
+def test_iterates_from_any_position(s3, context_index, indexed, start):
+    generation, matches = context_index.iter_context_matches(
+        s3, BUCKET, PREFIX, start=start, window=1
+    )
+
+    assert generation == context_index.load_manifest(s3, BUCKET, PREFIX)["updated_at"]
+    assert match_ids(matches) == indexed[start:]
+
+
+def test_reads_context_objects_without_an_index(s3, context_index):
+    for n in range(4):
+        s3.put_object(
+            Bucket=BUCKET,
+            Key=f"{PREFIX}/game_context/EUW1_{1000 + n}.json",
+            Body=json.dumps(summary(n)).encode("utf-8"),
+        )
+
+    assert context_index.load_context_page(s3, BUCKET, PREFIX, 1, 2) is None
+    matches, total = context_index.load_context_page_from_objects(s3, BUCKET, PREFIX, 2, 2)
+    assert (match_ids(matches), total) == (["EUW1_1001", "EUW1_1000"], 4)
+    generation, matches = context_index.iter_context_matches(s3, BUCKET, PREFIX, start=1)
+    assert generation is None
+    assert match_ids(matches) == ["EUW1_1002", "EUW1_1001", "EUW1_1000"]
+
+    # The first index write is seeded from those objects
+    context_index.update_context_index(s3, BUCKET, PREFIX, [summary(4)], shard_size=SHARD_SIZE)
+    assert context_index.load_manifest(s3, BUCKET, PREFIX)["count"] == 5
+
+
+def test_rewrites_keep_one_previous_generation(s3, context_index, indexed):
+    for n in range(7, 9):
+        context_index.update_context_index(s3, BUCKET, PREFIX, [summary(n)], shard_size=SHARD_SIZE)
+
+    manifest = context_index.load_manifest(s3, BUCKET, PREFIX)
+    assert manifest["count"] == 9
+    assert index_keys(s3) == {"manifest.json", *manifest["shards"], *manifest["previous"]}
+
+
+def test_concurrent_writers_keep_both_matches(s3, context_index, indexed):
+    key = context_index.manifest_key(PREFIX)
+    raced = []
+
+    def other_writer():
+        # Lands between this writer's read and its manifest write, once
+        if not raced:
+            raced.append(True)
+            context_index.update_context_index(
+                s3, BUCKET, PREFIX, [summary(100)], shard_size=SHARD_SIZE
+            )
+
+    merged = context_index.update_context_index(
+        RacingS3(s3, key, other_writer), BUCKET, PREFIX, [summary(50)], shard_size=SHARD_SIZE
+    )
+
+    assert match_ids(merged)[:2] == ["EUW1_1100", "EUW1_1050"]
+    manifest = context_index.load_manifest(s3, BUCKET, PREFIX)
+    assert manifest["count"] == 9
+    # The losing attempt's shards are gone, every referenced shard is readable
+    assert index_keys(s3) == {"manifest.json", *manifest["shards"], *manifest["previous"]}
+    assert match_ids(context_index.load_context_index(s3, BUCKET, PREFIX)) == match_ids(merged)
+
+
+def test_gives_up_when_the_manifest_keeps_changing(s3, context_index, indexed, monkeypatch):
+    monkeypatch.setattr(context_index.time, "sleep", lambda seconds: None)
+    key = context_index.manifest_key(PREFIX)
+
+    def other_writer():
+        manifest = context_index.load_manifest(s3, BUCKET, PREFIX)
+        manifest["updated_at"] += 1
+        s3.put_object(Bucket=BUCKET, Key=key, Body=json.dumps(manifest).encode("utf-8"))
+
+    with pytest.raises(RuntimeError, match="not updated"):
+        context_index.update_context_index(
+            RacingS3(s3, key, other_writer), BUCKET, PREFIX, [summary(50)], shard_size=SHARD_SIZE
+        )
+    manifest = context_index.load_manifest(s3, BUCKET, PREFIX)
+    assert match_ids(context_index.load_context_index(s3, BUCKET, PREFIX)) == indexed
+    assert index_keys(s3) == {"manifest.json", *manifest["shards"], *manifest["previous"]}
+
+
+def get_context(handler, **params):
+    response = handler.lambda_handler({"queryStringParameters": params}, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_continuation_tokens_export_every_match(lambda_module, indexed):
+    handler = lambda_module("getContext", "lambda_function")
+
+    exported, token, pages = [], None, 0
+    while True:
+        params = {"prefix": PREFIX, "max_bytes": "600"}
+        if token:
+            params["continuation_token"] = token
+        status, body = get_context(handler, **params)
+        assert status == 200
+        exported.extend(m["matchId"] for m in body["data"])
+        token = body["continuation_token"]
+        pages += 1
+        if token is None:
+            break
+
+    assert exported == indexed
+    assert pages > 1
+
+
+def test_export_restarts_when_the_index_changes(s3, lambda_module, context_index, indexed):
+    handler = lambda_module("getContext", "lambda_function")
+    status, body = get_context(handler, prefix=PREFIX, max_bytes="600")
+    assert status == 200 and body["continuation_token"]
+
+    context_index.update_context_index(s3, BUCKET, PREFIX, [summary(7)], shard_size=SHARD_SIZE)
+
+    status, body = get_context(
+        handler, prefix=PREFIX, continuation_token=body["continuation_token"]
+    )
+    assert status == 409
+
+
+def test_rejects_invalid_tokens(lambda_module, indexed):
+    handler = lambda_module("getContext", "lambda_function")
+    token = base64.urlsafe_b64encode(b'{"generation": 1}').decode("ascii")
+
+    assert get_context(handler, prefix=PREFIX, continuation_token=token)[0] == 400
+    assert get_context(handler, prefix=PREFIX, continuation_token="not base64!")[0] == 400
+    assert get_context(handler, prefix=PREFIX, max_bytes="lots")[0] == 400
+    assert get_context(handler)[0] == 400
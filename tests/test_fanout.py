@@ -0,0 +1,176 @@
+"""
+Fan-out of the match details: dispatch -> wait -> reduce
+
+Runs the collector against the local fake Riot API (`benchmarks/fake_riot.py`)
+and an in-memory S3 (moto). Shards run in this process (`InlineDispatcher`),
+so the workers and the pipeline see the same S3.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "lambdas" / "collection" / "league_api_call"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+moto = pytest.importorskip("moto")
+
+import synthetic_games  # noqa: E402
+from collection_pipeline import BUCKETS, REGION, seed_static_data  # noqa: E402
+from fake_riot import FakeRiotServer  # noqa: E402
+
+GAMES = 40
+BUCKET = "s3-api-lol"
+
+
+@pytest.fixture(scope="module")
+def collector(tmp_path_factory):
+    """Collector modules imported against a fake Riot API and moto S3"""
+    workdir = tmp_path_factory.mktemp("fanout")
+    seed_static_data(workdir / "ddragon")
+    server = FakeRiotServer(
+        games_per_player=GAMES, latency_ms=1, jitter_ms=0, rate_limits=None
+    ).start()
+    environ = dict(os.environ)
+    os.environ.update(
+        AWS_DEFAULT_REGION="eu-west-3",
+        AWS_ACCESS_KEY_ID="test",
+        AWS_SECRET_ACCESS_KEY="test",
+        RIOT_API_KEY="test",
+        RIOT_API_BASE_URL=server.url,
+        RIOT_RATE_LIMITS="500:10",
+        TIMELINE_PREFETCH_INTERVAL="0",
+        TIMELINE_PREFETCH_MAX_REQUESTS="0",
+        ACCOUNT_CACHE_DIR=str(workdir / "accounts"),
+        STATIC_DATA_DIR=str(workdir / "ddragon"),
+        STATIC_DATA_OFFLINE="1",
+        COLLECTION_FANOUT="inline",
+    )
+    try:
+        with moto.mock_aws():
+            # The collector builds its clients at import: import inside the mock
+            import get_account_data
+            from module import fanout, pipeline
+            from module.clients import get_client
+            from module.context_index import load_manifest
+
+            s3 = get_client("s3")
+            for bucket in BUCKETS:
+                s3.create_bucket(
+                    Bucket=bucket,
+                    CreateBucketConfiguration={"LocationConstraint": "eu-west-3"},
+                )
+            yield {
+                "main": get_account_data.main,
+                "fanout": fanout,
+                "pipeline": pipeline,
+                "load_manifest": load_manifest,
+                "s3": s3,
+            }
+    finally:
+        server.stop()
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+def keys(s3, prefix):
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+    return [obj["Key"] for obj in response.get("Contents", [])]
+
+
+def new_pipeline(collector, player, dispatcher, **kwargs):
+    gamename, gametag = synthetic_games.player_riot_id(player)
+    return collector["pipeline"].CollectionPipeline(
+        collector["s3"],
+        REGION,
+        gamename,
+        gametag,
+        "solo",
+        "test",
+        endpoint=None,
+        connection_id=None,
+        dispatcher=dispatcher,
+        **kwargs,
+    )
+
+
+def run(pipeline):
+    state = pipeline.load()
+    while not pipeline.done(state):
+        state = pipeline.step(state)
+        pipeline.save(state)
+    return state
+
+
+def test_fanout_collects_every_match(collector):
+    gamename, gametag = synthetic_games.player_riot_id(0)
+
+    result = collector["main"](REGION, gamename, gametag, {"connectionId": None}, "solo")
+
+    assert result["statusCode"] == 200
+    s3 = collector["s3"]
+    prefix = f"{gamename}_{gametag}"
+    assert len(keys(s3, f"{prefix}/game_summary/")) == GAMES
+    assert collector["load_manifest"](s3, BUCKET, prefix)["count"] == GAMES
+    # Reports are deleted by the reduce, the checkpoint once done
+    assert not [key for key in keys(s3, "collection_checkpoints/") if "/runs/" in key]
+    assert not keys(s3, collector["pipeline"].checkpoint_key(gamename, gametag, "solo"))
+
+
+def test_fanout_redispatches_silent_shards(collector, monkeypatch):
+    fanout = collector["fanout"]
+    monkeypatch.setattr(collector["pipeline"], "SHARD_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(collector["pipeline"], "FANOUT_POLL_SECONDS", 0)
+
+    class LosingDispatcher(fanout.InlineDispatcher):
+        """Loses the first dispatch of shard 0, like a worker that crashed"""
+
+        def __init__(self):
+            self.dispatched = []
+
+        def dispatch(self, shard):
+            self.dispatched.append(shard["shard_index"])
+            if self.dispatched != [0]:
+                super().dispatch(shard)
+
+    dispatcher = LosingDispatcher()
+    state = run(new_pipeline(collector, 1, dispatcher))
+
+    assert state["stage"] == "done"
+    assert dispatcher.dispatched.count(0) == 2
+    assert sorted(set(dispatcher.dispatched)) == list(range(state["shard_count"]))
+    gamename, gametag = synthetic_games.player_riot_id(1)
+    assert len(keys(collector["s3"], f"{gamename}_{gametag}/game_summary/")) == GAMES
+
+
+def test_fanout_runs_no_more_shards_than_the_key_serves(collector, monkeypatch):
+    fanout = collector["fanout"]
+    from module.riot_client import RiotClient
+
+    # 4 requests/s at 70% for bulk: 2 workers at most
+    monkeypatch.setattr(
+        collector["pipeline"], "get_riot_client", lambda: RiotClient(rate_limits=((4, 1),))
+    )
+
+    class RecordingDispatcher(fanout.InlineDispatcher):
+        max_workers = None
+
+        def __init__(self):
+            self.shards = []
+
+        def dispatch(self, shard):
+            self.shards.append(shard)
+            super().dispatch(shard)
+
+    dispatcher = RecordingDispatcher()
+    state = run(new_pipeline(collector, 2, dispatcher, shard_size=5))
+
+    assert state["stage"] == "done"
+    assert len(dispatcher.shards) == 2
+    assert {len(shard["match_ids"]) for shard in dispatcher.shards} == {GAMES // 2}
+    assert {shard["workers"] for shard in dispatcher.shards} == {2}
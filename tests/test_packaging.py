@@ -0,0 +1,73 @@
+"""
+Deployment packages: the Data Dragon snapshot of the current patch
+
+Builds the coach Lambda with `scripts/package_lambda.py` from the synthetic
+snapshot of the benchmarks, then imports it from the extracted zip, as
+Lambda would, and checks that the init preload found the items.
+
+    python -m pytest tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from collection_pipeline import seed_static_data  # noqa: E402
+from package_lambda import package  # noqa: E402
+
+COACH = "callCoachAgentOneGame"
+
+
+def test_coach_package_preloads_items(tmp_path):
+    seed_static_data(tmp_path / "ddragon")
+    archive = package(COACH, tmp_path / "dist", tmp_path / "ddragon")
+
+    extracted = tmp_path / COACH
+    with zipfile.ZipFile(archive) as zip_file:
+        zip_file.extractall(extracted)
+        names = zip_file.namelist()
+    assert "module/ddragon/15.19.1/data/en_US/item.json" in names
+    assert not any("__pycache__" in name for name in names)
+
+    # No local snapshot other than the bundled one, and no S3 or CDN fallback
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    env = {
+        **os.environ,
+        "STATIC_DATA_DIR": str(empty),
+        "STATIC_DATA_OFFLINE": "1",
+        "AWS_DEFAULT_REGION": "eu-west-3",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+    }
+    env.pop("STATIC_DATA_VERSION", None)
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, lambda_function\n"
+            "from module.static_data import get_static_data\n"
+            "print(json.dumps(get_static_data().preload(('items',))))",
+        ],
+        cwd=extracted,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == ["items"]
+
+
+def test_missing_snapshot_fails_the_build(tmp_path):
+    with pytest.raises(SystemExit, match="No item data"):
+        package(COACH, tmp_path / "dist", tmp_path / "empty")
+    assert not (tmp_path / "dist" / f"{COACH}.zip").exists()
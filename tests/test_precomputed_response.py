@@ -0,0 +1,88 @@
+"""
+Precomputed responses: gzip pass-through and ETag revalidation
+
+Runs `precomputed_response.py` (the getScoreSummary copy) against an
+in-memory S3 (moto).
+
+    python -m pytest tests
+"""
+
+import base64
+import gzip
+import json
+
+import pytest
+
+BUCKET = "s3-api-lol"
+PAYLOAD = {"match_id": "EUW1_1000", "score": 8.5, "summary": "Clean laning phase ✨"}
+
+
+@pytest.fixture
+def responses(lambda_module):
+    return lambda_module("getScoreSummary", "precomputed_response")
+
+
+@pytest.fixture
+def key(s3, responses):
+    key = responses.response_key("Player_EUW", "score_summary_EUW1_1000")
+    responses.put_response(s3, BUCKET, key, PAYLOAD)
+    return key
+
+
+def serve(s3, responses, key, **headers):
+    return responses.serve_response(s3, BUCKET, key, {"headers": headers})
+
+
+def test_missing_response_falls_back(s3, responses):
+    assert serve(s3, responses, responses.response_key("Player_EUW", "missing")) is None
+
+
+def test_identical_payloads_keep_their_etag(s3, responses, key):
+    etag = s3.head_object(Bucket=BUCKET, Key=key)["ETag"]
+    responses.put_response(s3, BUCKET, key, dict(PAYLOAD))
+    assert s3.head_object(Bucket=BUCKET, Key=key)["ETag"] == etag
+
+
+def test_serves_plain_json_without_accept_encoding(s3, responses, key):
+    response = serve(s3, responses, key)
+
+    assert response["statusCode"] == 200
+    assert "Content-Encoding" not in response["headers"]
+    assert response["headers"]["Cache-Control"] == responses.DEFAULT_CACHE_CONTROL
+    assert json.loads(response["body"]) == PAYLOAD
+
+
+def test_passes_gzip_through(s3, responses, key):
+    response = serve(s3, responses, key, **{"Accept-Encoding": "gzip, deflate, br"})
+
+    assert response["statusCode"] == 200
+    assert response["isBase64Encoded"] is True
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(base64.b64decode(response["body"]))) == PAYLOAD
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ["{etag}", "W/{etag}", '"stale", {etag}', "{etag}, W/\"stale\""],
+)
+def test_revalidation_returns_304(s3, responses, key, if_none_match):
+    etag = serve(s3, responses, key)["headers"]["ETag"]
+
+    response = serve(
+        s3, responses, key, **{"If-None-Match": if_none_match.format(etag=etag)}
+    )
+
+    assert response["statusCode"] == 304
+    assert response["body"] == ""
+    assert response["headers"]["ETag"] == etag
+
+
+def test_changed_response_is_served_again(s3, responses, key):
+    etag = serve(s3, responses, key)["headers"]["ETag"]
+    responses.put_response(s3, BUCKET, key, {**PAYLOAD, "score": 9})
+
+    response = serve(s3, responses, key, **{"if-none-match": etag})
+
+    assert response["statusCode"] == 200
+    assert response["headers"]["ETag"] != etag
+    assert json.loads(response["body"])["score"] == 9
@@ -0,0 +1,90 @@
+"""
+Score index: conditional merges of concurrent analyses
+
+Runs `score_index.py` (the getScoreSummaries copy) against an in-memory S3
+(moto).
+
+    python -m pytest tests
+"""
+
+import pytest
+
+BUCKET = "s3-api-lol"
+FOLDER = "Player_EUW"
+
+
+@pytest.fixture
+def score_index(lambda_module, monkeypatch):
+    module = lambda_module("getScoreSummaries", "score_index")
+    monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+    return module
+
+
+def entry(score_index, match_id, score):
+    analysis = {"player": {"score": score}, "final_verdict": {"summary": f"{match_id} review"}}
+    return {match_id: score_index.score_entry(match_id, analysis)}
+
+
+class RacingS3:
+    """S3 client on which `before_put` runs just before each write"""
+
+    def __init__(self, s3, before_put):
+        self._s3 = s3
+        self._before_put = before_put
+
+    def __getattr__(self, name):
+        return getattr(self._s3, name)
+
+    def put_object(self, **kwargs):
+        self._before_put()
+        return self._s3.put_object(**kwargs)
+
+
+def test_entries_are_merged(s3, score_index):
+    assert score_index.load_score_index(s3, BUCKET, FOLDER) == ({}, None)
+
+    assert score_index.update_score_index(s3, BUCKET, FOLDER, entry(score_index, "EUW1_1", 7))
+    assert score_index.update_score_index(s3, BUCKET, FOLDER, entry(score_index, "EUW1_2", 4))
+    assert score_index.update_score_index(s3, BUCKET, FOLDER, entry(score_index, "EUW1_1", 8))
+
+    scores, etag = score_index.load_score_index(s3, BUCKET, FOLDER)
+    assert etag
+    assert scores == {
+        "EUW1_1": {"match_id": "EUW1_1", "score": 8, "summary": "EUW1_1 review"},
+        "EUW1_2": {"match_id": "EUW1_2", "score": 4, "summary": "EUW1_2 review"},
+    }
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_concurrent_analysis_is_not_dropped(s3, score_index, existing):
+    if existing:
+        score_index.update_score_index(s3, BUCKET, FOLDER, entry(score_index, "EUW1_0", 5))
+    raced = []
+
+    def other_analysis():
+        if not raced:
+            raced.append(True)
+            score_index.update_score_index(s3, BUCKET, FOLDER, entry(score_index, "EUW1_2", 4))
+
+    racing = RacingS3(s3, other_analysis)
+    assert score_index.update_score_index(racing, BUCKET, FOLDER, entry(score_index, "EUW1_1", 7))
+
+    scores, _ = score_index.load_score_index(s3, BUCKET, FOLDER)
+    assert set(scores) == {"EUW1_1", "EUW1_2"} | ({"EUW1_0"} if existing else set())
+
+
+def test_gives_up_after_max_attempts(s3, score_index):
+    writes = []
+
+    def other_analysis():
+        writes.append(True)
+        score_index.update_score_index(
+            s3, BUCKET, FOLDER, entry(score_index, f"EUW1_{100 + len(writes)}", 1)
+        )
+
+    racing = RacingS3(s3, other_analysis)
+    assert not score_index.update_score_index(racing, BUCKET, FOLDER, entry(score_index, "EUW1_1", 7))
+
+    scores, _ = score_index.load_score_index(s3, BUCKET, FOLDER)
+    assert len(writes) == score_index.MAX_ATTEMPTS
+    assert "EUW1_1" not in scores
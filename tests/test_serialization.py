@@ -0,0 +1,94 @@
+"""
+Stored JSON artifacts: compression and format detection
+
+Runs `serialization.py` (the getContext copy) against an in-memory S3 (moto).
+
+    python -m pytest tests
+"""
+
+import gzip
+import json
+import math
+import sys
+
+import pytest
+
+BUCKET = "s3-api-lol"
+RECORD = {"matchId": "EUW1_1000", "champion": "Kai'Sa", "kills": 7, "items": [3031, 3094]}
+
+
+@pytest.fixture
+def serialization(lambda_module):
+    return lambda_module("getContext", "serialization")
+
+
+def stored(s3, key):
+    obj = s3.get_object(Bucket=BUCKET, Key=key)
+    return obj["Body"].read(), obj.get("ContentEncoding")
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        json.dumps(RECORD, indent=4).encode("utf-8"),
+        json.dumps(RECORD),
+        gzip.compress(json.dumps(RECORD).encode("utf-8")),
+    ],
+    ids=["indented", "str", "gzip"],
+)
+def test_loads_detects_the_format(serialization, body):
+    assert serialization.loads(body) == RECORD
+
+
+def test_loads_zstd(serialization):
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(json.dumps(RECORD).encode("utf-8"))
+
+    assert serialization.loads(body) == RECORD
+
+
+def test_loads_nan_written_by_json(serialization):
+    body = gzip.compress(json.dumps({"kda": float("nan")}).encode("utf-8"))
+
+    assert math.isnan(serialization.loads(body)["kda"])
+
+
+def test_dumps_is_compact(serialization):
+    data = serialization.dumps(RECORD)
+
+    assert b" " not in data
+    assert json.loads(data) == RECORD
+    assert json.loads(serialization.dumps({"big": 2**70}))["big"] == 2**70
+
+
+@pytest.mark.parametrize(
+    "compression, encoding",
+    [(None, "gzip"), ("gzip", "gzip"), ("none", None), ("unknown", "gzip")],
+)
+def test_put_json_round_trip(s3, serialization, monkeypatch, compression, encoding):
+    if compression:
+        monkeypatch.setenv("STORAGE_COMPRESSION", compression)
+
+    serialization.put_json(s3, BUCKET, "Player_EUW/game_context/EUW1_1000.json", RECORD)
+
+    body, content_encoding = stored(s3, "Player_EUW/game_context/EUW1_1000.json")
+    assert content_encoding == encoding
+    assert serialization.loads(body) == RECORD
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard(s3, serialization, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    serialization.put_json(s3, BUCKET, "k.json", RECORD, compression="zstd")
+
+    body, content_encoding = stored(s3, "k.json")
+    assert content_encoding == "gzip"
+    assert body[:2] == serialization.GZIP_MAGIC
+
+
+def test_put_json_stores_bytes_as_they_are(s3, serialization):
+    raw = b'{"metadata": {"matchId": "EUW1_1000"}}'
+
+    serialization.put_json(s3, BUCKET, "raw.json", raw, compression="none")
+
+    assert stored(s3, "raw.json") == (raw, None)